@@ -0,0 +1,193 @@
+#!/usr/bin/python
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+"""
+Micro benchmarks for the test algorithms in memtester/scheduler/src/tester.
+They run on anonymous memory and need neither the phys_mem module nor root.
+"""
+
+import os
+import sys
+import time
+import mmap
+
+from optparse import OptionParser
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_HERE, '..', '..', 'scheduler', 'src'))
+sys.path.insert(0, os.path.join(_HERE, '..', '..', 'scheduler', 'test'))
+sys.path.insert(0, os.path.join(_HERE, '..', '..', '..', 'physmem', 'interface', 'src', 'pylib'))
+
+import tester
+from physmem.mmapwrapper import MmapWrapper
+from faulty_region import FaultyRegion, BytewiseRegion, RecordingReporting
+
+PAGE_SIZE = 0x1000
+
+
+def seconds(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def benchmark_quadratic(options):
+    """
+    Shows that the slice based QuadraticScanner reports exactly the same faults as the
+    bytewise implementation, and how much faster it is on a mapping.
+    """
+    length = options.quadratic_length
+    faults = dict(stuck_at_0={3: 0x01, length / 2: 0x10}, stuck_at_1={length - 1: 0x80})
+
+    bytewise_reporting = RecordingReporting()
+    tester.QuadraticScanner(bytewise_reporting).test(BytewiseRegion(FaultyRegion(length, **faults)), 0, length)
+
+    buffer_reporting = RecordingReporting()
+    tester.QuadraticScanner(buffer_reporting).test(FaultyRegion(length, **faults), 0, length)
+
+    if bytewise_reporting.reports != buffer_reporting.reports:
+        print("quadratic: MISMATCH, bytewise reported %d faults, buffer %d faults" % (len(bytewise_reporting.reports), len(buffer_reporting.reports)))
+        return False
+
+    print("quadratic: %d bytes with injected faults, %d identical fault reports" % (length, len(buffer_reporting.reports)))
+
+    with MmapWrapper(mmap.mmap(-1, PAGE_SIZE)) as region:
+        bytewise_seconds = seconds(tester.QuadraticScanner(RecordingReporting()).test, BytewiseRegion(region), 0, length)
+        buffer_seconds = seconds(tester.QuadraticScanner(RecordingReporting()).test, region, 0, length)
+        page_seconds = seconds(tester.QuadraticScanner(RecordingReporting()).test, region, 0, PAGE_SIZE)
+
+    print("\tbytewise, %d bytes: %8.3f s" % (length, bytewise_seconds))
+    print("\tbuffer,   %d bytes: %8.3f s (speedup %.0fx)" % (length, buffer_seconds, bytewise_seconds / max(buffer_seconds, 1e-9)))
+    print("\tbuffer,   one %d byte frame: %.3f s" % (PAGE_SIZE, page_seconds))
+    return True
+
+
+def benchmark_traversal(options):
+    """
+    Throughput of the numpy wordwise test in ascending order and in random cache line order
+    (tester.RandomLineOrder), in blocks of 100 frames like the blockwise scheduler.
+    """
+    if not tester.RandomLineOrder:
+        print("traversal: skipped, needs numpy")
+        return True
+
+    pages = options.traversal_pages
+    block = 100
+    region = mmap.mmap(-1, pages * PAGE_SIZE)
+
+    def run(order):
+        frame_test = tester.WordwiseScanner(RecordingReporting(), order=order)
+        for first in xrange(0, pages, block):
+            offsets = [frame * PAGE_SIZE for frame in xrange(first, min(pages, first + block))]
+            frame_test.test_frames(region, offsets, PAGE_SIZE)
+        return frame_test.reporting.reports
+
+    try:
+        run(None)
+        sequential_seconds = seconds(run, None)
+        random_seconds = seconds(run, tester.RandomLineOrder(1))
+    finally:
+        region.close()
+
+    mib = pages * PAGE_SIZE / float(1 << 20)
+    print("traversal: wordwise test of %d frames (%.0f MiB) in blocks of %d frames" % (pages, mib, block))
+    print("\tascending order:         %8.3f s, %8.1f MiB/s" % (sequential_seconds, mib / max(sequential_seconds, 1e-9)))
+    print("\trandom cache line order: %8.3f s, %8.1f MiB/s (%+.0f %% time)" % (random_seconds, mib / max(random_seconds, 1e-9),
+                                                                             100.0 * (random_seconds - sequential_seconds) / max(sequential_seconds, 1e-9)))
+    return True
+
+
+def benchmark_slicing(options):
+    """
+    Overhead of running the tests as steps in time slices (tester.TimeSlicer) compared to
+    running them in one call, for the linear test (a step per pass) and the quadratic test
+    (a step per STEP_BYTES bytes). The slicer does not pause, so the difference is the overhead.
+    """
+    pages = options.slicing_pages
+    region = mmap.mmap(-1, pages * PAGE_SIZE)
+    offsets = [frame * PAGE_SIZE for frame in xrange(pages)]
+
+    def direct(frame_test, offsets):
+        tester.finish(tester.test_steps(frame_test, region, offsets, PAGE_SIZE))
+
+    def sliced(frame_test, offsets, slicer):
+        slicer.run(frame_test, region, offsets, PAGE_SIZE)
+
+    print("slicing: %d frames, slices of %.1f ms without pauses" % (pages, 1000.0 * options.time_slice))
+    try:
+        for name, frame_test, frames in (("linear", tester.LinearScanner(RecordingReporting()), offsets),
+                                         ("quadratic", tester.QuadraticScanner(RecordingReporting()), offsets[:options.slicing_quadratic_pages])):
+            direct(frame_test, frames)
+            direct_seconds = seconds(direct, frame_test, frames)
+            slicer = tester.TimeSlicer(options.time_slice)
+            sliced_seconds = seconds(sliced, frame_test, frames, slicer)
+            print("\t%-9s %5d frames: direct %8.3f s, sliced %8.3f s (%+.1f %% time, %d steps in %d slices)" % (name, len(frames), direct_seconds, sliced_seconds,
+                   100.0 * (sliced_seconds - direct_seconds) / max(direct_seconds, 1e-9), slicer.steps, slicer.slices))
+    finally:
+        region.close()
+    return True
+
+
+BENCHMARKS = {"quadratic": benchmark_quadratic,
+              "slicing": benchmark_slicing,
+              "traversal": benchmark_traversal}
+
+if __name__ == '__main__':
+    usage = """Benchmarks the test algorithms.
+    usage: %prog [options] [benchmark ...]   (available: """ + ", ".join(sorted(BENCHMARKS)) + ")"
+    parser = OptionParser(usage=usage)
+
+    parser.add_option("--quadratic-length", dest="quadratic_length",
+                      default=512, type=int,
+                      help="Size of the region used to compare the bytewise and the buffer quadratic tests. [default: %default]")
+
+    parser.add_option("--traversal-pages", dest="traversal_pages",
+                      default=16384, type=int,
+                      help="Number of frames tested in ascending and in random order. [default: %default]")
+
+    parser.add_option("--slicing-pages", dest="slicing_pages",
+                      default=4096, type=int,
+                      help="Number of frames tested by the linear test with and without time slicing. [default: %default]")
+
+    parser.add_option("--slicing-quadratic-pages", dest="slicing_quadratic_pages",
+                      default=4, type=int,
+                      help="Number of frames tested by the quadratic test with and without time slicing. [default: %default]")
+
+    parser.add_option("--time-slice", dest="time_slice",
+                      default=0.01, type=float,
+                      help="Length of a time slice in seconds. [default: %default]")
+
+    (options, args) = parser.parse_args()
+
+    names = args or sorted(BENCHMARKS)
+    for name in names:
+        if not name in BENCHMARKS:
+            parser.error("Unknown benchmark `%s`" % name)
+
+    all_ok = True
+    for name in names:
+        all_ok = BENCHMARKS[name](options) and all_ok
+
+    sys.exit(0 if all_ok else 1)
@@ -44,21 +44,40 @@ from optparse import OptionParser
 class PrintTestReporting:
     def report_bad_memory(self, bad_offset, expected_value, actual_value):
         print("BAD memory, offset 0x%x : Expected/Got 0x%x/0x%x" % (bad_offset, expected_value, actual_value))
+
+    def report_bit_faults(self, frame_offset, stuck_at_0, stuck_at_1, coupled):
+        print("BAD bit lanes, frame at offset 0x%x : stuck-at-0/stuck-at-1/coupled 0x%016x/0x%016x/0x%016x" % (frame_offset, stuck_at_0, stuck_at_1, coupled))
+
+    def report_bandwidth(self, frame_offset, frames, node, bytes_per_second, cached):
+        print(str(tester.BandwidthRecord(frame_offset, frames, node, bytes_per_second, cached)))
         
 
 
+def print_fault_record(record):
+    print(str(record))
+
+
 class PrintSchedulerReporting:
-    def __init__(self, chunksize ):
+    def __init__(self, chunksize, evictor = None):
         self.chunksize = chunksize
         self.enabled = (chunksize != 0)
+        self.evictor = evictor
         self.reset()
         
     
     def reset(self):
         self.frames_tested  = 0
         self.frames_tested_c  = 0
+        self.frames_escalated = 0
         self.start_of_measurement = time.time()
         self.start_of_chunk = self.start_of_measurement
+        self.eviction_seconds = self._eviction_seconds()
+        self.eviction_seconds_c = self.eviction_seconds
+
+    def _eviction_seconds(self):
+        if self.evictor:
+            return self.evictor.seconds
+        return 0.0
         
     def report_good_frame(self, pfn):
         self.report_frame_tested()
@@ -66,6 +85,16 @@ class PrintSchedulerReporting:
     def report_bad_frame(self, pfn):
         self.report_frame_tested()
 
+    def report_escalated_frame(self, pfn):
+        self.frames_escalated += 1
+
+    def report_corrected_errors(self, pfns, increases):
+        locations = ", ".join("%s: %d" % (location, increases[location]) for location in sorted(increases))
+        print("\tECC corrected %d errors (%s) while testing pfns 0x%x..0x%x" % (sum(increases.values()), locations, min(pfns), max(pfns)))
+
+    def report_aborted_block(self, pfns):
+        print("\tMemory pressure: released %d frames untested, backing off" % len(pfns))
+
     def report_frame_tested(self):
         self.frames_tested += 1
         self.frames_tested_c += 1
@@ -80,6 +109,15 @@ class PrintSchedulerReporting:
             fps = self.frames_tested / seconds_since_start
             fps_c = self.frames_tested_c / seconds_since_start_c
             print("\tTested %d frames in %d seconds. fps=%d (this batch: %d in %d s: fps=%d)" % (self.frames_tested,seconds_since_start, fps, self.frames_tested_c, seconds_since_start_c,fps_c))
+            if self.frames_escalated:
+                print("\t\t%d frames escalated to the full test" % self.frames_escalated)
+            if self.evictor:
+                eviction_seconds = self._eviction_seconds()
+                eviction_seconds_c = eviction_seconds - self.eviction_seconds_c
+                print("\t\tCache eviction: %.1f seconds (%02.1f %%), %.2f ms per frame (this batch: %.1f s, %02.1f %%)" % (eviction_seconds - self.eviction_seconds,
+                       100.0 * (eviction_seconds - self.eviction_seconds) / seconds_since_start, 1000.0 * (eviction_seconds - self.eviction_seconds) / max(self.frames_tested, 1),
+                       eviction_seconds_c, 100.0 * eviction_seconds_c / seconds_since_start_c))
+                self.eviction_seconds_c = eviction_seconds
             self.frames_tested_c = 0
             self.start_of_chunk = time.time()
     
@@ -87,7 +125,9 @@ def print_stats(config,timestamping):
     #("last_successfull_test", c_uint64), ("last_failed_test", c_uint64), ("last_claiming_time_jiffies", c_uint64), 
     #                  ("last_claiming_attempt", c_uint64),
     #                 ("num_errors", c_uint32),
-    #                  ("last_successfull_claiming_method", c_uint32)]
+    #                  ("last_successfull_claiming_method", c_uint32),
+    #                  ("num_claim_failures", c_uint32),
+    #                  ("num_corrected_errors", c_uint32)]
     
     num_tested = 0
     num_untested = 0
@@ -101,6 +141,7 @@ def print_stats(config,timestamping):
     max_last_test_timestamp = 0
     
     num_errors = 0
+    num_corrected = 0
     num_frames = config.get_record_count()
     
     for pfn in xrange(0, num_frames):
@@ -134,11 +175,16 @@ def print_stats(config,timestamping):
 
             if (frame.num_errors > 0 ):
                 num_errors += 1
+
+            if (frame.num_corrected_errors > 0 ):
+                num_corrected += 1
                 
         else:
             num_untested += 1
    
     print("0x%x frames (%d decimal), of which are %d tested  (%02.1f %%) and %d untested  (%02.1f %%), %d have seen errors." % (num_frames,num_frames, num_tested, (100.0 * num_tested/num_frames) , num_untested, (100.0 * num_untested/num_frames) , num_errors))
+    if num_corrected > 0:
+        print("%d tested frames were under test while ECC corrected errors." % num_corrected)
     if num_tested > 0:
         print("For tested frames, the following statistics have been calculated: ")
         print("\tTime it took to claim a frame (in jiffies) (min,max,avg) : %d, %d, %d" % (min_claim_time, max_claim_time, total_claim_time / num_tested))   
@@ -162,6 +208,87 @@ def reset_first_10_frames_in_config(path):
             if  (stat.last_successfull_test != 0) or ( stat.last_failed_test != idx):
                 print("Error @%d: got %s" % (idx,stat))
             
+# Claimers of the physmem module, by --sources name. The hw-poison claimers soft offline a
+# frame in use, which migrates (or drops the clean page cache copy of) its content before the
+# frame is handed over, so every claimed frame may be overwritten. The page cache and anonymous
+# claimers of the module never claim a frame (the hw-poison claimers replace them), so they
+# are not offered.
+SOURCES = {"free-buddy": physmem.SOURCE_FREE_BUDDY_PAGE,
+           "hw-poison-anon": physmem.SOURCE_HW_POISON_ANON,
+           "hw-poison-page-cache": physmem.SOURCE_HW_POISON_PAGE_CACHE}
+
+# The test algorithms that can visit the cache lines of a block in random order
+ORDERED_ALGORITHMS = ["wordwise", "mats+", "march-c-", "march-b", "bitwise", "random"]
+
+# The test algorithms that can evict the caches between writing and verifying a block
+EVICTING_ALGORITHMS = ["linear", "wordwise", "random", "stress"]
+
+def new_frame_test(algorithm, options, test_reporting, evictor=None, implementation=None, order=None):
+    """
+    Create the tester for algorithm. Raises RuntimeError if the algorithm is not available.
+    implementation selects one of tester.implementations(algorithm), see calibrate_implementation.
+    order (see ORDERED_ALGORITHMS) is the order the cache lines of a block are visited in.
+    """
+    if implementation:
+        factories = tester.implementations(algorithm, options.patterns, options.fused_passes)
+        if not implementation in factories:
+            raise RuntimeError("The `%s` test algorithm has no `%s` implementation on this host (available: %s)" %
+                               (algorithm, implementation, ", ".join(sorted(factories))))
+        return factories[implementation](test_reporting, evictor)
+
+    numpy_test_classes = {"wordwise": tester.WordwiseScanner,
+                          "mats+": tester.MatsPlus,
+                          "march-c-": tester.MarchCMinus,
+                          "march-b": tester.MarchB,
+                          "bitwise": tester.BitFaultScanner,
+                          "random": tester.RandomPatternScanner}
+
+    if (algorithm in numpy_test_classes) and not numpy_test_classes[algorithm]:
+        raise RuntimeError("The `%s` test algorithm needs numpy" % algorithm)
+
+    if  "linear" == algorithm:
+        return tester.LinearScanner(test_reporting, evictor, options.patterns, options.fused_passes)
+    elif "quadratic" == algorithm:
+        return tester.QuadraticScanner(test_reporting)
+    elif "retention" == algorithm:
+        return tester.RetentionScanner(test_reporting)
+    elif "hammer" == algorithm:
+        return tester.HammerScanner(test_reporting, options.hammer_count, options.hammer_time_budget, tester.ClflushReads())
+    elif "coherency" == algorithm:
+        return tester.CoherencyTest(test_reporting, options.coherency_workers, options.coherency_cpus, options.coherency_duration)
+    elif "stress" == algorithm:
+        return tester.BandwidthStressTest(test_reporting, options.stress_duration, evictor=evictor)
+    elif "galloping" == algorithm:
+        return tester.GallopingScanner(test_reporting, options.galloping_window, options.galloping_aligned)
+    elif "wordwise" == algorithm:
+        return tester.WordwiseScanner(test_reporting, evictor, order)
+    elif "random" == algorithm:
+        return tester.RandomPatternScanner(test_reporting, options.run_id, evictor=evictor, order=order)
+    else:
+        return numpy_test_classes[algorithm](test_reporting, order)
+
+def calibrate_implementation(algorithm, options, cache_path, recalibrate):
+    """
+    Pick the fastest implementation of algorithm on this host. The benchmark results are cached
+    per host and kernel in cache_path, recalibrate ignores the cache.
+
+    return: the name of the implementation, or None if algorithm has only one implementation
+    """
+    available = tester.implementations(algorithm, options.patterns, options.fused_passes)
+    if len(available) < 2:
+        return None
+
+    cache = tester.CalibrationCache(cache_path)
+    results = None if recalibrate else cache.get(algorithm)
+    if results is None:
+        print "Calibrating the implementations of the '%s' test algorithm ..." % algorithm
+        results = tester.calibrate(algorithm)
+        cache.store(algorithm, results)
+
+    for line in tester.format_results(algorithm, results):
+        print "\t" + line
+    return tester.fastest(dict((name, results[name]) for name in results if name in available))
+
 if __name__ == '__main__':
 
 
@@ -176,10 +303,191 @@ if __name__ == '__main__':
                            "[default: %default]")
 
     parser.add_option("-t", "--test-algorithm",dest="algorithm",type="choice",
-                      default="linear",choices=["linear","quadratic"],
-                      help="Algorithm used to verify frames: `linear`-time or `quadratic` runtime."
+                      default="linear",choices=["linear","quadratic","galloping","retention","hammer","coherency","stress","wordwise","mats+","march-c-","march-b","bitwise","random"],
+                      help="Algorithm used to verify frames: `linear`-time, `quadratic` runtime, `galloping` (coupling faults inside a window, see --galloping-window), `retention` (verifies blocks RETENTION_INTERVAL seconds after writing them, blockwise only), `hammer` (disturbance of physically adjacent frames, x86-64 only: flushes each read from the caches, see --hammer-count), "
+                           "`coherency` (worker processes on several cores write interleaved cache lines of a block and verify each other's, see --coherency-workers), "
+                           "`stress` (streams writes, reads and copies over whole blocks and reports the DRAM bandwidth per block and NUMA node, always evicts the caches between its operations, see --stress-duration and --eviction-size), `wordwise` (linear-time, numpy based, tests all frames of a block at once), "
+                           "one of the march tests `mats+`, `march-c-` and `march-b` (linear-time, numpy based), "
+                           "`bitwise` (walking ones/zeroes and moving inversions with bit lane diagnosis, numpy based), "
+                           "or `random` (pseudo random patterns seeded by run id and pfn, numpy based)."
                            "[default: %default]")
 
+    parser.add_option("--galloping-window",dest="galloping_window",
+                      default=64,type=int,
+                      help="The `galloping` test checks the GALLOPING_WINDOW bytes before and after each byte. "
+                           "The runtime per frame grows linearly with the window. [default: %default]")
+
+    parser.add_option("--galloping-aligned",dest="galloping_aligned",
+                      default=False,action="store_true",
+                      help="The `galloping` test checks the naturally aligned block of GALLOPING_WINDOW bytes "
+                           "(e.g. 64 for a cache line) around each byte instead.")
+
+    parser.add_option("--retention-interval",dest="retention_interval",
+                      default=60,type=int,metavar="RETENTION_INTERVAL",
+                      help="The `retention` test keeps each block claimed for RETENTION_INTERVAL seconds between writing and verifying it. "
+                           "Other blocks are tested meanwhile. [default: %default]")
+
+    parser.add_option("--max-pending-blocks",dest="max_pending_blocks",
+                      default=8,type=int,
+                      help="The `retention` test holds at most MAX_PENDING_BLOCKS blocks (of up to 100 frames) at a time. [default: %default]")
+
+    parser.add_option("--hammer-count",dest="hammer_count",
+                      default=100000,type=int,
+                      help="The `hammer` test reads both neighbours of each victim frame HAMMER_COUNT times per round. [default: %default]")
+
+    parser.add_option("--hammer-time-budget",dest="hammer_time_budget",
+                      default=2.0,type=float,metavar="SECONDS",
+                      help="The `hammer` test stops hammering a block after SECONDS, so no frame is held much longer. [default: %default]")
+
+    parser.add_option("--coherency-workers",dest="coherency_workers",
+                      default=2,type=int,
+                      help="Number of worker processes of the `coherency` test. [default: %default]")
+
+    parser.add_option("--coherency-cpus",dest="coherency_cpus",
+                      default=None,metavar="CPUS",
+                      help="Comma separated cpus the `coherency` workers are pinned to, one per worker. [default: spread over the sockets]")
+
+    parser.add_option("--coherency-duration",dest="coherency_duration",
+                      default=0.1,type=float,metavar="SECONDS",
+                      help="The `coherency` test repeats its rounds for SECONDS per block. [default: %default]")
+
+    parser.add_option("--stress-duration",dest="stress_duration",
+                      default=0.5,type=float,metavar="SECONDS",
+                      help="The `stress` test streams over each block for SECONDS. [default: %default]")
+
+    parser.add_option("--triage",dest="triage",
+                      default=False,action="store_true",
+                      help="Triage mode (blockwise only, numpy based): test 1 cache line in SAMPLE_STRIDE of each frame, rotating lines and patterns every round, "
+                           "and test frames that fail the sample or had errors before with the TEST_ALGORITHM.")
+
+    parser.add_option("--sample-stride",dest="sample_stride",
+                      default=8,type=int,
+                      help="The --triage mode tests 1 cache line in SAMPLE_STRIDE. [default: %default]")
+
+    parser.add_option("--policy",dest="policy",
+                      default=False,action="store_true",
+                      help="Tiered mode (blockwise only): test frames with the TEST_ALGORITHM, but frames that had errors and their neighbours "
+                           "with the DEEP_TEST_ALGORITHM. Frames that could not be claimed MAX_CLAIM_FAILURES times in a row are tried less often.")
+
+    parser.add_option("--deep-test-algorithm",dest="deep_algorithm",type="choice",
+                      default="march-c-",choices=["linear","quadratic","galloping","hammer","wordwise","mats+","march-c-","march-b","bitwise","random"],
+                      help="The test algorithm for suspect frames in the --policy mode, see --test-algorithm. [default: %default]")
+
+    parser.add_option("--suspect-distance",dest="suspect_distance",
+                      default=1,type=int,metavar="FRAMES",
+                      help="In the --policy mode frames at most FRAMES pfns away from a frame with errors are suspects. [default: %default]")
+
+    parser.add_option("--max-claim-failures",dest="max_claim_failures",
+                      default=3,type=int,
+                      help="In the --policy mode frames that could not be claimed MAX_CLAIM_FAILURES times in a row are only tried "
+                           "every CLAIM_RETRY_INTERVAL seconds (doubling with each further failure). [default: %default]")
+
+    parser.add_option("--claim-retry-interval",dest="claim_retry_interval",
+                      default=60*60*24,type=int,metavar="SECONDS",
+                      help="See --max-claim-failures. [default: %default]")
+
+    parser.add_option("--edac-root",dest="edac_root",
+                      default="/sys/devices/system/edac",
+                      help="Read the corrected error counters of the memory controllers from EDAC_ROOT/mc/mc* before and after each block "
+                           "and record new corrected errors for the frames of the block (blockwise only). [default: %default]")
+
+    parser.add_option("--no-edac",dest="edac",
+                      default=True,action="store_false",
+                      help="Do not read the EDAC corrected error counters.")
+
+    parser.add_option("--sources",dest="sources",
+                      default="free-buddy",
+                      help="Comma separated list of the sources frames are claimed from: " + ", ".join(sorted(SOURCES)) + ". "
+                           "The hw-poison sources migrate the content of frames in use before they are tested. [default: %default]")
+
+    parser.add_option("--run-id",dest="run_id",
+                      default=None,type=int,
+                      help="Seed of the `random` test. Pass the run id of an earlier run to reproduce its patterns. [default: the current time]")
+
+    parser.add_option("--evict-cache",dest="evict_cache",
+                      default=False,action="store_true",
+                      help="Evict the CPU caches between writing and verifying a block, so that the verification reads from DRAM. "
+                           "Supported by the " + ", ".join(EVICTING_ALGORITHMS) + " test algorithms.")
+
+    parser.add_option("--eviction-size",dest="eviction_size",
+                      default=None,type=int,metavar="MIB",
+                      help="Size of the buffer used by --evict-cache in MiB. [default: twice the last level cache]")
+
+    parser.add_option("--fault-reports",dest="fault_reports",type="choice",
+                      default="summary",choices=["summary","every"],
+                      help="How bad memory is reported: one `summary` per bad frame or `every` bad byte/word."
+                           "[default: %default]")
+
+    parser.add_option("--patterns",dest="patterns",
+                      default=",".join(tester.LinearScanner.PATTERNS),
+                      help="Comma separated list of the patterns written by the `linear` test, one pass each: " + ", ".join(tester.patterns.names()) + ". "
+                           "[default: %default]")
+
+    parser.add_option("--fused-passes",dest="fused_passes",
+                      default=False,action="store_true",
+                      help="The `linear` test verifies a pattern and writes the next one in the same sweep over the block "
+                           "(PATTERNS + 1 instead of 2 * PATTERNS sweeps).")
+
+    parser.add_option("--random-order",dest="random_order",
+                      default=False,action="store_true",
+                      help="Visit the cache lines of each block in a random order (a new one every round) instead of ascending offsets, "
+                           "so that the hardware prefetchers cannot hide latencies. Supported by the " + ", ".join(ORDERED_ALGORITHMS) + " test algorithms.")
+
+    parser.add_option("--threads",dest="threads",
+                      default=1,type=int,
+                      help="Test the frames of a block in THREADS threads. Only numpy, ctypes and digest work runs in parallel. [default: %default]")
+
+    parser.add_option("--cpu-budget",dest="cpu_budget",
+                      default=0.5,type=float,metavar="FRACTION",
+                      help="Use at most FRACTION of the online CPUs for --threads. [default: %default]")
+
+    parser.add_option("--time-slice",dest="time_slice",
+                      default=0.0,type=float,metavar="SECONDS",
+                      help="Run the tests in time slices of SECONDS, pausing --slice-pause seconds after each slice. "
+                           "Testers are interrupted between passes (linear tests) or chunks (quadratic test). 0 disables slicing. [default: %default]")
+
+    parser.add_option("--slice-pause",dest="slice_pause",
+                      default=0.0,type=float,metavar="SECONDS",
+                      help="Pause after each --time-slice. [default: %default]")
+
+    parser.add_option("--min-available-memory",dest="min_available_memory",
+                      default=None,type=int,metavar="MB",
+                      help="Abort the test of a block (and release its frames) when less than MB megabytes are available (MemAvailable).")
+
+    parser.add_option("--max-memory-pressure",dest="max_memory_pressure",
+                      default=None,type=float,metavar="PERCENT",
+                      help="Abort the test of a block (and release its frames) when the memory pressure (PSI some avg10) exceeds PERCENT.")
+
+    parser.add_option("--pressure-backoff",dest="pressure_backoff",
+                      default=60,type=int,metavar="SECONDS",
+                      help="Wait SECONDS before the next round after an abort because of memory pressure. [default: %default]")
+
+    parser.add_option("--implementation",dest="implementation",type="choice",
+                      default="auto",choices=["auto"] + list(tester.IMPLEMENTATIONS),
+                      help="Implementation of the `linear` and `quadratic` test algorithms: `python` (bytewise), `buffer` (slices), "
+                           "`numpy` or `ctypes` (libc). `auto` picks the fastest, see --calibrate, or `buffer` with --verification=digest. [default: %default]")
+
+    parser.add_option("--calibrate",dest="calibrate",
+                      default=False,action="store_true",
+                      help="Benchmark the implementations of the test algorithm again instead of using the results cached in STATUS_FILE.calibration.")
+
+    parser.add_option("--print-calibration",dest="print_calibration",
+                      default=False,action="store_true",
+                      help="Print the cached (or with --calibrate: new) calibration results of the test algorithm and exit.")
+
+    parser.add_option("--verification",dest="verification",type="choice",
+                      default="compare",choices=["compare","digest"],
+                      help="How the slice based tests (linear, quadratic, galloping, retention, hammer) verify written patterns: `compare` the bytes, or compare the `digest` of each frame with the digest "
+                           "of the pattern (see --digest). Bad frames are compared byte by byte in both cases. Digests need the `buffer` --implementation. [default: %default]")
+
+    parser.add_option("--digest",dest="digest",type="choice",
+                      default="blake2b" if "blake2b" in tester.DIGESTS else "sha1",choices=sorted(tester.DIGESTS),
+                      help="Digest used by --verification=digest: " + ", ".join(sorted(tester.DIGESTS)) + ". [default: %default]")
+
+    parser.add_option("--digest-log",dest="digest_log",
+                      default=None,metavar="PATH",
+                      help="Append the digests of each tested frame to PATH (implies --verification=digest).")
+
     parser.add_option("-f", "--report-frequency",dest="report_every",
                       default=50,type=int ,
                       help="Report performance statistics every REPORT_EVERY frames. `0` disables this report."
@@ -194,10 +502,116 @@ if __name__ == '__main__':
     if len(args) != 0:
         parser.error("No arguments supported!")
 
+    options.patterns = tuple(name.strip() for name in options.patterns.split(",") if name.strip())
+    unknown_patterns = [name for name in options.patterns if not name in tester.patterns.names()]
+    if unknown_patterns or not options.patterns:
+        parser.error("Unknown patterns '%s', known patterns: %s" % (",".join(unknown_patterns), ", ".join(tester.patterns.names())))
+
     if options.report_every < 0:
         parser.error("report-frequency must be > 0")
 
+    if options.galloping_window < 1:
+        parser.error("galloping-window must be > 0")
+
+    if options.threads < 1 or not (0 < options.cpu_budget <= 1):
+        parser.error("threads must be > 0 and cpu-budget in (0, 1]")
+
+    if options.threads > 1 and (options.evict_cache or "retention" == options.algorithm):
+        parser.error("--threads cannot be combined with --evict-cache or the `retention` test")
+
+    if options.time_slice < 0 or options.slice_pause < 0 or options.pressure_backoff < 0:
+        parser.error("time-slice, slice-pause and pressure-backoff must be >= 0")
+
+    pressure = None
+    if options.min_available_memory is not None or options.max_memory_pressure is not None:
+        pressure = tester.MemoryPressure(options.min_available_memory * 1024 * 1024 if options.min_available_memory is not None else None,
+                                         options.max_memory_pressure)
+
+    slicer = None
+    if options.time_slice > 0 or pressure:
+        if "retention" == options.algorithm:
+            parser.error("The `retention` test cannot be time sliced")
+        slicer = tester.TimeSlicer(options.time_slice, options.slice_pause, pressure)
+
+    if options.coherency_workers < 1 or options.coherency_duration < 0:
+        parser.error("coherency-workers must be > 0 and coherency-duration >= 0")
+
+    if options.coherency_cpus:
+        try:
+            options.coherency_cpus = [int(cpu) for cpu in options.coherency_cpus.split(",")]
+        except ValueError:
+            parser.error("coherency-cpus must be a comma separated list of cpu numbers")
+        if len(options.coherency_cpus) < options.coherency_workers:
+            parser.error("coherency-cpus must name one cpu per worker")
+
+    if "coherency" == options.algorithm and options.threads > 1:
+        parser.error("The `coherency` test runs its own workers, it cannot be combined with --threads")
+
+    if options.stress_duration < 0:
+        parser.error("stress-duration must be >= 0")
+
+    if "stress" == options.algorithm and options.threads > 1:
+        parser.error("The `stress` test measures the bandwidth of one stream, it cannot be combined with --threads")
+
+    if "hammer" == options.algorithm and options.threads > 1:
+        parser.error("The `hammer` test needs the neighbours of each frame in the same tester, it cannot be combined with --threads")
+
+    if options.hammer_count < 1 or options.hammer_time_budget <= 0:
+        parser.error("hammer-count and hammer-time-budget must be > 0")
+
+    if options.triage:
+        if "blockwise" != options.strategy:
+            parser.error("The --triage mode needs the `blockwise` allocation strategy")
+        if "retention" == options.algorithm:
+            parser.error("The --triage mode cannot escalate to the `retention` test")
+        if not tester.SamplingScanner:
+            parser.error("The --triage mode needs numpy")
+        if options.sample_stride < 1:
+            parser.error("sample-stride must be > 0")
+
+    if options.policy:
+        if "blockwise" != options.strategy:
+            parser.error("The --policy mode needs the `blockwise` allocation strategy")
+        if options.triage or "retention" == options.algorithm:
+            parser.error("The --policy mode cannot be combined with --triage or the `retention` test")
+        if options.suspect_distance < 0 or options.max_claim_failures < 1 or options.claim_retry_interval < 0:
+            parser.error("suspect-distance and claim-retry-interval must be >= 0, max-claim-failures > 0")
+
+    source_names = [name.strip() for name in options.sources.split(",") if name.strip()]
+    unknown_sources = [name for name in source_names if not name in SOURCES]
+    if unknown_sources or not source_names:
+        parser.error("Unknown sources '%s', known sources: %s" % (",".join(unknown_sources), ", ".join(sorted(SOURCES))))
+    if "retention" == options.algorithm:
+        if "blockwise" != options.strategy:
+            parser.error("The `retention` test needs the `blockwise` allocation strategy")
+        if options.retention_interval < 1 or options.max_pending_blocks < 1:
+            parser.error("retention-interval and max-pending-blocks must be > 0")
+        retention_seconds = options.retention_interval
+    else:
+        retention_seconds = 0
+
     path = options.status_file
+
+    if options.digest_log:
+        options.verification = "digest"
+
+    if ("digest" == options.verification) and tester.implementations(options.algorithm):
+        # The other implementations compare by themselves and would skip the digests
+        if "auto" == options.implementation:
+            options.implementation = "buffer"
+        elif "buffer" != options.implementation:
+            parser.error("--verification=digest needs the `buffer` implementation of the `%s` test algorithm" % options.algorithm)
+
+    if ("auto" == options.implementation) or options.print_calibration:
+        fastest_implementation = calibrate_implementation(options.algorithm, options, path + ".calibration", options.calibrate)
+
+    if "auto" == options.implementation:
+        implementation = fastest_implementation
+    else:
+        implementation = options.implementation
+
+    if options.print_calibration:
+        sys.exit(0)
  
     timestamping = status.TimestampingFacility()
     
@@ -213,27 +627,106 @@ if __name__ == '__main__':
         frame_config_class = scheduling.blockwise.get_frame_config_class()
 
     cfg = status.FileBasedConfiguration(path, num_frames, frame_config_class)
+    try:
+        cfg.open().close()
+    except ValueError as e:
+        parser.error(str(e))
                 
     device_name = "/dev/phys_mem"
     physmem_dev  = physmem.Physmem(device_name)
     
-    allowed_sources = physmem.SOURCE_FREE_BUDDY_PAGE
+    allowed_sources = 0
+    for name in source_names:
+        allowed_sources |= SOURCES[name]
 
 
-    if  "linear" == options.algorithm:
-        test = tester.LinearScanner(PrintTestReporting())
-    elif "quadratic" == options.algorithm:
-        test = tester.QuadraticScanner(PrintTestReporting())
+    if options.run_id is None:
+        options.run_id = int(time.time())
 
-
-    reporting = PrintSchedulerReporting(options.report_every)
+    evictor = None
+    # A block fits into the last level cache, the `stress` test needs the evictor to stream from DRAM
+    if options.evict_cache or "stress" == options.algorithm:
+        if not options.algorithm in EVICTING_ALGORITHMS:
+            parser.error("--evict-cache is only supported by the %s test algorithms" % ", ".join(EVICTING_ALGORITHMS))
+        if options.eviction_size:
+            eviction_size = options.eviction_size * 1024 * 1024
+        else:
+            llc_size = tester.last_level_cache_size()
+            if not llc_size:
+                parser.error("Cannot determine the size of the last level cache, please pass --eviction-size")
+            eviction_size = 2 * llc_size
+        evictor = tester.CacheEvictor(eviction_size)
+
+    if options.digest_log:
+        digest_log = tester.DigestLog(open(options.digest_log, "a"), options.digest)
+    else:
+        digest_log = None
+
+    if "digest" == options.verification:
+        tester.set_verification(tester.DigestVerification(options.digest, digest_log))
+
+    order = None
+    if options.random_order:
+        if not options.algorithm in ORDERED_ALGORITHMS:
+            parser.error("--random-order is only supported by the %s test algorithms" % ", ".join(ORDERED_ALGORITHMS))
+        if not tester.RandomLineOrder:
+            parser.error("--random-order needs numpy")
+        order = tester.RandomLineOrder(options.run_id)
+
+    if "summary" == options.fault_reports:
+        test_reporting = tester.SummarizingTestReporting(print_fault_record)
+    else:
+        test_reporting = PrintTestReporting()
+
+    try:
+        test = new_frame_test(options.algorithm, options, test_reporting, evictor, implementation, order)
+        # Kept for the throughput, the test may be wrapped below
+        coherency_test = test if "coherency" == options.algorithm else None
+        hammer_test = test if "hammer" == options.algorithm else None
+        stress_test = test if "stress" == options.algorithm else None
+        deep_test = None
+        if options.policy:
+            deep_test = new_frame_test(options.deep_algorithm, options, test_reporting,
+                                       evictor if options.deep_algorithm in EVICTING_ALGORITHMS else None, None,
+                                       order if options.deep_algorithm in ORDERED_ALGORITHMS else None)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    threads = tester.pool_size(options.threads, options.cpu_budget)
+    if threads > 1:
+        test = tester.ParallelTest(lambda reporting: new_frame_test(options.algorithm, options, reporting, evictor, implementation, order),
+                                   test_reporting, threads)
+
+    escalation_test = None
+    if options.triage:
+        escalation_test = test
+        test = tester.SamplingScanner(test_reporting, options.sample_stride)
+
+    edac = None
+    if options.edac and "blockwise" == options.strategy and "retention" != options.algorithm:
+        edac = scheduling.EdacCounters(options.edac_root)
+        if not edac.paths:
+            edac = None
+
+    policy = None
+    if deep_test:
+        policy = scheduling.TieredPolicy(test, deep_test, timestamping, options.suspect_distance, options.max_claim_failures, options.claim_retry_interval)
+
+    reporting = PrintSchedulerReporting(options.report_every, evictor)
     
     if  "frame-by-frame" == options.strategy:
-        scheduler_factory = scheduling.simple.SimpleSchedulerFactory(physmem_dev, test,  pageflags, pagecount, reporting)
+        scheduler_factory = scheduling.simple.SimpleSchedulerFactory(physmem_dev, test,  pageflags, pagecount, reporting, slicer)
     elif "blockwise" == options.strategy:
-        scheduler_factory =  scheduling.blockwise.SimpleBlockwiseSchedulerFactory(physmem_dev, test, pageflags, pagecount, timestamping, reporting)
+        scheduler_factory =  scheduling.blockwise.SimpleBlockwiseSchedulerFactory(physmem_dev, test, pageflags, pagecount, timestamping, reporting,
+                                                                                  retention_seconds, options.max_pending_blocks, escalation_test, slicer, policy, edac)
 
     print "Using the '%s' with a '%s' test algorithm" % (scheduler_factory.name(), test.name())
+    if escalation_test:
+        print "Escalating suspicious frames to the '%s' test algorithm" % escalation_test.name()
+    if edac:
+        print "Correlating with the corrected error counters of %d EDAC locations" % len(edac.paths)
+    if policy:
+        print "Testing frames with errors and their neighbours with the '%s' test algorithm" % deep_test.name()
 
     while True:
         with cfg.open() as s:
@@ -241,11 +734,29 @@ if __name__ == '__main__':
                 
         with cfg.open() as s:
             reporting.reset()
+            if order:
+                order.next_round()
 
             scheduler = scheduler_factory.new_instance(s)
             scheduler.run(0,num_frames, allowed_sources)
             
             reporting.print_stats()
+            if coherency_test:
+                print("\tCoherency test: %d rounds, %.1f MiB/s by %d workers" % (coherency_test.round, coherency_test.throughput() / (1 << 20), coherency_test.workers))
+            if hammer_test:
+                print("\tHammer test: %d reads of aggressor frames from DRAM" % hammer_test.activations)
+            if stress_test:
+                for cached, label in ((False, "Bandwidth"), (True, "Cache bandwidth")):
+                    for node, bytes_per_second in sorted(stress_test.bandwidth_by_node(cached).items()):
+                        print("\t%s of node %s: %.1f MiB/s" % (label, "?" if node is None else node, bytes_per_second / (1 << 20)))
+
+            if "summary" == options.fault_reports:
+                dropped_faults, dropped_summaries = test_reporting.close()
+                if dropped_faults or dropped_summaries:
+                    print("\t%d faults and %d frame summaries were not reported this round (too many bad frames)" % (dropped_faults, dropped_summaries))
+
+        if scheduler.aborted:
+            time.sleep(options.pressure_backoff)
         
     with cfg.open() as s:
         print_stats(s,timestamping) 
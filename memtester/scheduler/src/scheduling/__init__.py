@@ -24,3 +24,5 @@ THE SOFTWARE.
 import simple
 import blockwise
 
+from policy import TieredPolicy
+from edac import EdacCounters
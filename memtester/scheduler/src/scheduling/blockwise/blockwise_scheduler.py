@@ -23,16 +23,22 @@ THE SOFTWARE.
 '''
 
 import frame
+import heapq
 import physmem
+import tester
+import time
 
 
 def get_frame_config_class():
         return frame.FrameStatus
 
 class SimpleBlockwiseSchedulerFactory():
-    def __init__(self, physmem_device,frame_test,  kpageflags, kpagecount, timestamping, reporting):
+    def __init__(self, physmem_device,frame_test,  kpageflags, kpagecount, timestamping, reporting, retention_seconds = 0, max_pending_blocks = 8,
+                 escalation_test = None, slicer = None, policy = None, edac = None):
         '''
         Constructor
+        retention_seconds > 0 enables the retention mode, escalation_test the triage mode, slicer the
+        time sliced mode, policy the tiered mode, edac the ECC correlation (see SimpleBlockwiseScheduler)
         '''
         self.kpageflags = kpageflags
         self.kpagecount = kpagecount
@@ -42,19 +48,75 @@ class SimpleBlockwiseSchedulerFactory():
         self.max_untested_age = self.timestamping.seconds_to_timestamp( 60*60*24  )
         self.max_untested_age = 0
         self.reporting =  reporting
+        self.retention_seconds = retention_seconds
+        self.max_pending_blocks = max_pending_blocks
+        self.escalation_test = escalation_test
+        self.slicer = slicer
+        self.policy = policy
+        self.edac = edac
 
     def new_instance(self, frame_stati):
-       return SimpleBlockwiseScheduler( self.physmem_device, self.frame_test, frame_stati, self.kpageflags, self.kpagecount, self.timestamping, self.reporting)
+       return SimpleBlockwiseScheduler( self.physmem_device, self.frame_test, frame_stati, self.kpageflags, self.kpagecount, self.timestamping, self.reporting,
+                                        self.retention_seconds, self.max_pending_blocks, self.escalation_test, self.slicer, self.policy, self.edac)
 
     def name(self):
         return "Blockwise Allocation Scheduler"
     
+class PendingRetentionTest(object):
+    '''
+    A claimed and mapped block that waits for the verification of a retention test pass
+    '''
+
+    def __init__(self, deadline, session, map, results, status_by_pfn, claimed_frames):
+        self.deadline = deadline
+        self.session = session
+        self.map = map
+        self.results = results
+        self.status_by_pfn = status_by_pfn
+        self.claimed_frames = claimed_frames
+        self.offsets = [frame.vma_offset_of_first_byte for frame in claimed_frames]
+        self.pass_number = 0
+        self.is_ok = [True] * len(claimed_frames)
+        # Faults and digests of the block so far (see tester.detach_reports): the offsets of
+        # all pending blocks start at 0
+        self.reports = None
+
+    def __cmp__(self, other):
+        return cmp(self.deadline, other.deadline)
+
+
 class SimpleBlockwiseScheduler(object):
     '''
     This scheduler iterates over all frames in the status and tests the frame, based on the evaluation function
+
+    In retention mode (retention_seconds > 0) each block is claimed in its own physmem session,
+    the tester writes the block (frame_test.write_frames) and the block is kept claimed while the
+    following blocks are processed. After retention_seconds the block is verified
+    (frame_test.verify_frames), then the next pass is written or the block is released.
+    At most max_pending_blocks blocks wait for their verification at any time.
+
+    In triage mode (escalation_test is set) frame_test is a cheap test, e.g. a SamplingScanner.
+    Frames that fail it, and frames with num_errors > 0, are tested with escalation_test
+    right away, while the block is still mapped.
+
+    In time sliced mode (slicer is set, see tester.TimeSlicer) the tests run in slices and pause
+    in between. When the slicer aborts a block (tester.TestAborted, memory pressure) the block is
+    unmapped and released without recording results and run() returns early: aborted is True then.
+
+    In tiered mode (policy is set, see scheduling.TieredPolicy) the policy chooses the test of each
+    frame (policy.test_for) and skips frames that failed claiming too often (policy.should_claim).
+    frame_test is not used then. The frames of a block that share a test are tested together.
+
+    With edac (a scheduling.EdacCounters) the corrected error counters of the memory controllers
+    are read before and after each block is tested. New corrected errors are added to
+    num_corrected_errors of every frame of the block: ECC hides them from the tester, but the
+    block was the memory under test while they happened. The policy is told as well
+    (policy.corrected_errors_seen), it only keeps such frames suspect for a few rounds.
+    Not in retention mode, where blocks wait while others are tested.
     '''
 
-    def __init__(self, physmem_device,frame_test, frame_stati, kpageflags, kpagecount, timestamping, reporting):
+    def __init__(self, physmem_device,frame_test, frame_stati, kpageflags, kpagecount, timestamping, reporting, retention_seconds = 0, max_pending_blocks = 8,
+                 escalation_test = None, slicer = None, policy = None, edac = None):
         '''
         Constructor
         '''
@@ -67,6 +129,23 @@ class SimpleBlockwiseScheduler(object):
         self.max_untested_age = self.timestamping.seconds_to_timestamp( 60*60*24  )
         self.max_untested_age = 0
         self.reporting =  reporting
+        self.retention_seconds = retention_seconds
+        self.max_pending_blocks = max_pending_blocks
+        self.pending_retention_tests = []
+        self.escalation_test = escalation_test
+        self.slicer = slicer
+        self.policy = policy
+        self.edac = edac
+        self.aborted = False
+
+        if retention_seconds > 0 and not hasattr(frame_test, 'verify_frames'):
+            raise ValueError("The retention mode needs a tester with write_frames/verify_frames, not a '%s'" % frame_test.name())
+        if retention_seconds > 0 and escalation_test:
+            raise ValueError("The retention mode cannot be combined with the triage mode")
+        if retention_seconds > 0 and slicer:
+            raise ValueError("The retention mode cannot be combined with the time sliced mode")
+        if policy and (retention_seconds > 0 or escalation_test):
+            raise ValueError("The tiered mode cannot be combined with the retention or the triage mode")
 
     def name(self):
         return "Blockwise Allocation Scheduler"
@@ -79,6 +158,11 @@ class SimpleBlockwiseScheduler(object):
         cur_non_matching = 0
         
         block = []
+
+        for frame_test in self._frame_tests():
+            tester.next_round(frame_test)
+        if self.policy:
+            self.policy.begin_round(self.frame_stati, first_frame, last_frame)
         
         for pfn in xrange(first_frame, last_frame):
             frame_status = self._pfn_status(pfn)
@@ -91,12 +175,27 @@ class SimpleBlockwiseScheduler(object):
                 
             if (len(block) == max_blocksize ) or (cur_non_matching >= max_non_matching): 
                 if (len(block) > 0 ):   
-                    self.test_frames_and_record_result(block, allowed_sources)
+                    self._test_block(block, allowed_sources)
                     block = []
+                    if self.aborted:
+                        return
                 cur_non_matching = 0
 
         if (len(block) > 0  ):
-                self.test_frames_and_record_result(block, allowed_sources)
+                self._test_block(block, allowed_sources)
+
+        # Wait for the last retention tests
+        while self.pending_retention_tests:
+            self._verify_retention_tests(wait = True)
+
+    def _test_block(self, frame_stati, allowed_sources):
+        if self.retention_seconds > 0:
+            self._verify_retention_tests(wait = False)
+            while len(self.pending_retention_tests) >= self.max_pending_blocks:
+                self._verify_retention_tests(wait = True)
+            self.start_retention_test(frame_stati, allowed_sources)
+        else:
+            self.test_frames_and_record_result(frame_stati, allowed_sources)
                 
                 
             
@@ -104,6 +203,9 @@ class SimpleBlockwiseScheduler(object):
         now = self.timestamping.timestamp()
         time_untested = now - frame_status.last_successfull_test
         
+        if self.policy and not self.policy.should_claim(frame_status):
+            return False
+
         return  (time_untested > self.max_untested_age )
 
     def  test_frames_and_record_result(self,frame_stati, allowed_sources):
@@ -114,13 +216,82 @@ class SimpleBlockwiseScheduler(object):
 
         results = self._claim_pfns(pfns, allowed_sources)
 
-        num_frames_claimed = 0
-        
-        for frame in results:
-            if  frame.pfn in status_by_pfn:
-                if frame.is_claimed():    
-                    num_frames_claimed += 1
-                    
+        claimed_frames = [frame for frame in results if (frame.pfn in status_by_pfn) and frame.is_claimed()]
+
+        try:
+            is_ok_by_pfn = self._test_claimed_frames(claimed_frames, status_by_pfn)
+        except tester.TestAborted:
+            # The block is unmapped, give the frames back right away
+            self.physmem_device.configure([])
+            self.aborted = True
+            self._report_aborted_block(pfns)
+            return
+
+        # The block is unmapped now, it is better to handle bad frames after they are unmapped
+        self._record_results(results, status_by_pfn, is_ok_by_pfn, self.physmem_device)
+
+    def start_retention_test(self, frame_stati, allowed_sources):
+        """
+        Claims the frames in a new session and writes the first retention pass.
+        The block is verified by _verify_retention_tests.
+        """
+        status_by_pfn = dict([ (frame_status.pfn, frame_status) for  frame_status in frame_stati])
+
+        session = self.physmem_device.new_session()
+        results = self._claim_pfns([frame_status.pfn for  frame_status in frame_stati], allowed_sources, session)
+        claimed_frames = [frame for frame in results if (frame.pfn in status_by_pfn) and frame.is_claimed()]
+
+        if not claimed_frames:
+            self._record_results(results, status_by_pfn, {}, session)
+            session.close()
+            return
+
+        map = session.mmap(physmem.PAGE_SIZE * len(claimed_frames))
+        pending = PendingRetentionTest(0, session, map, results, status_by_pfn, claimed_frames)
+        self._write_retention_pass(pending)
+
+    def _write_retention_pass(self, pending):
+        self.frame_test.write_frames(pending.map, pending.offsets, physmem.PAGE_SIZE, pending.pass_number)
+        pending.deadline = time.time() + self.retention_seconds
+        heapq.heappush(self.pending_retention_tests, pending)
+
+    def _verify_retention_tests(self, wait):
+        """
+        Verifies all pending retention tests whose deadline has passed. With wait, the
+        test with the earliest deadline is verified in any case (after sleeping until its deadline).
+        """
+        while self.pending_retention_tests:
+            pending = self.pending_retention_tests[0]
+            now = time.time()
+            if pending.deadline > now:
+                if not wait:
+                    return
+                time.sleep(pending.deadline - now)
+            wait = False
+
+            heapq.heappop(self.pending_retention_tests)
+
+            tester.attach_reports(self.frame_test, pending.reports)
+            pass_ok = self.frame_test.verify_frames(pending.map, pending.offsets, physmem.PAGE_SIZE, pending.pass_number)
+            pending.is_ok = [is_ok and bool(ok) for is_ok, ok in zip(pending.is_ok, pass_ok)]
+            pending.pass_number += 1
+
+            if pending.pass_number < self.frame_test.passes():
+                pending.reports = tester.detach_reports(self.frame_test)
+                self._write_retention_pass(pending)
+                continue
+
+            pending.map.close()
+            tester.flush_reports(self.frame_test, dict(zip(pending.offsets, [frame.pfn for frame in pending.claimed_frames])))
+            is_ok_by_pfn = dict((frame.pfn, is_ok) for frame, is_ok in zip(pending.claimed_frames, pending.is_ok))
+            self._record_results(pending.results, pending.status_by_pfn, is_ok_by_pfn, pending.session)
+            pending.session.close()
+
+    def _record_results(self, results, status_by_pfn, is_ok_by_pfn, physmem_device):
+        """
+        Updates the status of each frame in results and marks bad frames via physmem_device.
+        Must be called after the frames are unmapped.
+        """
         for frame in results:
             if  frame.pfn in status_by_pfn:
                 frame_status = status_by_pfn[frame.pfn]
@@ -129,12 +300,9 @@ class SimpleBlockwiseScheduler(object):
                 if frame.is_claimed():
                     frame_status.last_claiming_time_jiffies = frame.allocation_cost_jiffies
                     frame_status.last_successfull_claiming_method = frame.actual_source
+                    frame_status.num_claim_failures = 0
                     
-                    is_ok = False
-                    
-                    with self.physmem_device.mmap(physmem.PAGE_SIZE * num_frames_claimed) as map:
-                        # It is better to handle bad frames after they are unmapped
-                        is_ok = self.frame_test.test(map,frame.vma_offset_of_first_byte  ,physmem.PAGE_SIZE)
+                    is_ok = is_ok_by_pfn[frame.pfn]
         
                     if is_ok:
                         frame_status.has_errors = 0
@@ -142,29 +310,135 @@ class SimpleBlockwiseScheduler(object):
                         self._report_good_frame(frame.pfn)         
                     else:
                         frame_status.num_errors += 1
-                        self.physmem_device.mark_pfn_bad(frame.pfn)
+                        physmem_device.mark_pfn_bad(frame.pfn)
                         self._report_bad_frame(frame.pfn)         
+                else:
+                    frame_status.num_claim_failures += 1
                                
             else:
                 # Hmm, better luck next time
-                self._report_not_aquired_frame(frame_status.pfn)
+                self._report_not_aquired_frame(frame.pfn)
+
+    def _test_claimed_frames(self, claimed_frames, status_by_pfn):
+        """
+        Maps the claimed frames once and tests all of them against that single mapping.
+        In triage mode suspicious frames are tested again with the escalation test.
+        In tiered mode each frame is tested with the test chosen by the policy.
+
+        return: dict pfn -> True, when the frame passed the test
+        """
+        if not claimed_frames:
+            return {}
+
+        offsets = [frame.vma_offset_of_first_byte for frame in claimed_frames]
+        pfns = [frame.pfn for frame in claimed_frames]
+        corrected_errors = self.edac.snapshot() if self.edac else None
+        try:
+            with self.physmem_device.mmap(physmem.PAGE_SIZE * len(claimed_frames)) as map:
+                if self.policy:
+                    block_ok = self._test_tiers(map, offsets, pfns, status_by_pfn)
+                else:
+                    block_ok = [bool(is_ok) for is_ok in self._test_frames(self.frame_test, map, offsets, pfns)]
+
+                if self.escalation_test:
+                    escalated = [index for index, pfn in enumerate(pfns) if not block_ok[index] or status_by_pfn[pfn].num_errors > 0]
+                    if escalated:
+                        escalated_ok = self._test_frames(self.escalation_test, map, [offsets[index] for index in escalated],
+                                                         [pfns[index] for index in escalated])
+                        for index, is_ok in zip(escalated, escalated_ok):
+                            block_ok[index] = block_ok[index] and bool(is_ok)
+                            self._report_escalated_frame(pfns[index])
+        finally:
+            # Faults found before an abort (tester.TestAborted) belong to this block, too
+            flushed = []
+            for frame_test in self._frame_tests():
+                reporting = getattr(frame_test, 'reporting', None)
+                if not any(reporting is other for other in flushed):
+                    tester.flush_reports(frame_test, dict(zip(offsets, pfns)))
+                    flushed.append(reporting)
+
+        if self.edac:
+            self._record_corrected_errors(pfns, status_by_pfn, self.edac.delta(corrected_errors))
+
+        return dict((frame.pfn, is_ok) for frame, is_ok in zip(claimed_frames, block_ok))
+
+    def _record_corrected_errors(self, pfns, status_by_pfn, increases):
+        """
+        Adds the new corrected errors (dict location -> count, see EdacCounters.delta) to each frame in pfns
+        """
+        if not increases:
+            return
+
+        total = sum(increases.values())
+        for pfn in pfns:
+            status_by_pfn[pfn].num_corrected_errors += total
+        if self.policy:
+            self.policy.corrected_errors_seen(pfns)
+
+        report_corrected_errors = getattr(self.reporting, 'report_corrected_errors', None)
+        if report_corrected_errors:
+            report_corrected_errors(pfns, increases)
+
+    def _test_tiers(self, map, offsets, pfns, status_by_pfn):
+        """
+        Tests each frame with the test the policy chooses, the frames of one test in one call.
+
+        return: list of booleans, True for each frame that passed its test
+        """
+        block_ok = [True] * len(offsets)
+        for frame_test in self.policy.tests():
+            indices = [index for index, pfn in enumerate(pfns) if self.policy.test_for(status_by_pfn[pfn]) is frame_test]
+            if not indices:
+                continue
+            tier_ok = self._test_frames(frame_test, map, [offsets[index] for index in indices], [pfns[index] for index in indices])
+            for index, is_ok in zip(indices, tier_ok):
+                block_ok[index] = bool(is_ok)
+        return block_ok
+
+    def _frame_tests(self):
+        """
+        All tests the scheduler runs: frame_test, the escalation test or the tests of the policy
+        """
+        if self.policy:
+            return self.policy.tests()
+        if self.escalation_test:
+            return [self.frame_test, self.escalation_test]
+        return [self.frame_test]
+
+    def _test_frames(self, frame_test, map, offsets, pfns):
+        if self.slicer:
+            return self.slicer.run(frame_test, map, offsets, physmem.PAGE_SIZE, pfns)
+        return tester.test_frames(frame_test, map, offsets, physmem.PAGE_SIZE, pfns)
 
     def _report_not_aquired_frame(self, pfn):
         pass
             
+    def _report_escalated_frame(self, pfn):
+        report_escalated_frame = getattr(self.reporting, 'report_escalated_frame', None)
+        if report_escalated_frame:
+            report_escalated_frame(pfn)
+
+    def _report_aborted_block(self, pfns):
+        report_aborted_block = getattr(self.reporting, 'report_aborted_block', None)
+        if report_aborted_block:
+            report_aborted_block(pfns)
+
     def _report_good_frame(self, pfn):
         self.reporting.report_good_frame(pfn)
 
     def _report_bad_frame(self, pfn):
         self.reporting.report_bad_frame(pfn)
     
-    def _claim_pfns(self, pfns,allowed_sources):
+    def _claim_pfns(self, pfns,allowed_sources, physmem_device = None):
+        if not physmem_device:
+            physmem_device = self.physmem_device
+
         requests = []
         for pfn in pfns:
             requests.append(physmem.Phys_mem_frame_request(pfn, allowed_sources))
          
-        self.physmem_device.configure(requests)
-        config = self.physmem_device.read_configuration()
+        physmem_device.configure(requests)
+        config = physmem_device.read_configuration()
         
         if not ( len(requests) ==  len(config) ) :
             # Error
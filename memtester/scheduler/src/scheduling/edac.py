@@ -0,0 +1,80 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import glob
+import os
+
+
+def _read_count(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (IOError, ValueError):
+        return None
+
+
+class EdacCounters(object):
+    '''
+    Reads the corrected error (CE) counters of the EDAC memory controllers in {edac_root}/mc/mc*.
+    Per controller the finest counters available are used: per DIMM/rank (dimm*/dimm_ce_count,
+    rank*/dimm_ce_count), else per chip select row (csrow*/ce_count), else the controller total
+    (ce_count). Locations are named like `mc0/dimm3`.
+
+    Without EDAC (no driver loaded, no ECC memory) there are no counters and snapshots are empty.
+    '''
+
+    def __init__(self, edac_root='/sys/devices/system/edac'):
+        self.paths = {}
+        for mc in sorted(glob.glob(os.path.join(edac_root, 'mc', 'mc[0-9]*'))):
+            paths = glob.glob(os.path.join(mc, 'dimm[0-9]*', 'dimm_ce_count')) + glob.glob(os.path.join(mc, 'rank[0-9]*', 'dimm_ce_count'))
+            if not paths:
+                paths = glob.glob(os.path.join(mc, 'csrow[0-9]*', 'ce_count'))
+            if not paths:
+                paths = glob.glob(os.path.join(mc, 'ce_count'))
+            for path in paths:
+                location = os.path.relpath(os.path.dirname(path), os.path.dirname(mc))
+                self.paths[location] = path
+
+    def snapshot(self):
+        """
+        return: dict location -> corrected error count
+        """
+        counts = {}
+        for location, path in self.paths.iteritems():
+            count = _read_count(path)
+            if count is not None:
+                counts[location] = count
+        return counts
+
+    def delta(self, before):
+        """
+        The corrected errors since the snapshot before. Counters that went down (reset) are ignored.
+
+        return: dict location -> number of new corrected errors, only locations that have some
+        """
+        increases = {}
+        for location, count in self.snapshot().iteritems():
+            if location in before and count > before[location]:
+                increases[location] = count - before[location]
+        return increases
@@ -0,0 +1,110 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+class TieredPolicy(object):
+    '''
+    Chooses the test of each frame from its FrameStatus history (see SimpleBlockwiseScheduler):
+
+    - Frames that have seen errors (num_errors > 0, or new corrected errors while they were
+      tested in this or the last corrected_error_rounds rounds, see corrected_errors_seen) and
+      their neighbours, i.e. frames at most suspect_distance pfns away from such a frame, are
+      suspects: they get deep_test (e.g. a march or the galloping test). num_corrected_errors
+      is not used: a corrected error is counted for every frame of the block it was seen in,
+      and the counter never decays.
+    - All other frames, new and long untested ones included, get sweep_test (e.g. the linear test).
+    - Frames that could not be claimed max_claim_failures times in a row are deprioritised:
+      they are only tried again when their last claiming attempt is claim_retry_seconds ago,
+      an interval that doubles with each further failure (up to 64 times).
+
+    The neighbours are looked up in the status when a frame is tested, so frames that fail during
+    a round make their neighbours suspects for the rest of the round.
+    '''
+
+    SWEEP = "sweep"
+    DEEP = "deep"
+
+    def __init__(self, sweep_test, deep_test, timestamping, suspect_distance=1, max_claim_failures=3, claim_retry_seconds=60*60*24,
+                 corrected_error_rounds=1):
+        self.sweep_test = sweep_test
+        self.deep_test = deep_test
+        self.timestamping = timestamping
+        self.suspect_distance = suspect_distance
+        self.max_claim_failures = max_claim_failures
+        self.claim_retry_seconds = claim_retry_seconds
+        self.corrected_error_rounds = corrected_error_rounds
+        self.frame_stati = None
+        self.num_frames = 0
+        self.round = 0
+        # pfn -> round of the last corrected errors seen while the frame was tested
+        self.corrected_error_round_by_pfn = {}
+
+    def tests(self):
+        return [self.sweep_test, self.deep_test]
+
+    def begin_round(self, frame_stati, first_frame, last_frame):
+        """
+        frame_stati (a status.FileBasedConfiguration or a list, indexed by pfn) is where the
+        neighbours of the tested frames are looked up in this round.
+        """
+        self.frame_stati = frame_stati
+        get_record_count = getattr(frame_stati, 'get_record_count', None)
+        self.num_frames = get_record_count() if get_record_count else len(frame_stati)
+
+        self.round += 1
+        self.corrected_error_round_by_pfn = dict((pfn, seen) for pfn, seen in self.corrected_error_round_by_pfn.iteritems()
+                                                 if self.round - seen <= self.corrected_error_rounds)
+
+    def corrected_errors_seen(self, pfns):
+        """
+        New corrected errors were counted while the frames pfns were tested
+        """
+        for pfn in pfns:
+            self.corrected_error_round_by_pfn[pfn] = self.round
+
+    def is_bad(self, pfn):
+        return self.frame_stati[pfn].num_errors > 0 or pfn in self.corrected_error_round_by_pfn
+
+    def should_claim(self, frame_status):
+        """
+        False for frames that failed claiming too often and are not due for a retry
+        """
+        failures = frame_status.num_claim_failures
+        if failures < self.max_claim_failures:
+            return True
+
+        retry_seconds = self.claim_retry_seconds * 2 ** min(failures - self.max_claim_failures, 6)
+        return self.timestamping.timestamp() - frame_status.last_claiming_attempt >= self.timestamping.seconds_to_timestamp(retry_seconds)
+
+    def tier_of(self, frame_status):
+        pfn = frame_status.pfn
+        for neighbour in xrange(max(0, pfn - self.suspect_distance), min(self.num_frames, pfn + self.suspect_distance + 1)):
+            if self.is_bad(neighbour):
+                return self.DEEP
+        return self.SWEEP
+
+    def test_for(self, frame_status):
+        if self.DEEP == self.tier_of(frame_status):
+            return self.deep_test
+        return self.sweep_test
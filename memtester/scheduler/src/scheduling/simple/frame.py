@@ -36,7 +36,9 @@ class FrameStatus(Structure):
     _fields_ = [("last_successfull_test", c_uint64), ("last_failed_test", c_uint64), ("last_claiming_time_jiffies", c_uint64), 
                       ("last_claiming_attempt", c_uint64),
                       ("num_errors", c_uint32),
-                      ("last_successfull_claiming_method", c_uint32)]
+                      ("last_successfull_claiming_method", c_uint32),
+                      ("num_claim_failures", c_uint32),
+                      ("num_corrected_errors", c_uint32)]
     
     def __str__(self):
         return " num_errors: %4.d, last_successfull_test: %10.d" %(self.num_errors, self.last_successfull_test)
@@ -26,6 +26,7 @@ import frame
 import time
 import physmem
 import sys
+import tester
 
 
 def get_frame_config_class():
@@ -33,7 +34,7 @@ def get_frame_config_class():
 
 
 class SimpleSchedulerFactory:
-    def __init__(self,  physmem_device, frame_test, kpageflags, kpagecount, reporting):
+    def __init__(self,  physmem_device, frame_test, kpageflags, kpagecount, reporting, slicer = None):
         '''
         Constructor
         '''
@@ -42,9 +43,10 @@ class SimpleSchedulerFactory:
         self.physmem_device = physmem_device
         self.frame_test = frame_test
         self.reporting = reporting
+        self.slicer = slicer
 
     def new_instance(self, frame_stati):
-        return SimpleScheduler(self.physmem_device,self.frame_test, frame_stati, self.kpageflags, self.kpagecount, self.reporting)
+        return SimpleScheduler(self.physmem_device,self.frame_test, frame_stati, self.kpageflags, self.kpagecount, self.reporting, self.slicer)
 
     def name(self):
         return "Simple Scheduler"
@@ -53,9 +55,12 @@ class SimpleSchedulerFactory:
 class SimpleScheduler(object):
     '''
     This scheduler iterates over all frames in the status and tests the frame, based on the evaluation function
+
+    With a slicer (see tester.TimeSlicer) each frame is tested in time slices. When the slicer
+    aborts (tester.TestAborted) the frame is released without a result and run() returns: aborted is True then.
     '''
 
-    def __init__(self, physmem_device,frame_test, frame_stati, kpageflags, kpagecount, reporting):
+    def __init__(self, physmem_device,frame_test, frame_stati, kpageflags, kpagecount, reporting, slicer = None):
         '''
         Constructor
         '''
@@ -65,6 +70,8 @@ class SimpleScheduler(object):
         self.physmem_device = physmem_device
         self.frame_test = frame_test
         self.reporting = reporting
+        self.slicer = slicer
+        self.aborted = False
         
         self.max_untested_age = self._seconds_to_timestamp( 60*60*24  )
         
@@ -77,6 +84,8 @@ class SimpleScheduler(object):
             
             if (self.should_test(frame_status)):
                 self.test_frame_and_record_result(frame_status, allowed_sources)
+                if self.aborted:
+                    return
             
     def  should_test(self,frame_status):
         now = self._timestamp()
@@ -103,12 +112,23 @@ class SimpleScheduler(object):
                 
                 frame_status.last_claiming_time_jiffies = frame.allocation_cost_jiffies
                 frame_status.last_successfull_claiming_method = frame.actual_source
+                frame_status.num_claim_failures = 0
                 
                 is_ok = False
                 
-                with self.physmem_device.mmap(physmem.PAGE_SIZE) as map:
-                    # It is better to handle bad frames after they are unmapped
-                    is_ok = self.frame_test.test(map,0,physmem.PAGE_SIZE)
+                try:
+                    with self.physmem_device.mmap(physmem.PAGE_SIZE) as map:
+                        # It is better to handle bad frames after they are unmapped
+                        if self.slicer:
+                            is_ok = self.slicer.run(self.frame_test, map, [0], physmem.PAGE_SIZE, [frame.pfn])[0]
+                        else:
+                            is_ok = tester.test_frames(self.frame_test, map, [0], physmem.PAGE_SIZE, [frame.pfn])[0]
+                except tester.TestAborted:
+                    self.physmem_device.configure([])
+                    self.aborted = True
+                    return
+                finally:
+                    tester.flush_reports(self.frame_test, {0: frame.pfn})
     
                 if is_ok:
                     frame_status.has_errors = 0
@@ -121,6 +141,7 @@ class SimpleScheduler(object):
                                
             else:
                 # Hmm, better luck next time
+                frame_status.num_claim_failures += 1
                 self._report_not_aquired_frame(frame_status.pfn)
     
     def _claim_pfns(self, pfns,allowed_sources):
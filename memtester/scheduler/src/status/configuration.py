@@ -24,14 +24,49 @@ THE SOFTWARE.
 
 import mmap
 import kpage
+import os
 import struct
 
 from ctypes import *
 import sys
 
+# The file starts with a header: magic, format version and the size of a record.
+# Files with another header are refused, they would be misread.
+HEADER_MAGIC = "KMEMTEST"
+HEADER_VERSION = 1
+_HEADER_FORMAT = "<8sII"
+HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
 
-def _open_create( path, len):
-    """ Open the file and make it the length passed. If the file does not exist, create it and fill it with 0"""
+# Files written before the header was introduced have no header and records of 40 bytes,
+# the first fields of the current records. They are migrated (see _migrate_legacy).
+LEGACY_RECORD_SIZE = 40
+
+# Records copied per read while migrating
+_MIGRATION_RECORDS = 4096
+
+
+def _header(record_size):
+    return struct.pack(_HEADER_FORMAT, HEADER_MAGIC, HEADER_VERSION, record_size)
+
+
+def _check_header(path, existing, record_size):
+    """
+    Raises ValueError if the header existing was not written for records of record_size bytes
+    """
+    if existing == _header(record_size):
+        return
+
+    if len(existing) < HEADER_SIZE or not existing.startswith(HEADER_MAGIC):
+        raise ValueError("The status file %s has no header and no records of %d bytes, it was not written by this program. "
+                         "Remove it to start over." % (path, LEGACY_RECORD_SIZE))
+    magic, version, existing_record_size = struct.unpack(_HEADER_FORMAT, existing)
+    raise ValueError("The status file %s has version %d with records of %d bytes, but version %d uses records of %d bytes. "
+                     "Remove it to start over." % (path, version, existing_record_size, HEADER_VERSION, record_size))
+
+
+def _open_create( path, len, record_size):
+    """ Open the file and make it the length passed. If the file does not exist, create it and fill it with 0.
+    Existing files must have the header for record_size (see _check_header), new files get it."""
     f = None
     try:
         f = open(path, 'r+b')
@@ -40,18 +75,68 @@ def _open_create( path, len):
 
     if not f:
         f = open(path, 'w+b')
+
+    existing = f.read(HEADER_SIZE)
+    if existing and _is_legacy(f, existing, record_size):
+        f = _migrate_legacy(path, f, record_size)
+    elif existing:
+        try:
+            _check_header(path, existing, record_size)
+        except ValueError:
+            f.close()
+            raise
      
     f.seek(len)
     f.truncate()
     f.seek(0)
+    f.write(_header(record_size))
+    f.flush()
+    f.seek(0)
     return f
 
 
+def _is_legacy(f, existing, record_size):
+    """
+    True if f (starting with existing) is a headerless file of LEGACY_RECORD_SIZE byte records
+    that can be migrated to records of record_size bytes
+    """
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(len(existing))
+    return (not existing.startswith(HEADER_MAGIC)) and (size % LEGACY_RECORD_SIZE == 0) and (record_size >= LEGACY_RECORD_SIZE)
+
+
+def _migrate_legacy(path, f, record_size):
+    """
+    Rewrites the headerless file f at path: header and the legacy records as records of
+    record_size bytes, the new fields zeroed. The new file replaces the old one only when it is
+    complete.
+
+    return: the new file, opened like f
+    """
+    padding = "\0" * (record_size - LEGACY_RECORD_SIZE)
+    migrated_path = path + ".migrating"
+    with open(migrated_path, 'wb') as migrated:
+        migrated.write(_header(record_size))
+        f.seek(0)
+        while True:
+            chunk = f.read(LEGACY_RECORD_SIZE * _MIGRATION_RECORDS)
+            if not chunk:
+                break
+            migrated.write("".join(chunk[offset:offset + LEGACY_RECORD_SIZE] + padding
+                                   for offset in xrange(0, len(chunk), LEGACY_RECORD_SIZE)))
+    f.close()
+    os.rename(migrated_path, path)
+    return open(path, 'r+b')
+
+
 class FileBasedConfiguration():
     '''
     Implements a memory-map- based configuration..
     - Each frame is represented by an instance of FrameStatus
     - The frames can be read by using the __getitem__ interface, indexing it by PFN
+    - The records follow a header with the record size, files written for other records are refused (ValueError).
+      Files of the headerless legacy layout are migrated on open
     - The fields inside the returned FrameStatus-instance directly map to the file, i.e.
        CHANGING THE INSTANCE CHANGES THE FILE
        
@@ -85,8 +170,8 @@ class FileBasedConfiguration():
   
     def open(self):
         self.close()
-        size = self.num_frames * self.record_size
-        self.file = _open_create(self.path,  size)
+        size = HEADER_SIZE + self.num_frames * self.record_size
+        self.file = _open_create(self.path,  size, self.record_size)
         fileno = self.file.fileno()
         self.map = mmap.mmap(fileno, size)
         return self
@@ -109,7 +194,7 @@ class FileBasedConfiguration():
     def __getitem__(self, key):
         if not self.file:
             return None
-        offset = key * self.record_size
+        offset = HEADER_SIZE + key * self.record_size
         ret = self.instance_clazz.from_buffer(self.map, offset)
 
         return ret
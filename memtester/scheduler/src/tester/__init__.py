@@ -22,5 +22,69 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 '''
 
+import patterns
+
+from block import test_frames
+from block import flush_reports
+from block import detach_reports
+from block import attach_reports
+from block import next_round
+from block import test_steps
+from block import finish
+
+from slicing import TestAborted
+from slicing import MemoryPressure
+from slicing import TimeSlicer
+
 from linear import LinearScanner
 from quadratic import QuadraticScanner
+from galloping import GallopingScanner
+from retention import RetentionScanner
+from hammer import HammerScanner
+from hammer import ClflushReads
+from coherency import CoherencyTest
+from coherency import spread_cpus
+from stress import BandwidthStressTest
+from stress import NumaTopology
+from preserving import ContentPreservingTest
+from parallel import ParallelTest
+from parallel import pool_size
+
+from eviction import CacheEvictor
+from eviction import last_level_cache_size
+
+from reporting import FaultRecord
+from reporting import BandwidthRecord
+from reporting import SummarizingTestReporting
+
+from buffers import set_verification
+from digest import DIGESTS
+from digest import DigestVerification
+from digest import DigestLog
+
+from calibration import IMPLEMENTATIONS
+from calibration import implementations
+from calibration import calibrate
+from calibration import fastest
+from calibration import format_results
+from calibration import CalibrationCache
+
+try:
+    from wordwise import WordwiseScanner
+    from march import MatsPlus
+    from march import MarchCMinus
+    from march import MarchB
+    from bitwise import BitFaultScanner
+    from prng import RandomPatternScanner
+    from sampling import SamplingScanner
+    from traversal import RandomLineOrder
+except ImportError:
+    # numpy is not installed
+    WordwiseScanner = None
+    MatsPlus = None
+    MarchCMinus = None
+    MarchB = None
+    BitFaultScanner = None
+    RandomPatternScanner = None
+    SamplingScanner = None
+    RandomLineOrder = None
@@ -0,0 +1,157 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+import wordwise
+
+WORD_BITS = 64
+
+_ALTERNATING = numpy.uint64(0x5555555555555555)
+
+
+def _walking_ones():
+    return [numpy.uint64(1 << bit) for bit in xrange(0, WORD_BITS)]
+
+
+def _walking_zeroes():
+    return [~numpy.uint64(1 << bit) for bit in xrange(0, WORD_BITS)]
+
+
+def _moving_inversions():
+    patterns = []
+    for pattern in (wordwise.ALL_ZEROES, _ALTERNATING):
+        patterns += [pattern, ~pattern, pattern]
+    return patterns
+
+
+class BitLaneSyndrome(object):
+    '''
+    Accumulates the XOR syndromes (expected ^ actual) of all passes over a set of frames,
+    one 64 bit lane mask per frame.
+    '''
+
+    def __init__(self, num_frames):
+        # Lanes that read 0 (resp. 1) although 1 (resp. 0) was written
+        self.misread_as_0 = numpy.zeros(num_frames, dtype=numpy.uint64)
+        self.misread_as_1 = numpy.zeros(num_frames, dtype=numpy.uint64)
+        # Lanes that read back a written 1 (resp. 0) correctly in every word of the frame at least once
+        self.correct_as_1 = numpy.zeros(num_frames, dtype=numpy.uint64)
+        self.correct_as_0 = numpy.zeros(num_frames, dtype=numpy.uint64)
+
+    def add(self, expected, syndrome):
+        """
+        expected is the pattern of this pass, syndrome the per frame OR of (expected ^ actual)
+        """
+        self.misread_as_0 |= syndrome & expected
+        self.misread_as_1 |= syndrome & ~expected
+        self.correct_as_1 |= ~syndrome & expected
+        self.correct_as_0 |= ~syndrome & ~expected
+
+    def stuck_at_0(self):
+        """ Lanes that never returned a written 1 """
+        return self.misread_as_0 & ~self.correct_as_1
+
+    def stuck_at_1(self):
+        """ Lanes that never returned a written 0 """
+        return self.misread_as_1 & ~self.correct_as_0
+
+    def coupled(self):
+        """ Lanes that fail only for some patterns, i.e. depend on the other lanes """
+        return (self.misread_as_0 | self.misread_as_1) & ~(self.stuck_at_0() | self.stuck_at_1())
+
+
+class BitFaultScanner(object):
+    '''
+    Runs walking-ones, walking-zeroes and moving-inversions patterns over 64 bit words
+    of all frames of a block. Each pass is verified by one XOR over the block, healthy
+    frames cost nothing beyond that.
+
+    A bad frame is reported once: its first bad word via report_bad_memory(bad_offset,
+    expected_value, actual_value) and, if the reporting implements it, the classification of
+    its bit lanes via report_bit_faults(frame_offset, stuck_at_0, stuck_at_1, coupled).
+    '''
+
+    def __init__(self, reporting, order=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        order (optional) is the order the words of a block are visited in, e.g. a traversal.RandomLineOrder
+        '''
+        self.reporting = reporting
+        self.order = order
+
+    def name(self):
+        return "Bit-level walking ones/zeroes and moving inversions test"
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames (unused by this test).
+
+        return: numpy bool array, True for each frame that passed the test
+        """
+        frames = wordwise.FrameArray(region, offsets, length, self.order)
+        syndrome = BitLaneSyndrome(frames.num_frames)
+        is_ok = numpy.ones(frames.num_frames, dtype=bool)
+
+        for expected in _walking_ones() + _walking_zeroes() + _moving_inversions():
+            self._write(frames, expected)
+            actual = frames.read()
+            pass_syndrome = numpy.bitwise_or.reduce(actual ^ expected, axis=1)
+            syndrome.add(expected, pass_syndrome)
+
+            newly_bad = is_ok & (pass_syndrome != 0)
+            for row in numpy.flatnonzero(newly_bad):
+                self._report_first_bad_word(frames.offsets[row], expected, actual[row])
+            is_ok &= ~newly_bad
+
+        self._report_bit_faults(frames, syndrome, is_ok)
+        return is_ok
+
+    def _write(self, frames, expected):
+        frames.write(expected)
+
+    def _report_first_bad_word(self, offset, expected, actual_words):
+        word = numpy.flatnonzero(actual_words != expected)[0]
+        self.reporting.report_bad_memory(int(offset + word * wordwise.WORD_SIZE), int(expected), int(actual_words[word]))
+
+    def _report_bit_faults(self, frames, syndrome, is_ok):
+        report_bit_faults = getattr(self.reporting, 'report_bit_faults', None)
+        if not report_bit_faults:
+            return
+
+        stuck_at_0, stuck_at_1, coupled = syndrome.stuck_at_0(), syndrome.stuck_at_1(), syndrome.coupled()
+        for row in numpy.flatnonzero(~is_ok):
+            report_bit_faults(int(frames.offsets[row]), int(stuck_at_0[row]), int(stuck_at_1[row]), int(coupled[row]))
@@ -0,0 +1,127 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import buffers
+
+
+def test_frames(frame_test, region, offsets, length, pfns=None):
+    """
+    Tests the frames region[offset..offset+(length -1)] for each offset in offsets with frame_test.
+    pfns are the page frame numbers of the frames, if known.
+    Testers that implement test_frames(region, offsets, length, pfns) test the whole block at once,
+    all others are called once per frame with the same region (no copies are made).
+
+    return: sequence of booleans, True for each frame that passed the test
+    """
+    if hasattr(frame_test, 'test_frames'):
+        return frame_test.test_frames(region, offsets, length, pfns)
+
+    return [bool(frame_test.test(region, offset, length)) for offset in offsets]
+
+
+def test_steps(frame_test, region, offsets, length, pfns=None):
+    """
+    Same as test_frames, but as resumable steps: a generator that yields None after each step
+    and the result as its last value (see finish and slicing.TimeSlicer).
+    Testers that implement test_steps(region, offsets, length, pfns) yield after each pass or
+    chunk, block testers without it run as one step, all others as one step per frame.
+    """
+    steps = getattr(frame_test, 'test_steps', None)
+    if steps:
+        for step in steps(region, offsets, length, pfns):
+            yield step
+        return
+
+    if hasattr(frame_test, 'test_frames'):
+        yield frame_test.test_frames(region, offsets, length, pfns)
+        return
+
+    is_ok = []
+    for offset in offsets:
+        is_ok.append(bool(frame_test.test(region, offset, length)))
+        yield None
+    yield is_ok
+
+
+def finish(steps):
+    """
+    Runs all steps of a generator as returned by test_steps.
+
+    return: the result (the last value yielded)
+    """
+    result = None
+    for result in steps:
+        pass
+    return result
+
+
+def flush_reports(frame_test, pfn_by_offset):
+    """
+    Tells the test reporting of frame_test (if it collects faults, see SummarizingTestReporting)
+    and the verification strategy (if it audits, see DigestVerification) that the frames are done.
+    pfn_by_offset maps the offset of each tested frame to its pfn.
+    """
+    flush = getattr(getattr(frame_test, 'reporting', None), 'flush', None)
+    if flush:
+        flush(pfn_by_offset)
+
+    flush = getattr(buffers.get_verification(), 'flush', None)
+    if flush:
+        flush(pfn_by_offset)
+
+
+def detach_reports(frame_test):
+    """
+    Takes the faults and digests collected for the frames so far (see flush_reports) out of the
+    test reporting and the verification strategy, e.g. while the frames of another mapping
+    with the same offsets are tested.
+
+    return: scope for attach_reports
+    """
+    scope = []
+    for collector in (getattr(frame_test, 'reporting', None), buffers.get_verification()):
+        detach = getattr(collector, 'detach', None)
+        scope.append(detach() if detach else None)
+    return scope
+
+
+def attach_reports(frame_test, scope):
+    """
+    Puts a scope of detach_reports (None: an empty one) back, later faults and digests add to
+    it until the next flush_reports or detach_reports.
+    """
+    for collector, collected in zip((getattr(frame_test, 'reporting', None), buffers.get_verification()), scope or [None, None]):
+        attach = getattr(collector, 'attach', None)
+        if attach:
+            attach(collected)
+
+
+def next_round(frame_test):
+    """
+    Tells frame_test that a new sweep over all frames starts (see SamplingScanner.next_round),
+    if it cares.
+    """
+    next_round = getattr(frame_test, 'next_round', None)
+    if next_round:
+        next_round()
@@ -0,0 +1,114 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+
+import patterns
+
+ZEROES = 0x00
+ONES = 0xff
+
+# See set_verification
+_verification = None
+
+
+def region_buffer(region):
+    """
+    Returns an object supporting slice reads/writes on the bytes of region, or None
+    if region only supports the bytewise __getitem(x)__/__setitem(x,b)__ interface.
+    """
+    if isinstance(region, (bytearray, mmap.mmap)):
+        return region
+
+    buffer_of = getattr(region, 'buffer', None)
+    if buffer_of:
+        return buffer_of()
+
+    return None
+
+
+def constant_pattern(value, length):
+    """
+    Returns a (read-only) string of length bytes, each set to value
+    """
+    return patterns.constant(value, length)
+
+
+def address_pattern(offset, length):
+    """
+    Returns a (read-only) string with the byte at index i being ((offset + i) % 0xff),
+    i.e. the ADDRESS pattern for region[offset..offset+(length -1)]
+    """
+    return patterns.get("address", offset, length)
+
+
+def fill(buf, offset, pattern):
+    """
+    Writes pattern to buf[offset..offset + len(pattern) -1]
+    """
+    buf[offset:offset + len(pattern)] = pattern
+
+
+def set_verification(verification):
+    """
+    Replaces the compare in verify with verification.verify(buf, offset, expected, reporting),
+    e.g. a digest.DigestVerification. None restores the compare.
+    """
+    global _verification
+    _verification = verification
+
+
+def get_verification():
+    return _verification
+
+
+def verify(buf, offset, expected, reporting):
+    """
+    Compares buf[offset..] with expected in one go. Only when the compare fails the
+    bytes are compared one by one and each difference is reported via
+    reporting.report_bad_memory(bad_offset, expected_value, actual_value).
+
+    return: True, if buf matches expected
+    """
+    if _verification is not None:
+        return _verification.verify(buf, offset, expected, reporting)
+
+    actual = buf[offset:offset + len(expected)]
+    if actual == expected:
+        return True
+
+    report_differences(offset, expected, actual, reporting)
+    return False
+
+
+def report_differences(offset, expected, actual, reporting):
+    """
+    Reports every byte where actual differs from expected. Both are byte strings
+    starting at offset.
+    """
+    expected = bytearray(expected)
+    actual = bytearray(actual)
+    for index in xrange(0, len(expected)):
+        if not (actual[index] == expected[index]):
+            reporting.report_bad_memory(offset + index, expected[index], actual[index])
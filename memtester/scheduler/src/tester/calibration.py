@@ -0,0 +1,203 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import json
+import mmap
+import os
+import platform
+import time
+
+import block
+from linear import LinearScanner
+from quadratic import QuadraticScanner
+
+try:
+    from wordwise import WordwiseScanner
+except ImportError:
+    WordwiseScanner = None
+
+try:
+    from libc import LibcLinearScanner, libc
+    libc()
+except (ImportError, OSError):
+    LibcLinearScanner = None
+
+PAGE_SIZE = 4096
+
+# Implementations in order of preference when they are equally fast
+IMPLEMENTATIONS = ("buffer", "numpy", "ctypes", "python")
+
+
+class BytewiseRegion(object):
+    '''
+    Restricts a region to the bytewise __getitem(x)__/__setitem(x,b)__ interface
+    '''
+
+    def __init__(self, region):
+        self.region = region
+        self.chars = isinstance(region, mmap.mmap)
+
+    def __getitem__(self, index):
+        if self.chars:
+            return ord(self.region[index])
+        return self.region[index]
+
+    def __setitem__(self, index, value):
+        self.region[index] = chr(value) if self.chars else value
+
+
+class BytewiseTest(object):
+    '''
+    Runs a frame test in its pure python (bytewise) code path
+    '''
+
+    def __init__(self, frame_test):
+        self.frame_test = frame_test
+        self.reporting = frame_test.reporting
+
+    def name(self):
+        return "%s (pure python)" % self.frame_test.name()
+
+    def test(self, region, offset, len):
+        if isinstance(region, mmap.mmap):
+            region = BytewiseRegion(region)
+        return self.frame_test._test_bytewise(region, offset, len)
+
+
+def implementations(algorithm, pattern_names=None, fused=False):
+    """
+    The available implementations of algorithm. pattern_names and fused (see LinearScanner) are
+    passed to the linear test, the numpy implementation only supports the default patterns.
+
+    return: dict implementation name -> factory(reporting, evictor) of the frame test
+    """
+    factories = {}
+    if "linear" == algorithm:
+        factories["python"] = lambda reporting, evictor: BytewiseTest(LinearScanner(reporting, pattern_names=pattern_names))
+        factories["buffer"] = lambda reporting, evictor: LinearScanner(reporting, evictor, pattern_names, fused)
+        if WordwiseScanner and (tuple(pattern_names or LinearScanner.PATTERNS) == LinearScanner.PATTERNS):
+            factories["numpy"] = WordwiseScanner
+        if LibcLinearScanner:
+            factories["ctypes"] = lambda reporting, evictor: LibcLinearScanner(reporting, evictor, pattern_names, fused)
+    elif "quadratic" == algorithm:
+        factories["python"] = lambda reporting, evictor: BytewiseTest(QuadraticScanner(reporting))
+        factories["buffer"] = lambda reporting, evictor: QuadraticScanner(reporting)
+    return factories
+
+
+class _CountingReporting(object):
+    def __init__(self):
+        self.reports = 0
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        self.reports += 1
+
+
+def benchmark(factory, pages=256, time_limit=0.5):
+    """
+    Tests an anonymous mmap of pages frames with the frame test created by factory, in blocks of
+    1, 2, 4, .. 64 frames, until all frames are tested or time_limit seconds have passed.
+
+    return: tested frames per second
+    """
+    region = mmap.mmap(-1, pages * PAGE_SIZE)
+    frame_test = factory(_CountingReporting(), None)
+    tested = 0
+    block_size = 1
+    try:
+        start = time.time()
+        while (tested < pages) and (time.time() - start < time_limit):
+            offsets = [frame * PAGE_SIZE for frame in xrange(tested, min(pages, tested + block_size))]
+            block.test_frames(frame_test, region, offsets, PAGE_SIZE)
+            tested += len(offsets)
+            block_size = min(2 * block_size, 64)
+        seconds = time.time() - start
+    finally:
+        region.close()
+
+    return tested / max(seconds, 1e-6)
+
+
+def calibrate(algorithm, pages=256, time_limit=0.5):
+    """
+    Benchmarks all implementations of algorithm.
+
+    return: dict implementation name -> tested frames per second
+    """
+    return dict((name, benchmark(factory, pages, time_limit))
+                for name, factory in implementations(algorithm).iteritems())
+
+
+def fastest(results):
+    """
+    return: the name of the fastest implementation in results (see calibrate)
+    """
+    return max(results, key=lambda name: (results[name], -IMPLEMENTATIONS.index(name)))
+
+
+def format_results(algorithm, results):
+    """
+    return: one line per implementation, fastest first
+    """
+    return ["%-10s %-7s %10.1f frames/s%s" % (algorithm, name, results[name], " *" if name == fastest(results) else "")
+            for name in sorted(results, key=results.get, reverse=True)]
+
+
+def host_key():
+    """
+    Calibration results are only valid for the same host, kernel and python build
+    """
+    return "%s %s python-%s" % (platform.node(), platform.release(), platform.python_version())
+
+
+class CalibrationCache(object):
+    '''
+    Calibration results, stored as JSON in path: {host_key: {algorithm: {implementation: frames per second}}}
+    '''
+
+    def __init__(self, path, key=None):
+        self.path = path
+        self.key = key or host_key()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except ValueError:
+            # Damaged file: calibrate again
+            return {}
+
+    def get(self, algorithm):
+        """
+        return: the results stored for algorithm on this host, or None
+        """
+        return self._load().get(self.key, {}).get(algorithm)
+
+    def store(self, algorithm, results):
+        cached = self._load()
+        cached.setdefault(self.key, {})[algorithm] = results
+        with open(self.path, "w") as f:
+            json.dump(cached, f, indent=1, sort_keys=True)
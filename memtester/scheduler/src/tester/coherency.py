@@ -0,0 +1,302 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import ctypes
+import glob
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+
+import buffers
+import libc
+
+# Lines are owned round robin by the workers
+LINE_SIZE = 64
+
+# Size of the cpu mask passed to sched_setaffinity (cpu_set_t)
+_CPU_SETSIZE = 1024
+_MASK_WORD_BITS = 8 * ctypes.sizeof(ctypes.c_ulong)
+
+
+def cpu_packages(cpu_root='/sys/devices/system/cpu'):
+    """
+    Maps each online cpu in {cpu_root} to its physical package (socket) id.
+    Offline cpus have no topology directory and are left out.
+    """
+    packages = {}
+    for path in glob.glob(os.path.join(cpu_root, 'cpu[0-9]*', 'topology', 'physical_package_id')):
+        cpu = int(os.path.basename(os.path.dirname(os.path.dirname(path)))[3:])
+        try:
+            with open(path) as f:
+                packages[cpu] = int(f.read().strip())
+        except (IOError, ValueError):
+            continue
+    return packages
+
+
+def spread_cpus(count, cpu_root='/sys/devices/system/cpu'):
+    """
+    count cpus, taken from the sockets in turn, so that neighbouring workers run on different
+    sockets when there are several. With more workers than cpus the cpus are used again.
+    Without topology information the workers are not pinned (None).
+    """
+    by_package = {}
+    for cpu, package in sorted(cpu_packages(cpu_root).items()):
+        by_package.setdefault(package, []).append(cpu)
+    if not by_package:
+        return [None] * count
+
+    cpus = []
+    queues = [by_package[package] for package in sorted(by_package)]
+    while any(queues):
+        for queue in queues:
+            if queue:
+                cpus.append(queue.pop(0))
+    return [cpus[index % len(cpus)] for index in xrange(count)]
+
+
+def set_affinity(cpu):
+    """
+    Pins the calling process to cpu. Raises OSError if the kernel refuses.
+    """
+    mask = (ctypes.c_ulong * (_CPU_SETSIZE / _MASK_WORD_BITS))()
+    mask[cpu / _MASK_WORD_BITS] = 1 << (cpu % _MASK_WORD_BITS)
+    if libc.libc().sched_setaffinity(0, ctypes.sizeof(mask), ctypes.addressof(mask)) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, "Cannot pin to cpu %d: %s" % (cpu, os.strerror(errno)))
+
+
+def line_pattern(round, worker, offset):
+    """
+    The LINE_SIZE bytes worker writes to the line at offset in round: a 64 bit word
+    tagged with all three, repeated
+    """
+    word = ((round & 0xffff) << 48) | ((worker & 0xff) << 40) | (offset & 0xffffffffff)
+    return struct.pack('<Q', word) * (LINE_SIZE / 8)
+
+
+def owner_of(offset, workers):
+    return (offset / LINE_SIZE) % workers
+
+
+def write_lines(buf, offsets, length, round, worker, workers):
+    """
+    Writes the lines owned by worker in the frames at offsets.
+
+    return: number of bytes written
+    """
+    written = 0
+    for offset in offsets:
+        end = offset + length
+        for line in xrange(offset, end, LINE_SIZE):
+            if owner_of(line, workers) == worker:
+                size = min(LINE_SIZE, end - line)
+                buf[line:line + size] = line_pattern(round, worker, line)[:size]
+                written += size
+    return written
+
+
+def verify_lines(buf, offsets, length, round, workers, reporting):
+    """
+    Verifies all lines (of all workers) in the frames at offsets.
+
+    return: list of booleans, True for each frame that matched
+    """
+    is_ok = []
+    for offset in offsets:
+        end = offset + length
+        expected = "".join(line_pattern(round, owner_of(line, workers), line) for line in xrange(offset, end, LINE_SIZE))[:length]
+        actual = buf[offset:end]
+        if actual == expected:
+            is_ok.append(True)
+        else:
+            buffers.report_differences(offset, expected, actual, reporting)
+            is_ok.append(False)
+    return is_ok
+
+
+class _FaultList(object):
+    def __init__(self):
+        self.faults = []
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        self.faults.append((bad_offset, expected_value, actual_value))
+
+
+def _work(buf, offsets, length, worker, workers, cpu, conn):
+    """
+    A worker process: writes its lines on ('write', round), verifies all lines on
+    ('verify', round), stops on None
+    """
+    if cpu is not None:
+        set_affinity(cpu)
+
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+        action, round = command
+        if 'write' == action:
+            conn.send(write_lines(buf, offsets, length, round, worker, workers))
+        else:
+            faults = _FaultList()
+            verify_lines(buf, offsets, length, round, workers, faults)
+            conn.send((faults.faults, len(offsets) * length))
+    conn.close()
+
+
+class CoherencyTest(object):
+    '''
+    Multi-core coherency test: workers processes, pinned to cpus (default: spread over the
+    sockets, see spread_cpus), share the mapping of the block (they are forked while it is mapped).
+    The cache lines of the block are owned round robin by the workers. Each round all workers
+    write their lines at the same time (neighbouring lines belong to different cores, so every
+    write moves lines between the caches), then each worker verifies the lines of all workers.
+    Rounds repeat for duration seconds per block, at least once.
+
+    The line contents are tagged with round, worker and offset (see line_pattern), so stale and
+    misdirected lines are detected. Regions that are not a shared mapping cannot be shared with
+    other processes; their rounds run the workers one after the other in this process.
+
+    bytes_moved and seconds add up over all blocks, see throughput.
+    '''
+
+    def __init__(self, reporting, workers=2, cpus=None, duration=0.1):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        self.reporting = reporting
+        self.workers = workers
+        self.cpus = list(cpus) if cpus else spread_cpus(workers)
+        self.duration = duration
+        self.round = 0
+        self.bytes_moved = 0
+        self.seconds = 0.0
+
+        if len(self.cpus) < workers:
+            raise ValueError("%d workers need %d cpus, got %s" % (workers, workers, self.cpus))
+
+    def name(self):
+        return "Multi-core coherency test (%d workers)" % self.workers
+
+    def throughput(self):
+        """
+        Bytes written and verified per second by all workers together
+        """
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes_moved / self.seconds
+
+    def test(self, region, offset, len):
+        """
+        - region is a mapping (see test_frames)
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+
+        return: list of booleans, True for each frame that passed the test
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            raise ValueError("The coherency test needs a region with a buffer")
+
+        start = time.time()
+        if isinstance(buf, mmap.mmap):
+            faults = self._run_workers(buf, offsets, length, start + self.duration)
+        else:
+            faults = self._run_inline(buf, offsets, length, start + self.duration)
+        self.seconds += time.time() - start
+
+        # Each worker reports the same fault
+        bad_offsets = set()
+        for bad_offset, expected_value, actual_value in sorted(set(faults)):
+            self.reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+            bad_offsets.add(bad_offset)
+
+        return [not any(offset <= bad_offset < offset + length for bad_offset in bad_offsets) for offset in offsets]
+
+    def _run_inline(self, buf, offsets, length, deadline):
+        faults = _FaultList()
+        while True:
+            for worker in xrange(self.workers):
+                self.bytes_moved += write_lines(buf, offsets, length, self.round, worker, self.workers)
+            for worker in xrange(self.workers):
+                verify_lines(buf, offsets, length, self.round, self.workers, faults)
+                self.bytes_moved += len(offsets) * length
+            self.round += 1
+            if time.time() >= deadline:
+                return faults.faults
+
+    def _run_workers(self, buf, offsets, length, deadline):
+        conns = []
+        processes = []
+        try:
+            for worker in xrange(self.workers):
+                conn, worker_conn = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_work, args=(buf, offsets, length, worker, self.workers, self.cpus[worker], worker_conn))
+                process.daemon = True
+                process.start()
+                # Only the worker holds its end, so that a dying worker is an EOFError here
+                worker_conn.close()
+                conns.append(conn)
+                processes.append(process)
+
+            faults = []
+            while True:
+                for conn in conns:
+                    conn.send(('write', self.round))
+                for conn in conns:
+                    self.bytes_moved += conn.recv()
+
+                for conn in conns:
+                    conn.send(('verify', self.round))
+                for conn in conns:
+                    worker_faults, verified = conn.recv()
+                    faults.extend(worker_faults)
+                    self.bytes_moved += verified
+
+                self.round += 1
+                if time.time() >= deadline:
+                    return faults
+        except EOFError:
+            raise RuntimeError("A coherency test worker died, exit codes: %s" % [process.exitcode for process in processes])
+        finally:
+            for conn in conns:
+                try:
+                    conn.send(None)
+                except IOError:
+                    pass
+                conn.close()
+            for process in processes:
+                process.join()
@@ -0,0 +1,133 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import hashlib
+import mmap
+import time
+import zlib
+
+import buffers
+
+# At most this many digests of expected pattern pages are cached
+MAX_CACHED = 1024
+
+
+def _crc32(data):
+    return "%08x" % (zlib.crc32(data) & 0xffffffff)
+
+
+DIGESTS = {"crc32": _crc32,
+           "md5": lambda data: hashlib.md5(data).hexdigest(),
+           "sha1": lambda data: hashlib.sha1(data).hexdigest()}
+if hasattr(hashlib, "blake2b"):
+    DIGESTS["blake2b"] = lambda data: hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DigestVerification(object):
+    '''
+    Verification strategy for buffers.verify (see buffers.set_verification): hashes the frame in
+    place (no copy) and compares the digest with the cached digest of the expected pattern page.
+    Only on a mismatch the bytes are compared and reported.
+
+    With crc32 a fault that leaves the checksum unchanged is missed, use a cryptographic digest if
+    that matters. If audit is set, audit(pfn, digests, is_ok) is called for each frame once the
+    frame is done (see flush), with the digests of all its verifications.
+    '''
+
+    def __init__(self, digest="sha1", audit=None):
+        if not digest in DIGESTS:
+            raise ValueError("Unknown digest `%s`, available: %s" % (digest, ", ".join(sorted(DIGESTS))))
+        self.digest = digest
+        self.hash = DIGESTS[digest]
+        self.audit = audit
+        self.expected_digests = {}
+        self.pending = {}
+        self.mismatches = 0
+
+    def expected_digest(self, expected):
+        digest = self.expected_digests.get(expected)
+        if digest is None:
+            if len(self.expected_digests) >= MAX_CACHED:
+                self.expected_digests.clear()
+            digest = self.hash(expected)
+            self.expected_digests[expected] = digest
+        return digest
+
+    def verify(self, buf, offset, expected, reporting):
+        """
+        Same contract as buffers.verify
+        """
+        if isinstance(buf, (bytearray, mmap.mmap)):
+            actual = buffer(buf, offset, len(expected))
+        else:
+            actual = buf[offset:offset + len(expected)]
+
+        digest = self.hash(actual)
+        is_ok = (digest == self.expected_digest(expected))
+        if not is_ok:
+            self.mismatches += 1
+            buffers.report_differences(offset, expected, buf[offset:offset + len(expected)], reporting)
+
+        if self.audit:
+            self.pending.setdefault(offset, []).append((digest, is_ok))
+        return is_ok
+
+    def detach(self):
+        """
+        Takes the digests collected since the last flush out (see block.detach_reports)
+        """
+        pending = self.pending
+        self.pending = {}
+        return pending
+
+    def attach(self, pending):
+        """
+        Continues with digests taken out by detach (None: none), instead of the current ones
+        """
+        self.pending = pending or {}
+
+    def flush(self, pfn_by_offset):
+        """
+        The frames in pfn_by_offset are done: passes their digests to audit
+        """
+        for offset, pfn in sorted(pfn_by_offset.iteritems()):
+            verifications = self.pending.pop(offset, None)
+            if verifications and self.audit:
+                self.audit(pfn, [digest for digest, _ in verifications], all(is_ok for _, is_ok in verifications))
+        self.pending.clear()
+
+
+class DigestLog(object):
+    '''
+    audit function for DigestVerification: appends one line per frame to out
+    (time, pfn, result and the digests)
+    '''
+
+    def __init__(self, out, digest):
+        self.out = out
+        self.digest = digest
+
+    def __call__(self, pfn, digests, is_ok):
+        self.out.write("%d pfn=%d %s %s:%s\n" % (time.time(), pfn, "ok" if is_ok else "BAD", self.digest, ",".join(digests)))
+        self.out.flush()
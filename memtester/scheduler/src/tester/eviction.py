@@ -0,0 +1,104 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import glob
+import mmap
+import os
+import time
+
+_SIZE_SUFFIXES = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _parse_size(text):
+    """
+    Parses sizes like `32K`, `8M` or `512` (bytes) as used in sysfs
+    """
+    suffix = text[-1:].upper()
+    if suffix in _SIZE_SUFFIXES:
+        return int(text[:-1]) * _SIZE_SUFFIXES[suffix]
+    return int(text)
+
+
+def last_level_cache_size(cpu_root='/sys/devices/system/cpu'):
+    """
+    Returns the size in bytes of the largest data/unified cache of the highest level found in
+    {cpu_root}/cpu*/cache/index*/, or None if no cache is listed there.
+    """
+    best = None
+    for index in glob.glob(os.path.join(cpu_root, 'cpu[0-9]*', 'cache', 'index[0-9]*')):
+        try:
+            if _read(os.path.join(index, 'type')) == 'Instruction':
+                continue
+            level = int(_read(os.path.join(index, 'level')))
+            size = _parse_size(_read(os.path.join(index, 'size')))
+        except (IOError, ValueError):
+            continue
+
+        if (best is None) or ((level, size) > best):
+            best = (level, size)
+
+    if best is None:
+        return None
+    return best[1]
+
+
+class CacheEvictor(object):
+    '''
+    Streams through an eviction buffer so that the next reads of tested frames are served from
+    DRAM and not from the CPU caches. Testers call evict() once per block between the write and
+    the verify phase of a pass. The time spent is accumulated in seconds.
+    '''
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, size):
+        '''
+        Constructor: size is the size of the eviction buffer, typically a multiple of the last level cache.
+        It is rounded up to a multiple of CHUNK_SIZE.
+        '''
+        self.size = -(-size // self.CHUNK_SIZE) * self.CHUNK_SIZE
+        self.buffer = mmap.mmap(-1, self.size)
+        self.evictions = 0
+        self.seconds = 0.0
+        self._chunks = (chr(0x00) * self.CHUNK_SIZE, chr(0xff) * self.CHUNK_SIZE)
+
+    def evict(self):
+        start = time.time()
+
+        # Write the whole buffer (alternating the value so that it is really changed), then read it
+        chunk = self._chunks[self.evictions % 2]
+        for offset in xrange(0, self.size, self.CHUNK_SIZE):
+            self.buffer[offset:offset + self.CHUNK_SIZE] = chunk
+        self.buffer.find(chr(0x5a), 0)
+
+        self.evictions += 1
+        self.seconds += time.time() - start
+
+    def close(self):
+        self.buffer.close()
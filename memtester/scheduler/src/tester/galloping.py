@@ -0,0 +1,106 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import buffers
+
+
+class GallopingScanner(object):
+    '''
+    Checks coupling between each cell (byte) and the cells in a window around it.
+
+    For both backgrounds (0x00 and 0xff) every cell is set to the inverse of the background,
+    the window around it is verified with a single compare, then the cell is restored.
+    This is a middle ground between the LinearScanner and the QuadraticScanner: the number of
+    bytes compared is at most 2 * len * (2 * window + 1) + 4 * len, i.e. O(n*w).
+
+    With aligned=True the window is the naturally aligned block of window bytes containing
+    the cell (e.g. 64 for the cache line), otherwise it is cell-window..cell+window.
+    '''
+
+    def __init__(self, reporting, window=64, aligned=False):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        if window < 1:
+            raise ValueError("The window must be at least one byte")
+
+        self.reporting = reporting
+        self.window = window
+        self.aligned = aligned
+
+    def name(self):
+        if self.aligned:
+            return "Galloping test (aligned %d byte window)" % self.window
+        return "Galloping test (+-%d byte window)" % self.window
+
+    def max_compared_bytes(self, len):
+        """
+        Upper bound of the number of bytes read when testing len bytes
+        """
+        return 2 * len * (min(len, 2 * self.window + 1) + 2)
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset, 0 if the frame failed the test
+        """
+        buf = buffers.region_buffer(region)
+        last_element = offset+len
+        is_ok = True
+
+        for background, base in ((buffers.ZEROES, buffers.ONES), (buffers.ONES, buffers.ZEROES)):
+            background_pattern = buffers.constant_pattern(background, len)
+            buffers.fill(buf, offset, background_pattern)
+            is_ok = buffers.verify(buf, offset, background_pattern, self.reporting) and is_ok
+
+            # The expected content of any window is a slice of this string: the
+            # current cell is at around[window]
+            around = chr(background) * self.window + chr(base) + chr(background) * self.window
+
+            for index in xrange(offset, last_element):
+                low, high = self._window(index, offset, last_element)
+
+                buf[index:index + 1] = chr(base)
+                start = self.window - (index - low)
+                is_ok = buffers.verify(buf, low, around[start:start + high - low], self.reporting) and is_ok
+                buf[index:index + 1] = chr(background)
+
+            is_ok = buffers.verify(buf, offset, background_pattern, self.reporting) and is_ok
+
+        if not is_ok:
+            return 0
+        return last_element
+
+    def _window(self, index, offset, last_element):
+        """
+        return: (low, high), the window around index is region[low..high -1]
+        """
+        if self.aligned:
+            low = index - (index % self.window)
+            return max(offset, low), min(last_element, low + self.window)
+
+        return max(offset, index - self.window), min(last_element, index + self.window + 1)
@@ -0,0 +1,168 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import ctypes
+import mmap
+import platform
+import time
+
+import buffers
+
+VICTIM = 0x55
+AGGRESSOR = 0xaa
+
+
+class ClflushReads(object):
+    '''
+    Reads two addresses of a bytearray/mmap alternately and flushes both cache lines (clflush)
+    after each pair of reads, so that every read misses the caches and activates its DRAM row.
+    The loop is native x86-64 code: the constructor raises RuntimeError on other hosts or if
+    no executable memory can be mapped.
+    '''
+
+    # void reads(char *a, char *b, uint64_t count)
+    CODE = ("\x48\x85\xd2"      # test rdx, rdx
+            "\x74\x14"          # jz done
+            "\x48\x8b\x07"      # loop: mov rax, [rdi]
+            "\x48\x8b\x06"      # mov rax, [rsi]
+            "\x0f\xae\x3f"      # clflush [rdi]
+            "\x0f\xae\x3e"      # clflush [rsi]
+            "\x0f\xae\xf0"      # mfence
+            "\x48\xff\xca"      # dec rdx
+            "\x75\xec"          # jnz loop
+            "\xc3")             # done: ret
+
+    def __init__(self):
+        if platform.machine() not in ("x86_64", "AMD64"):
+            raise RuntimeError("The `hammer` test needs an x86-64 CPU (clflush), not %s" % platform.machine())
+        try:
+            self.code = mmap.mmap(-1, mmap.PAGESIZE, prot=mmap.PROT_READ | mmap.PROT_WRITE | mmap.PROT_EXEC)
+        except (EnvironmentError, mmap.error) as e:
+            raise RuntimeError("The `hammer` test cannot map executable memory: %s" % e)
+        self.code.write(self.CODE)
+        self.reads = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint64)(
+            ctypes.addressof(ctypes.c_char.from_buffer(self.code)))
+
+    def __call__(self, buf, offset_a, offset_b, count):
+        if not isinstance(buf, (bytearray, mmap.mmap)):
+            raise ValueError("The `hammer` test needs a region with a bytearray or mmap buffer")
+        base = ctypes.addressof(ctypes.c_char.from_buffer(buf))
+        self.reads(base + offset_a, base + offset_b, count)
+
+
+class HammerScanner(object):
+    '''
+    Adjacent frame disturbance ("hammer") test for physically contiguous frames of a block.
+
+    A frame whose pfn has both neighbours (pfn - 1, pfn + 1) in the block is a victim. The test
+    runs two rounds (victims with odd, then with even pfns). Each round writes VICTIM to the
+    victims and AGGRESSOR to all other frames, reads the two neighbours of each victim
+    alternately hammer_count times each with reads(buf, offset_a, offset_b, count) (by default
+    ClflushReads, so that every read reaches DRAM) and verifies all frames. activations counts
+    these reads over all blocks.
+
+    The hammering of a block stops after time_budget seconds, so frames are never held much
+    longer than that. The budget is shared evenly by the rounds, and within a round by the
+    victims. Without pfns no frame has neighbours and the test degrades to a single pattern test.
+    '''
+
+    # Reads per call of reads, between two looks at the clock
+    READS_PER_CHECK = 10000
+
+    def __init__(self, reporting, hammer_count=100000, time_budget=2.0, reads=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        self.reporting = reporting
+        self.hammer_count = hammer_count
+        self.time_budget = time_budget
+        self.reads = reads or ClflushReads()
+        self.hammered = 0
+        self.activations = 0
+
+    def name(self):
+        return "Adjacent frame disturbance test (%d reads per aggressor and victim, at most %.1f s per block)" % (self.hammer_count, self.time_budget)
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames, used to find physically adjacent frames.
+
+        return: list of booleans, True for each frame that passed the test
+        """
+        buf = buffers.region_buffer(region)
+        is_ok = [True] * len(offsets)
+        self.hammered = 0
+
+        if pfns is None:
+            pfns = [None] * len(offsets)
+        frame_of_pfn = dict((pfn, frame) for frame, pfn in enumerate(pfns) if pfn is not None)
+
+        victims_by_parity = dict((parity, sorted(frame for pfn, frame in frame_of_pfn.iteritems()
+                                                 if (pfn % 2 == parity) and ((pfn - 1) in frame_of_pfn) and ((pfn + 1) in frame_of_pfn)))
+                                 for parity in (1, 0))
+        round_budget = self.time_budget / max(1, len([victims for victims in victims_by_parity.itervalues() if victims]))
+
+        for parity in (1, 0):
+            victims = victims_by_parity[parity]
+            if (parity == 0) and not victims:
+                break
+
+            expected = [buffers.constant_pattern(VICTIM if frame in victims else AGGRESSOR, length) for frame in xrange(len(offsets))]
+            for frame, offset in enumerate(offsets):
+                buffers.fill(buf, offset, expected[frame])
+
+            deadline = time.time() + round_budget
+            for index, victim in enumerate(victims):
+                # Each victim gets its share of the time left in this round
+                victim_deadline = time.time() + (deadline - time.time()) / (len(victims) - index)
+                self._hammer(buf, offsets[frame_of_pfn[pfns[victim] - 1]], offsets[frame_of_pfn[pfns[victim] + 1]], victim_deadline)
+
+            for frame, offset in enumerate(offsets):
+                is_ok[frame] = buffers.verify(buf, offset, expected[frame], self.reporting) and is_ok[frame]
+
+        return is_ok
+
+    def _hammer(self, buf, offset_a, offset_b, deadline):
+        done = 0
+        while done < self.hammer_count:
+            count = min(self.READS_PER_CHECK, self.hammer_count - done)
+            self.reads(buf, offset_a, offset_b, count)
+            done += count
+            self.hammered += count
+            self.activations += 2 * count
+
+            if time.time() > deadline:
+                return
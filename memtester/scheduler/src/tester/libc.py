@@ -0,0 +1,98 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import ctypes
+import ctypes.util
+import mmap
+
+import buffers
+import passes
+from linear import LinearScanner
+
+_libc = None
+
+
+def libc():
+    '''
+    The C library with memset/memmove/memcmp and sched_setaffinity prototypes. Raises OSError if it cannot be loaded.
+    '''
+    global _libc
+    if _libc is None:
+        name = ctypes.util.find_library("c")
+        if not name:
+            raise OSError("Cannot find the C library")
+        lib = ctypes.CDLL(name, use_errno=True)
+        lib.memset.argtypes = (ctypes.c_void_p, ctypes.c_int, ctypes.c_size_t)
+        lib.memset.restype = ctypes.c_void_p
+        lib.memmove.argtypes = (ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+        lib.memmove.restype = ctypes.c_void_p
+        lib.memcmp.argtypes = (ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+        lib.memcmp.restype = ctypes.c_int
+        lib.sched_setaffinity.argtypes = (ctypes.c_int, ctypes.c_size_t, ctypes.c_void_p)
+        lib.sched_setaffinity.restype = ctypes.c_int
+        _libc = lib
+    return _libc
+
+
+class LibcLinearScanner(LinearScanner):
+    '''
+    The linear time test with the writes and compares done by memmove/memcmp of the C library.
+    Regions whose buffer is not a bytearray or mmap are tested by LinearScanner.
+    '''
+
+    def __init__(self, reporting, evictor=None, pattern_names=None, fused=False):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        LinearScanner.__init__(self, reporting, evictor, pattern_names, fused)
+        self.libc = libc()
+
+    def name(self):
+        return "Linear time test (libc)"
+
+    def test_steps(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets as steps.
+        Same passes as LinearScanner.test_steps.
+        """
+        buf = buffers.region_buffer(region)
+        if not isinstance(buf, (bytearray, mmap.mmap)):
+            for step in LinearScanner.test_steps(self, region, offsets, length, pfns):
+                yield step
+            return
+
+        base = ctypes.addressof(ctypes.c_char.from_buffer(buf))
+
+        def fill(offset, expected):
+            self.libc.memmove(base + offset, expected, length)
+
+        def verify(offset, expected):
+            if self.libc.memcmp(base + offset, expected, length) == 0:
+                return True
+            # Let the slice compare find and report the bad bytes
+            return buffers.verify(buf, offset, expected, self.reporting)
+
+        for step in passes.iter_passes(offsets, self._expected_of(length), fill, verify, self.evictor, self.fused):
+            yield step
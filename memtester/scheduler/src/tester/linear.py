@@ -4,18 +4,35 @@ Created on Jun 1, 2010
 @author: jens
 '''
 
+import block
+import buffers
+import passes
+import patterns
+
 class LinearScanner(object):
     '''
     Scans a memory region (mmap) with linear complexity
     '''
 
+    # One pass per pattern, see patterns.names()
+    PATTERNS = ("zeroes", "ones", "address")
 
-    def __init__(self, reporting):
+    def __init__(self, reporting, evictor=None, pattern_names=None, fused=False):
         '''
         Constructor
         reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        evictor (optional) is a CacheEvictor, used once per pass between writing and verifying a block
+        pattern_names (optional) are the registered patterns used instead of PATTERNS
+        fused verifies a pattern and writes the next one in the same sweep (see passes.run_passes)
         '''
         self.reporting = reporting
+        self.evictor = evictor
+        self.fused = fused
+        self.pattern_names = tuple(pattern_names or self.PATTERNS)
+
+        unknown = [name for name in self.pattern_names if not name in patterns.names()]
+        if unknown:
+            raise ValueError("Unknown patterns %s, known patterns: %s" % (", ".join(unknown), ", ".join(patterns.names())))
 
     def name(self):
         return "Linear time test"
@@ -25,35 +42,69 @@ class LinearScanner(object):
         - region supports __getitem(x)__ and __setitem(x,b)__, with b being casted to a byte 
         - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
         
-        return: last tested offset
+        return: last tested offset, 0 if the frame failed the test
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            return self._test_bytewise(region, offset, len)
+
+        if not self.test_frames(region, [offset], len)[0]:
+            return 0
+        return offset+len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        Each pass first writes all frames, then (optionally) evicts the caches and then verifies
+        all frames (with fused: verifies and writes the next pattern in one sweep, see passes.run_passes).
+        Each write is one slice assignment, each verify one compare.
+
+        return: list of booleans, True for each frame that passed the test
+        """
+        return block.finish(self.test_steps(region, offsets, length, pfns))
+
+    def test_steps(self, region, offsets, length, pfns=None):
+        """
+        test_frames as steps (see block.test_steps): one step per sweep over the frames
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            is_ok = []
+            for offset in offsets:
+                is_ok.append(bool(self._test_bytewise(region, offset, length)))
+                yield None
+            yield is_ok
+            return
+
+        # Same passes as _test_bytewise
+        for step in passes.iter_passes(offsets, self._expected_of(length),
+                                       lambda offset, expected: buffers.fill(buf, offset, expected),
+                                       lambda offset, expected: buffers.verify(buf, offset, expected, self.reporting),
+                                       self.evictor, self.fused):
+            yield step
+
+    def _expected_of(self, length):
+        return [lambda offset, name=name: patterns.get(name, offset, length) for name in self.pattern_names]
+
+    def _test_bytewise(self, region, offset, len):
+        """
+        Fallback for regions that only support __getitem(x)__ and __setitem(x,b)__
         """
-        
         last_element = offset+len
-        # Test all ZEROes
-        for index in xrange(offset, last_element):
-            region[index] = 0
-        
-        for index in xrange(offset, last_element):
-            v =  region[index]
-            if not (v == 0):
-                self.reporting.report_bad_memory(index, 0, v)
-
-        # Test all ONEs
-        for index in xrange(offset, last_element):
-            region[index] = 0xff
-       
-        for index in xrange(offset, last_element):
-            v =  region[index]
-            if not (v == 0xff):
-                self.reporting.report_bad_memory(index, 0xff, v)
-
-        # Test all ADDRESS
-        for index in xrange(offset, last_element):
-            region[index] = index % 0xff
-       
-        for index in xrange(offset, last_element):
-            v =  region[index]
-            if not (v == (index % 0xff)):
-                self.reporting.report_bad_memory(index, (index % 0xff), v)
-                
-        return last_element
\ No newline at end of file
+        is_ok = True
+
+        for name in self.pattern_names:
+            expected = bytearray(patterns.get(name, offset, len))
+
+            for index in xrange(offset, last_element):
+                region[index] = expected[index - offset]
+
+            for index in xrange(offset, last_element):
+                v =  region[index]
+                if not (v == expected[index - offset]):
+                    self.reporting.report_bad_memory(index, expected[index - offset], v)
+                    is_ok = False
+
+        if not is_ok:
+            return 0
+        return last_element
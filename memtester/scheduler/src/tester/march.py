@@ -0,0 +1,181 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+import wordwise
+
+# Address orders of a march element
+UP = 'up'
+DOWN = 'down'
+ANY = 'any'
+
+# Cell values: 0 is the data background, 1 its inverse
+_CELL_VALUE = {'0': wordwise.ALL_ZEROES, '1': wordwise.ALL_ONES}
+
+
+class MarchScanner(object):
+    '''
+    Base class for March tests. A March test is a sequence of march elements, each being
+    an address order and a sequence of operations ('r0', 'w1', ...) that is applied to
+    every cell before the next cell is visited. Runtime is linear in the number of cells.
+
+    A cell is a 64 bit word. All frames of a block are tested together: the operations of an
+    element are applied to the same cell of all frames as one vectorized step, so the order of
+    operations inside each frame is exactly the one given by the algorithm.
+
+    With an order (e.g. a traversal.RandomLineOrder) `up` visits the cells in that order and
+    `down` in its reverse, which keeps the fault coverage of the algorithm.
+
+    Subclasses define NAME and ELEMENTS.
+    '''
+
+    NAME = None
+    ELEMENTS = ()
+
+    def __init__(self, reporting, order=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        order (optional) is the order the cells are visited in, e.g. a traversal.RandomLineOrder
+        '''
+        self.reporting = reporting
+        self.order = order
+
+    def name(self):
+        return self.NAME
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames (unused by this test).
+
+        return: numpy bool array, True for each frame that passed the test
+        """
+        frames = wordwise.FrameArray(region, offsets, length, self.order)
+        is_ok = numpy.ones(frames.num_frames, dtype=bool)
+
+        if self.order is not None:
+            up = [int(word) for word in self.order.word_positions(frames.words_per_frame)]
+        else:
+            up = range(0, frames.words_per_frame)
+
+        for order, operations in self.ELEMENTS:
+            if len(operations) == 1:
+                # A single operation per cell: the element is one sweep over the whole block
+                is_ok &= self._whole_frame_operation(frames, operations[0])
+                continue
+
+            if DOWN == order:
+                words = reversed(up)
+            else:
+                words = up
+
+            for word in words:
+                for operation in operations:
+                    is_ok &= self._cell_operation(frames, word, operation)
+
+        return is_ok
+
+    def _whole_frame_operation(self, frames, operation):
+        kind, value = operation[0], _CELL_VALUE[operation[1]]
+
+        if 'w' == kind:
+            self._write(frames, value)
+            return True
+
+        actual = frames.read()
+        is_ok = numpy.logical_not((actual != value).any(axis=1))
+        for row in numpy.flatnonzero(~is_ok):
+            wordwise.report_differences(self.reporting, frames.offsets[row], numpy.repeat(value, frames.words_per_frame), actual[row])
+        return is_ok
+
+    def _cell_operation(self, frames, word, operation):
+        kind, value = operation[0], _CELL_VALUE[operation[1]]
+
+        if 'w' == kind:
+            self._write_column(frames, word, value)
+            return True
+
+        actual = frames.read_column(word)
+        is_ok = (actual == value)
+        if not is_ok.all():
+            offsets = frames.word_offsets(word)
+            for row in numpy.flatnonzero(~is_ok):
+                wordwise.report_differences(self.reporting, offsets[row], numpy.array([value]), actual[row:row + 1])
+        return is_ok
+
+    def _write(self, frames, value):
+        frames.write(value)
+
+    def _write_column(self, frames, word, value):
+        frames.write_column(word, value)
+
+
+class MatsPlus(MarchScanner):
+    '''
+    MATS+ : {any(w0); up(r0,w1); down(r1,w0)}
+    Detects stuck-at and address decoder faults (5n)
+    '''
+    NAME = "MATS+ march test"
+    ELEMENTS = ((ANY, ('w0',)),
+                (UP, ('r0', 'w1')),
+                (DOWN, ('r1', 'w0')))
+
+
+class MarchCMinus(MarchScanner):
+    '''
+    March C- : {any(w0); up(r0,w1); up(r1,w0); down(r0,w1); down(r1,w0); any(r0)}
+    Detects stuck-at, transition, address decoder and unlinked coupling faults (10n)
+    '''
+    NAME = "March C- march test"
+    ELEMENTS = ((ANY, ('w0',)),
+                (UP, ('r0', 'w1')),
+                (UP, ('r1', 'w0')),
+                (DOWN, ('r0', 'w1')),
+                (DOWN, ('r1', 'w0')),
+                (ANY, ('r0',)))
+
+
+class MarchB(MarchScanner):
+    '''
+    March B : {any(w0); up(r0,w1,r1,w0,r0,w1); up(r1,w0,w1); down(r1,w0,w1,w0); down(r0,w1,w0)}
+    Detects stuck-at, transition, address decoder and linked coupling faults (17n)
+    '''
+    NAME = "March B march test"
+    ELEMENTS = ((ANY, ('w0',)),
+                (UP, ('r0', 'w1', 'r1', 'w0', 'r0', 'w1')),
+                (UP, ('r1', 'w0', 'w1')),
+                (DOWN, ('r1', 'w0', 'w1', 'w0')),
+                (DOWN, ('r0', 'w1', 'w0')))
@@ -0,0 +1,122 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import multiprocessing
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+import block
+
+
+def pool_size(threads, cpu_budget, cpus=None):
+    """
+    Number of threads to use: threads, but at most cpu_budget (0..1] of the online cpus
+    and at least one.
+    """
+    if cpus is None:
+        cpus = multiprocessing.cpu_count()
+    return max(1, min(threads, int(cpus * cpu_budget)))
+
+
+class LockedReporting(object):
+    '''
+    Serializes all calls to reporting (report_bad_memory, report_bit_faults, flush, ..)
+    '''
+
+    def __init__(self, reporting):
+        self._reporting = reporting
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._reporting, name)
+        if not callable(attribute):
+            return attribute
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attribute(*args, **kwargs)
+        return locked
+
+
+class ParallelTest(object):
+    '''
+    Splits the frames of a block into chunks of consecutive entries of the offsets list (see
+    split, the frames of a chunk need not be physically adjacent) and tests them in a pool of
+    threads, one tester per thread (created by new_test(reporting), sharing one LockedReporting).
+    The results are merged in frame order, the caller records them.
+
+    Only work that releases the GIL runs in parallel: numpy operations, ctypes calls
+    (the ctypes linear test) and hashlib (digest verification). Slice copies and compares
+    of the buffer based tests hold the GIL.
+    '''
+
+    def __init__(self, new_test, reporting, threads, min_frames_per_thread=4):
+        self.reporting = LockedReporting(reporting)
+        self.frame_tests = [new_test(self.reporting) for _ in xrange(threads)]
+        self.threads = threads
+        self.min_frames_per_thread = min_frames_per_thread
+        self.pool = ThreadPool(threads) if threads > 1 else None
+
+    def name(self):
+        return "%s (%d threads)" % (self.frame_tests[0].name(), self.threads)
+
+    def next_round(self):
+        for frame_test in self.frame_tests:
+            block.next_round(frame_test)
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def test(self, region, offset, len):
+        return self.frame_tests[0].test(region, offset, len)
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+
+        return: list of booleans, True for each frame that passed the test
+        """
+        chunks = self.split(len(offsets))
+        if (len(chunks) < 2) or not self.pool:
+            return [bool(is_ok) for is_ok in block.test_frames(self.frame_tests[0], region, offsets, length, pfns)]
+
+        def run(task):
+            frame_test, (first, last) = task
+            chunk_pfns = pfns[first:last] if pfns is not None else None
+            return block.test_frames(frame_test, region, offsets[first:last], length, chunk_pfns)
+
+        results = self.pool.map(run, zip(self.frame_tests, chunks))
+        return [bool(is_ok) for chunk in results for is_ok in chunk]
+
+    def split(self, num_frames):
+        """
+        return: list of (first, last + 1) frame index ranges, one per thread
+        """
+        num_chunks = max(1, min(self.threads, num_frames / self.min_frames_per_thread))
+        bounds = [num_frames * chunk / num_chunks for chunk in xrange(num_chunks + 1)]
+        return zip(bounds[:-1], bounds[1:])
@@ -0,0 +1,94 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import block
+
+
+def run_passes(offsets, expected_of, fill, verify, evictor=None, fused=False):
+    """
+    Runs all sweeps of iter_passes.
+
+    return: list of booleans, True for each frame that matched all patterns
+    """
+    return block.finish(iter_passes(offsets, expected_of, fill, verify, evictor, fused))
+
+
+def iter_passes(offsets, expected_of, fill, verify, evictor=None, fused=False):
+    """
+    Runs one write pass and one verify pass per pattern over the frames at offsets, as steps
+    (see block.test_steps): yields None after each sweep and the result as last value.
+
+    - expected_of is a list with one function per pattern: expected_of[k](offset) returns the
+      bytes of pattern k for the frame at offset
+    - fill(offset, expected) writes a frame, verify(offset, expected) checks (and reports) it
+      and returns True if the frame matched
+    - evictor (optional) is a CacheEvictor, used between each write and the following verify sweep
+
+    Unfused, each pattern is written to all frames and then verified: 2 sweeps per pattern.
+    fused verifies pattern k and writes pattern k+1 to the same frame in a single sweep, so n
+    patterns take n + 1 sweeps. Each frame sees the same writes and reads in the same order.
+
+    result: list of booleans, True for each frame that matched all patterns
+    """
+    is_ok = [True] * len(offsets)
+    if not expected_of:
+        yield is_ok
+        return
+
+    if not fused:
+        for pattern in expected_of:
+            for offset in offsets:
+                fill(offset, pattern(offset))
+            yield None
+
+            if evictor:
+                evictor.evict()
+
+            for frame, offset in enumerate(offsets):
+                is_ok[frame] = verify(offset, pattern(offset)) and is_ok[frame]
+            yield None
+
+        yield is_ok
+        return
+
+    for offset in offsets:
+        fill(offset, expected_of[0](offset))
+    yield None
+
+    for pattern, next_pattern in zip(expected_of[:-1], expected_of[1:]):
+        if evictor:
+            evictor.evict()
+
+        for frame, offset in enumerate(offsets):
+            is_ok[frame] = verify(offset, pattern(offset)) and is_ok[frame]
+            fill(offset, next_pattern(offset))
+        yield None
+
+    if evictor:
+        evictor.evict()
+
+    for frame, offset in enumerate(offsets):
+        is_ok[frame] = verify(offset, expected_of[-1](offset)) and is_ok[frame]
+
+    yield is_ok
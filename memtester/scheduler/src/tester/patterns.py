@@ -0,0 +1,134 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import random
+import struct
+
+# At most this many pattern pages are cached per pattern
+MAX_CACHED = 1024
+
+_registry = {}
+
+
+class Pattern(object):
+    '''
+    A registered pattern: generator(offset, length) returns the pattern bytes for
+    region[offset..offset+(length -1)] as string.
+
+    period is the distance after which the pattern repeats: the pattern for offset equals the
+    pattern for offset % period. period = 1 means the pattern does not depend on the offset,
+    period = None that it has to be generated for each offset.
+    '''
+
+    def __init__(self, name, generator, period):
+        self.name = name
+        self.generator = generator
+        self.period = period
+        self.cache = {}
+
+    def get(self, offset, length):
+        key = (offset % self.period if self.period else offset, length)
+        page = self.cache.get(key)
+        if page is None:
+            if len(self.cache) >= MAX_CACHED:
+                self.cache.clear()
+            page = str(self.generator(offset, length))
+            if len(page) != length:
+                raise ValueError("The `%s` pattern generated %d bytes instead of %d" % (self.name, len(page), length))
+            self.cache[key] = page
+        return page
+
+
+def register(name, generator, period=None):
+    """
+    Registers (or replaces) the pattern name, see Pattern. Registered patterns can be used by
+    name by every tester that takes pattern names, e.g. the LinearScanner.
+    """
+    _registry[name] = Pattern(name, generator, period)
+
+
+def names():
+    """
+    return: the names of all registered patterns, sorted
+    """
+    return sorted(_registry)
+
+
+def get(name, offset, length):
+    """
+    Returns the (read-only) string with the pattern name for region[offset..offset+(length -1)].
+    Each pattern page is generated once per process and shared by all testers, so fill and verify
+    are a single slice assignment/compare (or memmove/memcmp) per frame.
+    """
+    try:
+        pattern = _registry[name]
+    except KeyError:
+        raise ValueError("Unknown pattern `%s`, known patterns: %s" % (name, ", ".join(names())))
+    return pattern.get(offset, length)
+
+
+def constant(value, length):
+    """
+    Returns a (read-only) string of length bytes, each set to value
+    """
+    name = "constant-%02x" % value
+    if not name in _registry:
+        register(name, lambda offset, length: chr(value) * length, period=1)
+    return get(name, 0, length)
+
+
+def cyclic(cycle, offset, length):
+    """
+    The bytes offset..offset+(length -1) of cycle repeated endlessly
+    """
+    start = offset % len(cycle)
+    repeats = (start + length) / len(cycle) + 1
+    return (cycle * repeats)[start:start + length]
+
+
+def _address_in_address(offset, length):
+    # Each aligned 64-bit word holds its own offset
+    first_word = offset / 8
+    num_words = (offset + length + 7) / 8 - first_word
+    words = struct.pack("<%dQ" % num_words, *xrange(first_word * 8, (first_word + num_words) * 8, 8))
+    start = offset - first_word * 8
+    return words[start:start + length]
+
+
+def _random(offset, length):
+    # Reproducible: the same offset and length always give the same page
+    if not length:
+        return ""
+    return ("%0*x" % (2 * length, random.Random(offset).getrandbits(8 * length))).decode("hex")
+
+
+register("zeroes", lambda offset, length: "\x00" * length, period=1)
+register("ones", lambda offset, length: "\xff" * length, period=1)
+# byte at offset i is (i % 0xff)
+register("address", lambda offset, length: cyclic(str(bytearray(xrange(0, 0xff))), offset, length), period=0xff)
+register("address-in-address", _address_in_address)
+# 64-bit words alternate between 0x55.. and 0xaa..
+register("checkerboard", lambda offset, length: cyclic("\x55" * 8 + "\xaa" * 8, offset, length), period=16)
+register("inverse-checkerboard", lambda offset, length: cyclic("\xaa" * 8 + "\x55" * 8, offset, length), period=16)
+register("random", _random)
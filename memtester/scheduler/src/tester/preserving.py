@@ -0,0 +1,147 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import ctypes
+import mmap
+
+import block
+import buffers
+
+try:
+    from libc import libc
+    _memcmp = libc().memcmp
+except (ImportError, OSError):
+    _memcmp = None
+
+
+def _address(buf):
+    """
+    Address of the first byte of buf, or None if buf does not expose its memory
+    """
+    if isinstance(buf, (bytearray, mmap.mmap)):
+        return ctypes.addressof(ctypes.c_char.from_buffer(buf))
+    return None
+
+
+def adjacent_runs(offsets, length):
+    """
+    Groups the frames at offsets into runs of adjacent frames.
+
+    return: list of (index of the first frame, offset of the first frame, number of frames)
+    """
+    runs = []
+    for index, offset in enumerate(offsets):
+        if runs and (runs[-1][1] + runs[-1][2] * length == offset):
+            first, first_offset, count = runs[-1]
+            runs[-1] = (first, first_offset, count + 1)
+        else:
+            runs.append((index, offset, 1))
+    return runs
+
+
+class ContentPreservingTest(object):
+    '''
+    Tests frames that are in use (e.g. claimed from the page cache or from a process) without
+    losing their content: each block is saved into a buffer pool, tested with frame_test and
+    restored. The restored frames are verified against the pool.
+
+    The pool is allocated once (max_frames frames, grown if a block needs more) and reused for
+    every block. Save and restore copy each run of adjacent frames with one memmove.
+
+    A block is saved, tested and restored in one go: there are no test_steps, as a block
+    aborted between the steps of a time slicer could not be restored. The physmem sources
+    offered by main hand over frames without live content, so main does not use this test.
+    '''
+
+    def __init__(self, frame_test, max_frames=100, frame_size=4096):
+        self.frame_test = frame_test
+        self.reporting = frame_test.reporting
+        self.pool = bytearray(max_frames * frame_size)
+        self.restore_failures = 0
+
+    def name(self):
+        return "%s (content preserving)" % self.frame_test.name()
+
+    def next_round(self):
+        block.next_round(self.frame_test)
+
+    def test(self, region, offset, len):
+        """
+        Tests region[offset..offset+(length -1)] with frame_test and restores its content.
+
+        return: offset + len, if the frame passed the test and was restored, else 0
+        """
+        if self.test_frames(region, [offset], len)[0]:
+            return offset + len
+        return 0
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Saves the frames region[offset..offset+(length -1)] for each offset in offsets, tests
+        them with frame_test and restores them.
+
+        return: list of booleans, True for each frame that passed the test and was restored
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            raise ValueError("The content preserving test needs a region that supports slices")
+
+        if len(self.pool) < len(offsets) * length:
+            self.pool = bytearray(len(offsets) * length)
+
+        runs = adjacent_runs(offsets, length)
+        for first, offset, count in runs:
+            self._copy(self.pool, first * length, buf, offset, count * length)
+
+        try:
+            is_ok = [bool(ok) for ok in block.test_frames(self.frame_test, region, offsets, length, pfns)]
+        finally:
+            for first, offset, count in runs:
+                self._copy(buf, offset, self.pool, first * length, count * length)
+
+        for first, offset, count in runs:
+            if not self._equal(buf, offset, first * length, count * length):
+                for index in xrange(first, first + count):
+                    if not buffers.verify(buf, offsets[index], str(self.pool[index * length:(index + 1) * length]), self.reporting):
+                        self.restore_failures += 1
+                        is_ok[index] = False
+
+        return is_ok
+
+    def _copy(self, dst, dst_offset, src, src_offset, length):
+        dst_address = _address(dst)
+        src_address = _address(src)
+        if (dst_address is None) or (src_address is None):
+            dst[dst_offset:dst_offset + length] = src[src_offset:src_offset + length]
+        else:
+            ctypes.memmove(dst_address + dst_offset, src_address + src_offset, length)
+
+    def _equal(self, buf, offset, pool_offset, length):
+        """
+        True, if buf[offset..offset+(length -1)] equals the saved content in the pool
+        """
+        buf_address = _address(buf)
+        if _memcmp and (buf_address is not None):
+            return 0 == _memcmp(buf_address + offset, _address(self.pool) + pool_offset, length)
+        return buf[offset:offset + length] == self.pool[pool_offset:pool_offset + length]
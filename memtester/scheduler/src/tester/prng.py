@@ -0,0 +1,150 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+import wordwise
+
+# splitmix64 constants
+_GAMMA = numpy.uint64(0x9e3779b97f4a7c15)
+_MIX_1 = numpy.uint64(0xbf58476d1ce4e5b9)
+_MIX_2 = numpy.uint64(0x94d049bb133111eb)
+_SHIFT_1 = numpy.uint64(30)
+_SHIFT_2 = numpy.uint64(27)
+_SHIFT_3 = numpy.uint64(31)
+
+
+def _mix(x):
+    """
+    splitmix64 finalizer, x is a uint64 scalar or array
+    """
+    x = (x ^ (x >> _SHIFT_1)) * _MIX_1
+    x = (x ^ (x >> _SHIFT_2)) * _MIX_2
+    return x ^ (x >> _SHIFT_3)
+
+
+def frame_seeds(run_id, pfns, pass_number):
+    """
+    The seed of the stream for each pfn in pass pass_number of run run_id
+    """
+    old_settings = numpy.seterr(over='ignore')
+    try:
+        key = _mix(numpy.uint64(run_id) * _GAMMA + numpy.uint64(pass_number))
+        return _mix(key ^ (numpy.asarray(pfns, dtype=numpy.uint64) * _GAMMA))
+    finally:
+        numpy.seterr(**old_settings)
+
+
+def random_words(run_id, pfns, pass_number, words_per_frame):
+    """
+    The pseudo random content of each frame as (frames x words) uint64 array. Word i of
+    a frame is splitmix64(seed + (i + 1) * gamma), a counter based stream: it only depends
+    on (run_id, pfn, pass_number), so a failure can be reproduced offline from the pfn.
+    """
+    old_settings = numpy.seterr(over='ignore')
+    try:
+        seeds = frame_seeds(run_id, pfns, pass_number)
+        counters = (numpy.arange(1, words_per_frame + 1, dtype=numpy.uint64) * _GAMMA)
+        return _mix(seeds[:, numpy.newaxis] + counters)
+    finally:
+        numpy.seterr(**old_settings)
+
+
+class RandomPatternScanner(object):
+    '''
+    Fills each frame with a pseudo random stream seeded from (run id, pfn, pass) and verifies it.
+    Catches data dependent faults that fixed patterns miss. The streams of the last block are
+    cached, so testing a block again (e.g. a retest) does not generate them again.
+    '''
+
+    def __init__(self, reporting, run_id, passes=2, evictor=None, order=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        evictor (optional) is a CacheEvictor, used once per pass between writing and verifying the block
+        order (optional) is the order the words of a block are visited in, e.g. a traversal.RandomLineOrder
+        '''
+        self.reporting = reporting
+        self.evictor = evictor
+        self.order = order
+        self.run_id = run_id
+        self.passes = passes
+        self._cache_key = None
+        self._cached_streams = None
+
+    def name(self):
+        return "Pseudo random pattern test (run id %d, %d passes)" % (self.run_id, self.passes)
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames and seed the streams. Without pfns
+        offset / length is used instead.
+
+        return: numpy bool array, True for each frame that passed the test
+        """
+        if pfns is None:
+            pfns = [offset / length for offset in offsets]
+
+        frames = wordwise.FrameArray(region, offsets, length, self.order)
+        is_ok = numpy.ones(frames.num_frames, dtype=bool)
+
+        for expected in self._streams(pfns, frames.words_per_frame):
+            self._write(frames, expected)
+            self._evict()
+            is_ok &= self._verify(frames, expected)
+
+        return is_ok
+
+    def _streams(self, pfns, words_per_frame):
+        key = (tuple(pfns), words_per_frame)
+        if key != self._cache_key:
+            self._cached_streams = [random_words(self.run_id, pfns, pass_number, words_per_frame)
+                                    for pass_number in xrange(0, self.passes)]
+            self._cache_key = key
+        return self._cached_streams
+
+    def _write(self, frames, expected):
+        frames.write(expected)
+
+    def _evict(self):
+        if self.evictor:
+            self.evictor.evict()
+
+    def _verify(self, frames, expected):
+        actual = frames.read()
+        is_ok = numpy.logical_not((actual != expected).any(axis=1))
+        for row in numpy.flatnonzero(~is_ok):
+            wordwise.report_differences(self.reporting, frames.offsets[row], expected[row], actual[row])
+        return is_ok
@@ -22,11 +22,16 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 '''
 
+import buffers
+
 class QuadraticScanner(object):
     '''
     Scans a memory region (mmap) with n**2  complexity
     '''
 
+    # test_steps yields after this many bytes of the ONEs sweep
+    STEP_BYTES = 256
+
 
     def __init__(self, reporting):
         '''
@@ -44,10 +49,78 @@ class QuadraticScanner(object):
         - region supports __getitem(x)__ and __setitem(x,b)__, with b being casted to a byte 
         - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
         
-        return: last tested offset
+        return: last tested offset, 0 if the frame failed the test
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            return self._test_bytewise(region, offset, len)
+
+        for step in self._steps(buf, offset, len):
+            is_ok = step
+        if not is_ok:
+            return 0
+        return offset+len
+
+    def test_steps(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets as steps
+        (see tester.test_steps): yields after every STEP_BYTES bytes set to ONE.
+
+        result: list of booleans, one per frame (faults go to the reporting, as with test)
+        """
+        buf = buffers.region_buffer(region)
+        results = []
+        for offset in offsets:
+            if buf is None:
+                results.append(self._test_bytewise(region, offset, length) != 0)
+                yield None
+            else:
+                for step in self._steps(buf, offset, length):
+                    if step is not None:
+                        results.append(step)
+                    yield None
+        yield results
+
+    def _steps(self, buf, offset, len):
+        """
+        Yields None every STEP_BYTES bytes and whether the frame passed as the last step
         """
-        
         last_element = offset+len
+
+        zeroes = buffers.constant_pattern(buffers.ZEROES, len)
+        one = chr(buffers.ONES)
+
+        # Test all ZEROes - first reset
+        buffers.fill(buf, offset, zeroes)
+        is_ok = buffers.verify(buf, offset, zeroes, self.reporting)
+
+        # Test all ONEs -- same writes and reads as _test_bytewise, but each read sweep
+        # over region[offset..last_element -1] is one compare against the expected
+        # content: 0xff up to index, 0x00 after. For index these are the bytes
+        # steps[last_element - 1 - index: ][:len]
+        steps = buffers.constant_pattern(buffers.ONES, len) + zeroes
+        for index in xrange(offset, last_element):
+            buf[index:index + 1] = one
+
+            start = last_element - 1 - index
+            if not buffers.verify(buf, offset, steps[start:start + len], self.reporting):
+                is_ok = False
+
+            if (index - offset) % self.STEP_BYTES == self.STEP_BYTES - 1:
+                yield None
+
+        # Test all ZEROes - second reset
+        buffers.fill(buf, offset, zeroes)
+        if not buffers.verify(buf, offset, zeroes, self.reporting):
+            is_ok = False
+        yield is_ok
+
+    def _test_bytewise(self, region, offset, len):
+        """
+        Fallback for regions that only support __getitem(x)__ and __setitem(x,b)__
+        """
+        last_element = offset+len
+        is_ok = True
         
         # Test all ZEROes - first reset
         for index in xrange(offset, last_element):
@@ -57,6 +130,7 @@ class QuadraticScanner(object):
             v =  region[index]
             if not (v == 0):
                 self.reporting.report_bad_memory(index, 0, v)
+                is_ok = False
 
         # Test all ONEs -- quadratic runtime (linear number of writes, quadratic number of reads)
         for index in xrange(offset, last_element):
@@ -66,11 +140,13 @@ class QuadraticScanner(object):
                 v =  region[before]
                 if not (v == 0xff):
                     self.reporting.report_bad_memory(before, 0xff, v)
+                    is_ok = False
             
             for after in xrange( index + 1, last_element):
                 v =  region[after]
                 if not (v == 0x00):
                     self.reporting.report_bad_memory(after, 0x00, v)
+                    is_ok = False
                 
          
         # Test all ZEROes - second reset
@@ -81,5 +157,8 @@ class QuadraticScanner(object):
             v =  region[index]
             if not (v == 0):
                 self.reporting.report_bad_memory(index, 0, v)
-   
+                is_ok = False
+
+        if not is_ok:
+            return 0
         return last_element
@@ -0,0 +1,189 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import Queue
+import threading
+
+
+class FaultRecord(object):
+    '''
+    Compact summary of all faults seen in one frame. The size is fixed: only the first
+    max_samples faults are kept verbatim.
+    '''
+
+    def __init__(self, frame_offset, max_samples):
+        self.frame_offset = frame_offset
+        self.pfn = None
+        self.max_samples = max_samples
+        self.first_offset = None
+        self.last_offset = None
+        self.count = 0
+        # Bits that read 0 (resp. 1) although 1 (resp. 0) was written, ORed over all faults
+        self.stuck_at_0 = 0
+        self.stuck_at_1 = 0
+        self.samples = []
+        self.bit_faults = None
+
+    def add(self, bad_offset, expected_value, actual_value):
+        if (self.first_offset is None) or (bad_offset < self.first_offset):
+            self.first_offset = bad_offset
+        if (self.last_offset is None) or (bad_offset > self.last_offset):
+            self.last_offset = bad_offset
+        self.count += 1
+        self.stuck_at_0 |= expected_value & ~actual_value
+        self.stuck_at_1 |= ~expected_value & actual_value
+        if len(self.samples) < self.max_samples:
+            self.samples.append((bad_offset, expected_value, actual_value))
+
+    def __str__(self):
+        if self.pfn is None:
+            frame = "frame at offset 0x%x" % self.frame_offset
+        else:
+            frame = "frame pfn 0x%x" % self.pfn
+
+        ret = "BAD %s: %d faults in offsets 0x%x..0x%x, stuck-at-0/stuck-at-1 bits 0x%x/0x%x, samples (offset:expected/got) %s" % (frame,
+                self.count, self.first_offset, self.last_offset, self.stuck_at_0, self.stuck_at_1,
+                ", ".join("0x%x:0x%x/0x%x" % sample for sample in self.samples))
+        if self.bit_faults:
+            ret += ", bit lanes stuck-at-0/stuck-at-1/coupled 0x%016x/0x%016x/0x%016x" % self.bit_faults
+        return ret
+
+
+class BandwidthRecord(object):
+    '''
+    Bandwidth achieved while streaming over the frames of one block (see BandwidthStressTest)
+    '''
+
+    def __init__(self, frame_offset, frames, node, bytes_per_second, cached):
+        self.frame_offset = frame_offset
+        self.frames = frames
+        self.node = node
+        self.bytes_per_second = bytes_per_second
+        self.cached = cached
+
+    def __str__(self):
+        return "%s, %d frames at offset 0x%x (node %s) : %.1f MiB/s" % ("Cache bandwidth" if self.cached else "Bandwidth",
+                self.frames, self.frame_offset, "?" if self.node is None else self.node, self.bytes_per_second / (1 << 20))
+
+
+class SummarizingTestReporting(object):
+    '''
+    Test reporting that collects the faults of each frame into one FaultRecord instead of
+    reporting every bad byte. flush() hands the records to a background thread that calls
+    emit(record) once per frame, so a dead frame does not stall the tester. Bandwidths
+    (see report_bandwidth) are handed to the same thread as BandwidthRecords.
+
+    Memory is bounded: at most max_frames records are collected between two flushes and at most
+    queue_size records wait for the background thread. Faults of further frames are only counted
+    in dropped_faults, records that do not fit into the queue in dropped_summaries. close()
+    resets both counters, they count what was dropped since the last close.
+    '''
+
+    def __init__(self, emit, frame_size=0x1000, max_samples=4, max_frames=128, queue_size=1024):
+        self.emit = emit
+        self.frame_size = frame_size
+        self.max_samples = max_samples
+        self.max_frames = max_frames
+        self.records = {}
+        self.dropped_faults = 0
+        self.dropped_summaries = 0
+        self.queue = Queue.Queue(queue_size)
+        self.worker = threading.Thread(target=self._emit_records, name="fault summaries")
+        self.worker.daemon = True
+        self.worker.start()
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        record = self._record(bad_offset)
+        if record:
+            record.add(bad_offset, expected_value, actual_value)
+
+    def report_bit_faults(self, frame_offset, stuck_at_0, stuck_at_1, coupled):
+        record = self._record(frame_offset)
+        if record:
+            record.bit_faults = (stuck_at_0, stuck_at_1, coupled)
+
+    def report_bandwidth(self, frame_offset, frames, node, bytes_per_second, cached):
+        try:
+            self.queue.put_nowait(BandwidthRecord(frame_offset, frames, node, bytes_per_second, cached))
+        except Queue.Full:
+            self.dropped_summaries += 1
+
+    def flush(self, pfn_by_offset=None):
+        """
+        Emits (asynchronously) one summary for each frame with faults since the last flush.
+        pfn_by_offset maps the offset of the first byte of a frame to its pfn.
+        """
+        for frame_offset in sorted(self.records):
+            record = self.records[frame_offset]
+            if pfn_by_offset:
+                record.pfn = pfn_by_offset.get(frame_offset)
+            try:
+                self.queue.put_nowait(record)
+            except Queue.Full:
+                self.dropped_summaries += 1
+        self.records = {}
+
+    def detach(self):
+        """
+        Takes the records collected since the last flush out (see block.detach_reports)
+        """
+        records = self.records
+        self.records = {}
+        return records
+
+    def attach(self, records):
+        """
+        Continues with records taken out by detach (None: none), instead of the current ones
+        """
+        self.records = records or {}
+
+    def close(self):
+        """
+        Waits until all flushed summaries are emitted and returns (dropped_faults, dropped_summaries)
+        since the last close
+        """
+        self.queue.join()
+        dropped = (self.dropped_faults, self.dropped_summaries)
+        self.dropped_faults = 0
+        self.dropped_summaries = 0
+        return dropped
+
+    def _record(self, offset):
+        frame_offset = offset - (offset % self.frame_size)
+        record = self.records.get(frame_offset)
+        if record is None:
+            if len(self.records) >= self.max_frames:
+                self.dropped_faults += 1
+                return None
+            record = FaultRecord(frame_offset, self.max_samples)
+            self.records[frame_offset] = record
+        return record
+
+    def _emit_records(self):
+        while True:
+            record = self.queue.get()
+            try:
+                self.emit(record)
+            finally:
+                self.queue.task_done()
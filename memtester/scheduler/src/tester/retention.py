@@ -0,0 +1,85 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import buffers
+
+
+class RetentionScanner(object):
+    '''
+    Data retention test: each pass writes a pattern to the frames and verifies it later,
+    after the frames have been left alone for a while. Weak cells that lose their charge
+    within that time are not visible to an immediate read back.
+
+    Passes write all ONEs and all ZEROes, so that every cell holds each value once.
+    The waiting is up to the caller (see the retention mode of the blockwise scheduler):
+    write_frames(.., pass_number), wait, verify_frames(.., pass_number) for each pass.
+    test() runs all passes without waiting.
+    '''
+
+    PATTERNS = (buffers.ONES, buffers.ZEROES)
+
+    def __init__(self, reporting):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        self.reporting = reporting
+
+    def name(self):
+        return "Data retention test"
+
+    def passes(self):
+        return len(self.PATTERNS)
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        for pass_number in xrange(0, self.passes()):
+            self.write_frames(region, [offset], len, pass_number)
+            self.verify_frames(region, [offset], len, pass_number)
+        return offset + len
+
+    def write_frames(self, region, offsets, length, pass_number):
+        """
+        Writes the pattern of pass pass_number to the frames region[offset..offset+(length -1)]
+        for each offset in offsets.
+        """
+        buf = buffers.region_buffer(region)
+        expected = buffers.constant_pattern(self.PATTERNS[pass_number], length)
+        for offset in offsets:
+            buffers.fill(buf, offset, expected)
+
+    def verify_frames(self, region, offsets, length, pass_number):
+        """
+        Verifies the pattern written by write_frames(region, offsets, length, pass_number).
+
+        return: list of booleans, True for each frame that still holds the pattern
+        """
+        buf = buffers.region_buffer(region)
+        expected = buffers.constant_pattern(self.PATTERNS[pass_number], length)
+        return [buffers.verify(buf, offset, expected, self.reporting) for offset in offsets]
@@ -0,0 +1,131 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+import buffers
+from wordwise import WORD_SIZE, report_differences
+
+LINE_SIZE = 64
+
+# One pattern per round, rotating
+PATTERNS = (buffers.ZEROES, buffers.ONES, None)
+
+
+class SamplingScanner(object):
+    '''
+    Triage test: writes and verifies only one cache line in stride of each frame.
+
+    Frames are stratified by pfn: in round r, frame pfn tests the lines (r + pfn) % stride,
+    (r + pfn) % stride + stride, ... with the pattern PATTERNS[r % 3] (ZEROES, ONES or ADDRESS).
+    stride and 3 are coprime for the default stride of 8, so after 3 * stride rounds (see next_round)
+    each line has been tested with every pattern.
+
+    A sample says little about a frame that passes, so use it with a full test for the frames
+    that fail (see the escalation_test of the blockwise scheduler).
+    '''
+
+    def __init__(self, reporting, stride=8):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        self.reporting = reporting
+        self.stride = stride
+        self.round = 0
+
+    def name(self):
+        return "Sampling triage test (1 cache line in %d)" % self.stride
+
+    def next_round(self):
+        """
+        Called before each sweep over all frames: tests other lines with the next pattern
+        """
+        self.round += 1
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are sampled
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def sampled_words(self, offsets, length, pfns=None):
+        """
+        return: (frames x sampled words) array with the word index (into the region) of each sampled word
+        """
+        if (length % LINE_SIZE) or any(offset % WORD_SIZE for offset in offsets):
+            raise ValueError("Length must be a multiple of %d, offsets a multiple of %d" % (LINE_SIZE, WORD_SIZE))
+        if pfns is None:
+            pfns = [offset / length for offset in offsets]
+
+        lines_per_frame = length / LINE_SIZE
+        words_per_line = LINE_SIZE / WORD_SIZE
+        phases = (self.round + numpy.asarray(pfns, dtype=numpy.int64)) % self.stride
+
+        # Line index of each sample, relative to its frame
+        lines = phases[:, numpy.newaxis] + numpy.arange(0, lines_per_frame - self.stride + 1, self.stride)
+        words = (lines * words_per_line)[:, :, numpy.newaxis] + numpy.arange(words_per_line)
+        first_words = numpy.asarray(offsets, dtype=numpy.int64) / WORD_SIZE
+        return first_words[:, numpy.newaxis] + words.reshape(len(offsets), -1)
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Samples the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames, they select the sampled lines.
+
+        return: numpy bool array, True for each frame whose sample passed the test
+        """
+        if not len(offsets):
+            return numpy.ones(0, dtype=bool)
+
+        words = numpy.frombuffer(buffers.region_buffer(region), dtype=numpy.uint64)
+        index = self.sampled_words(offsets, length, pfns)
+
+        pattern = PATTERNS[self.round % len(PATTERNS)]
+        if pattern is None:
+            # ADDRESS: byte at offset i is (i % 0xff)
+            byte_offsets = (index * WORD_SIZE)[:, :, numpy.newaxis] + numpy.arange(WORD_SIZE)
+            expected = (byte_offsets % 0xff).astype(numpy.uint8).view(numpy.uint64).reshape(index.shape)
+        else:
+            expected = numpy.uint64(int("%02x" % pattern * WORD_SIZE, 16))
+
+        self._write(words, index, expected)
+        actual = words[index]
+
+        mismatches = actual != expected
+        is_ok = numpy.logical_not(mismatches.any(axis=1))
+
+        if not is_ok.all():
+            expected = numpy.broadcast_to(expected, actual.shape)
+            for row, column in zip(*numpy.nonzero(mismatches)):
+                report_differences(self.reporting, index[row, column] * WORD_SIZE, expected[row, column:column + 1], actual[row, column:column + 1])
+
+        return is_ok
+
+    def _write(self, words, index, expected):
+        words[index] = expected
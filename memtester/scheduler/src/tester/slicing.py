@@ -0,0 +1,147 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import time
+
+import block
+
+
+class TestAborted(Exception):
+    '''
+    Raised by TimeSlicer.run when the test of a block is abandoned because of memory pressure.
+    The frames of the block have no result.
+    '''
+
+
+def _available_bytes(proc_root):
+    """
+    MemAvailable from {proc_root}/meminfo in bytes, or None if the kernel does not list it
+    """
+    try:
+        with open(os.path.join(proc_root, 'meminfo')) as f:
+            for line in f:
+                fields = line.split()
+                if fields[0] == 'MemAvailable:':
+                    return int(fields[1]) * 1024
+    except (IOError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _pressure_some_avg10(proc_root):
+    """
+    The `some avg10` value (percent of the last 10 seconds some task stalled on memory) from
+    {proc_root}/pressure/memory, or None without PSI support
+    """
+    try:
+        with open(os.path.join(proc_root, 'pressure', 'memory')) as f:
+            for line in f:
+                fields = line.split()
+                if fields and fields[0] == 'some':
+                    return float(dict(field.split('=', 1) for field in fields[1:])['avg10'])
+    except (IOError, ValueError, KeyError):
+        pass
+    return None
+
+
+class MemoryPressure(object):
+    '''
+    Memory pressure is high when less than min_available_bytes are available (MemAvailable)
+    or when the memory PSI `some avg10` exceeds max_some_avg10 percent.
+    Unset limits (None) and values the kernel does not provide are not checked.
+    proc is read at most once per check_interval seconds.
+    '''
+
+    def __init__(self, min_available_bytes=None, max_some_avg10=None, proc_root='/proc', check_interval=0.5):
+        self.min_available_bytes = min_available_bytes
+        self.max_some_avg10 = max_some_avg10
+        self.proc_root = proc_root
+        self.check_interval = check_interval
+        self._checked_at = None
+        self._is_high = False
+
+    def is_high(self):
+        now = time.time()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._is_high
+        self._checked_at = now
+
+        self._is_high = False
+        if self.min_available_bytes is not None:
+            available = _available_bytes(self.proc_root)
+            if available is not None and available < self.min_available_bytes:
+                self._is_high = True
+        if self.max_some_avg10 is not None and not self._is_high:
+            some_avg10 = _pressure_some_avg10(self.proc_root)
+            if some_avg10 is not None and some_avg10 > self.max_some_avg10:
+                self._is_high = True
+        return self._is_high
+
+
+class TimeSlicer(object):
+    '''
+    Runs a tester step by step (see tester.test_steps). After slice_seconds of work the
+    slicer yields the cpu for pause_seconds, so that co-located services see bounded latencies.
+    Between steps it checks pressure (a MemoryPressure) and raises TestAborted when it is high.
+
+    A step is never interrupted: the granularity is that of the tester (a pass of the linear
+    test, STEP_BYTES of the quadratic test, a frame for testers without steps).
+    '''
+
+    def __init__(self, slice_seconds, pause_seconds=0, pressure=None):
+        self.slice_seconds = slice_seconds
+        self.pause_seconds = pause_seconds
+        self.pressure = pressure
+        self.steps = 0
+        self.slices = 0
+
+    def run(self, frame_test, region, offsets, length, pfns=None):
+        """
+        Same as tester.test_frames, but in time slices.
+
+        return: sequence of booleans, True for each frame that passed the test
+        """
+        self._check_pressure()
+        slice_end = time.time() + self.slice_seconds
+        self.slices += 1
+
+        for result in block.test_steps(frame_test, region, offsets, length, pfns):
+            if result is not None:
+                # The last value is the result, not a step
+                return result
+
+            self.steps += 1
+            if time.time() < slice_end:
+                continue
+
+            if self.pause_seconds > 0:
+                time.sleep(self.pause_seconds)
+            self._check_pressure()
+            slice_end = time.time() + self.slice_seconds
+            self.slices += 1
+
+    def _check_pressure(self):
+        if self.pressure and self.pressure.is_high():
+            raise TestAborted("Memory pressure is high")
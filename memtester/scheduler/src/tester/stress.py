@@ -0,0 +1,246 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import glob
+import mmap
+import os
+import time
+
+import buffers
+import patterns
+from eviction import last_level_cache_size
+from preserving import adjacent_runs
+
+
+class NumaTopology(object):
+    '''
+    Finds the NUMA node of a pfn via the memory blocks listed under
+    {sysfs_root}/node/node*/memory* (block size: {sysfs_root}/memory/block_size_bytes).
+    Without that information (no NUMA, no memory hotplug support) node_of returns None.
+    '''
+
+    def __init__(self, sysfs_root='/sys/devices/system', page_size=0x1000):
+        self.page_size = page_size
+        self.block_size = None
+        self.node_by_block = {}
+
+        try:
+            with open(os.path.join(sysfs_root, 'memory', 'block_size_bytes')) as f:
+                self.block_size = int(f.read().strip(), 16)
+        except (IOError, ValueError):
+            return
+
+        for memory in glob.glob(os.path.join(sysfs_root, 'node', 'node[0-9]*', 'memory[0-9]*')):
+            node = int(os.path.basename(os.path.dirname(memory))[4:])
+            self.node_by_block[int(os.path.basename(memory)[6:])] = node
+
+    def node_of(self, pfn):
+        if not self.block_size:
+            return None
+        return self.node_by_block.get(pfn * self.page_size / self.block_size)
+
+
+class _BadOffsets(object):
+    def __init__(self, reporting):
+        self.reporting = reporting
+        self.offsets = set()
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        self.offsets.add(bad_offset)
+        self.reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+
+
+class _UnlessCopied(object):
+    '''
+    Drops the reports of copied bytes whose source was already bad
+    '''
+    def __init__(self, reporting, bad_sources, distance):
+        self.reporting = reporting
+        self.bad_sources = bad_sources
+        self.distance = distance
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        if not (bad_offset - self.distance) in self.bad_sources:
+            self.reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+
+
+def _copy(buf, destination, source, count):
+    """
+    Copies count bytes inside buf without an intermediate string (mmap.move, or a memoryview
+    for a bytearray). Other buffers copy through a slice.
+    """
+    if isinstance(buf, mmap.mmap):
+        buf.move(destination, source, count)
+    elif isinstance(buf, bytearray):
+        buf[destination:destination + count] = memoryview(buf)[source:source + count]
+    else:
+        buf[destination:destination + count] = buf[source:source + count]
+
+
+class BandwidthStressTest(object):
+    '''
+    Streams over each run of adjacent frames of a block as fast as the buffer allows, for
+    duration seconds per block (at least one round). A round writes the run with a pattern
+    and reads it back, then writes the first half with the next pattern, reads it back,
+    copies it over the second half and reads the copy back. All writes, copies and reads
+    are single slice operations (or one mmap.move) over the whole run. Bytes copied from a
+    bad source byte are not reported again.
+
+    A block (at most 100 frames) fits into the last level cache, so with an evictor (see
+    eviction.CacheEvictor) the caches are evicted before each of these operations: then
+    every operation streams from and to DRAM. The evictions are not part of the measured time.
+
+    Besides pass/fail the achieved bandwidth (bytes read + written per second) is recorded
+    per NUMA node (see bandwidth_by_node) and reported per block via
+    reporting.report_bandwidth(frame_offset, frames, node, bytes_per_second, cached), if the
+    reporting has it. The node of a block is that of its first frame (None if unknown).
+    Without an evictor a block that fits into the last level cache (cache_size bytes, by
+    default the size found by last_level_cache_size) is streamed from the cache after the
+    first operation, so its number is cache bandwidth: cached is True for such blocks.
+    '''
+
+    # Position independent patterns, so that copied halves match the pattern as well
+    PATTERNS = ("checkerboard", "inverse-checkerboard", "ones", "zeroes")
+
+    def __init__(self, reporting, duration=0.5, topology=None, cache_size=None, evictor=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        '''
+        self.reporting = reporting
+        self.duration = duration
+        self.topology = topology or NumaTopology()
+        self.cache_size = cache_size if cache_size is not None else last_level_cache_size()
+        self.evictor = evictor
+        self.round = 0
+        self.bytes_by_node = {}
+        self.seconds_by_node = {}
+
+    def name(self):
+        return "Bandwidth stress test"
+
+    def bandwidth_by_node(self, cached=False):
+        """
+        return: dict node -> bytes per second over all blocks so far that were streamed from
+        the cache (cached) or from DRAM
+        """
+        return dict((node, self.bytes_by_node[(node, in_cache)] / self.seconds_by_node[(node, in_cache)])
+                    for node, in_cache in self.bytes_by_node
+                    if in_cache == cached and self.seconds_by_node[(node, in_cache)] > 0)
+
+    def test(self, region, offset, len):
+        """
+        - region supports the buffer protocol (see buffers.region_buffer)
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset, 0 if the frame failed the test
+        """
+        if not self.test_frames(region, [offset], len)[0]:
+            return 0
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+
+        return: list of booleans, True for each frame that passed the test
+        """
+        buf = buffers.region_buffer(region)
+        if buf is None:
+            raise ValueError("The bandwidth stress test needs a region with a buffer")
+        if not offsets:
+            return []
+
+        bad = _BadOffsets(self.reporting)
+        runs = adjacent_runs(offsets, length)
+        # The patterns of the runs and of their first halves, built once per block
+        run_patterns = {}
+        for first, offset, count in runs:
+            if not count in run_patterns:
+                whole = [patterns.get(name, 0, length) * count for name in self.PATTERNS]
+                run_patterns[count] = (whole, [pattern[:count * length / 2] for pattern in whole])
+
+        moved = 0
+        seconds = 0.0
+        deadline = time.time() + self.duration
+        while True:
+            for first, offset, count in runs:
+                run_bytes, run_seconds = self._stream(buf, offset, length, count, run_patterns[count], bad)
+                moved += run_bytes
+                seconds += run_seconds
+            self.round += 1
+            if time.time() >= deadline:
+                break
+
+        node = self.topology.node_of(pfns[0]) if pfns else None
+        cached = (self.evictor is None) and bool(self.cache_size) and len(offsets) * length <= self.cache_size
+        key = (node, cached)
+        self.bytes_by_node[key] = self.bytes_by_node.get(key, 0) + moved
+        self.seconds_by_node[key] = self.seconds_by_node.get(key, 0.0) + seconds
+
+        report_bandwidth = getattr(self.reporting, 'report_bandwidth', None)
+        if report_bandwidth and seconds > 0:
+            report_bandwidth(offsets[0], len(offsets), node, moved / seconds, cached)
+
+        return [not any(offset <= bad_offset < offset + length for bad_offset in bad.offsets) for offset in offsets]
+
+    def _stream(self, buf, offset, length, count, run_patterns, reporting):
+        """
+        One round over the run of count frames at offset. run_patterns are the lists of the
+        whole and of the half run patterns, in the order of PATTERNS.
+
+        return: (number of bytes read and written, seconds taken)
+        """
+        whole, halves = run_patterns
+        pattern = whole[self.round % len(whole)]
+        next_half = halves[(self.round + 1) % len(halves)]
+        size = count * length
+        half = size / 2
+        sources = _BadOffsets(reporting)
+
+        # Write and read the whole run
+        seconds = self._timed(buffers.fill, buf, offset, pattern)
+        seconds += self._timed(buffers.verify, buf, offset, pattern, reporting)
+
+        # Write and read the first half, so that faults of the source are not blamed on the copy
+        seconds += self._timed(buffers.fill, buf, offset, next_half)
+        seconds += self._timed(buffers.verify, buf, offset, next_half, sources)
+
+        # Copy it over the second half, read the copy
+        seconds += self._timed(_copy, buf, offset + half, offset, half)
+        seconds += self._timed(buffers.verify, buf, offset + half, next_half, _UnlessCopied(reporting, sources.offsets, half))
+
+        return 2 * size + 5 * half, seconds
+
+    def _timed(self, operation, *args):
+        """
+        Evicts the caches (if there is an evictor) and runs operation(*args)
+
+        return: seconds taken by operation
+        """
+        if self.evictor:
+            self.evictor.evict()
+        start = time.time()
+        operation(*args)
+        return time.time() - start
@@ -0,0 +1,70 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+# 64 byte cache lines of 8 byte words
+WORDS_PER_LINE = 8
+
+
+class RandomLineOrder(object):
+    '''
+    Visits the cache lines of a block in a random order instead of ascending offsets, so that
+    hardware prefetchers cannot hide the latency (and with it some address decoder and timing
+    faults). The words of a line stay in ascending order.
+
+    The permutation depends on seed, the round (see next_round) and the number of lines. It is
+    computed once per round and block size (see wordwise.FrameArray for its use).
+    '''
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.round = 0
+        self._positions = {}
+
+    def name(self):
+        return "random cache line order"
+
+    def next_round(self):
+        """
+        Called before each sweep over all frames: uses a new permutation
+        """
+        self.round += 1
+        self._positions.clear()
+
+    def word_positions(self, num_words):
+        """
+        return: the indices 0..num_words-1 in the order they are visited, a random
+                permutation of whole cache lines
+        """
+        if num_words % WORDS_PER_LINE:
+            raise ValueError("The random line order needs whole cache lines, not %d words" % num_words)
+
+        positions = self._positions.get(num_words)
+        if positions is None:
+            random_state = numpy.random.RandomState([self.seed & 0xffffffff, self.round & 0xffffffff, num_words & 0xffffffff])
+            lines = random_state.permutation(num_words / WORDS_PER_LINE)
+            positions = ((lines * WORDS_PER_LINE)[:, numpy.newaxis] + numpy.arange(WORDS_PER_LINE)).reshape(-1)
+            self._positions[num_words] = positions
+        return positions
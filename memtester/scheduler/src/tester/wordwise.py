@@ -0,0 +1,211 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import numpy
+
+import buffers
+
+WORD_SIZE = 8
+
+ALL_ZEROES = numpy.uint64(0)
+ALL_ONES = numpy.uint64(0xffffffffffffffff)
+
+
+class FrameArray(object):
+    '''
+    Views the frames region[offset..offset+(length -1)] for all offsets as one
+    (frames x words) uint64 array. Contiguous, equally spaced frames are a zero-copy
+    view into the region, all other layouts are accessed via an index array.
+
+    With an order (e.g. a traversal.RandomLineOrder) write() and read() visit the words of the
+    block in that order, through a precomputed scatter/gather index.
+    '''
+
+    def __init__(self, region, offsets, length, order=None):
+        if (length % WORD_SIZE) or any(offset % WORD_SIZE for offset in offsets):
+            raise ValueError("Offsets and length must be multiples of %d" % WORD_SIZE)
+
+        self.offsets = numpy.asarray(offsets, dtype=numpy.int64)
+        self.length = length
+        self.num_frames = len(offsets)
+        self.words_per_frame = length / WORD_SIZE
+
+        words = numpy.frombuffer(buffers.region_buffer(region), dtype=numpy.uint64)
+        first_word = self.offsets[0] / WORD_SIZE if self.num_frames else 0
+        is_contiguous = numpy.array_equal(self.offsets, self.offsets[0] + length * numpy.arange(self.num_frames)) if self.num_frames else True
+
+        if is_contiguous:
+            self._view = words[first_word:first_word + self.num_frames * self.words_per_frame].reshape(self.num_frames, self.words_per_frame)
+            self._words = None
+            self._index = None
+        else:
+            self._view = None
+            self._words = words
+            self._index = (self.offsets / WORD_SIZE)[:, numpy.newaxis] + numpy.arange(self.words_per_frame)
+
+        self._positions = None
+        if order is not None:
+            self._positions = order.word_positions(self.num_frames * self.words_per_frame)
+            self._words = words
+            if self._index is None:
+                self._ordered_index = first_word + self._positions
+            else:
+                self._ordered_index = self._index.reshape(-1)[self._positions]
+
+    def write(self, pattern):
+        """
+        pattern is either a scalar or a (frames x words) array
+        """
+        if self._positions is not None:
+            if numpy.ndim(pattern):
+                pattern = numpy.broadcast_to(pattern, (self.num_frames, self.words_per_frame)).reshape(-1)[self._positions]
+            self._words[self._ordered_index] = pattern
+        elif self._view is not None:
+            self._view[...] = pattern
+        else:
+            self._words[self._index] = pattern
+
+    def read(self):
+        if self._positions is not None:
+            actual = numpy.empty(self.num_frames * self.words_per_frame, dtype=numpy.uint64)
+            actual[self._positions] = self._words[self._ordered_index]
+            return actual.reshape(self.num_frames, self.words_per_frame)
+        if self._view is not None:
+            return self._view
+        return self._words[self._index]
+
+    def write_column(self, word, value):
+        """
+        Writes value to the word with index word in all frames
+        """
+        if self._view is not None:
+            self._view[:, word] = value
+        else:
+            self._words[self._index[:, word]] = value
+
+    def read_column(self, word):
+        """
+        Returns the word with index word of all frames
+        """
+        if self._view is not None:
+            return self._view[:, word]
+        return self._words[self._index[:, word]]
+
+    def word_offsets(self, word):
+        """
+        Returns the offsets of the word with index word in all frames
+        """
+        return self.offsets + word * WORD_SIZE
+
+
+def address_words(offsets, length):
+    """
+    The ADDRESS pattern (byte at offset i is (i % 0xff)) for each frame, as (frames x words) array
+    """
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    as_bytes = ((offsets[:, numpy.newaxis] + numpy.arange(length)) % 0xff).astype(numpy.uint8)
+    return as_bytes.view(numpy.uint64)
+
+
+class WordwiseScanner(object):
+    '''
+    Scans many frames of a memory region with linear complexity. All frames of a block are
+    tested together as one (frames x words) uint64 array, so each pass is a single vectorized
+    operation. Runs the same ZEROES/ONES/ADDRESS passes as the LinearScanner.
+    '''
+
+    def __init__(self, reporting, evictor=None, order=None):
+        '''
+        Constructor
+        reporting.report_bad_memory(bad_offset, expected_value, actual_value)
+        evictor (optional) is a CacheEvictor, used once per pass between writing and verifying the block
+        order (optional) is the order the words of a block are visited in, e.g. a traversal.RandomLineOrder
+        '''
+        self.reporting = reporting
+        self.evictor = evictor
+        self.order = order
+
+    def name(self):
+        return "Word-wide (numpy) linear time test"
+
+    def test(self, region, offset, len):
+        """
+        - region supports buffer() or is a bytearray/mmap
+        - offset is the first byte tested, len is the length (1..X). The bytes region[offset..offset+(length -1)] are tested
+
+        return: last tested offset
+        """
+        self.test_frames(region, [offset], len)
+        return offset + len
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        """
+        Tests the frames region[offset..offset+(length -1)] for each offset in offsets.
+        pfns are the page frame numbers of the frames (unused by this test).
+
+        return: numpy bool array, True for each frame that passed the test
+        """
+        frames = FrameArray(region, offsets, length, self.order)
+        is_ok = numpy.ones(frames.num_frames, dtype=bool)
+
+        for expected in (ALL_ZEROES, ALL_ONES, address_words(offsets, length)):
+            self._write(frames, expected)
+            self._evict()
+            is_ok &= self._verify(frames, expected)
+
+        return is_ok
+
+    def _write(self, frames, expected):
+        frames.write(expected)
+
+    def _evict(self):
+        if self.evictor:
+            self.evictor.evict()
+
+    def _verify(self, frames, expected):
+        """
+        Compares all frames with expected and reports the differing bytes of bad frames.
+
+        return: numpy bool array, True for each frame that matched expected
+        """
+        actual = frames.read()
+        is_ok = numpy.logical_not((actual != expected).any(axis=1))
+
+        if not is_ok.all():
+            expected = numpy.broadcast_to(expected, actual.shape)
+            for row in numpy.flatnonzero(~is_ok):
+                report_differences(self.reporting, frames.offsets[row], expected[row], actual[row])
+
+        return is_ok
+
+
+def report_differences(reporting, offset, expected_words, actual_words):
+    """
+    Reports every byte where actual_words differs from expected_words. Both are
+    consecutive words starting at offset.
+    """
+    expected_bytes = numpy.ascontiguousarray(expected_words).view(numpy.uint8)
+    actual_bytes = numpy.ascontiguousarray(actual_words).view(numpy.uint8)
+    for index in numpy.flatnonzero(expected_bytes != actual_bytes):
+        reporting.report_bad_memory(int(offset + index), int(expected_bytes[index]), int(actual_bytes[index]))
@@ -0,0 +1,149 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class BandwidthRecordingReporting(RecordingReporting):
+    def __init__(self):
+        RecordingReporting.__init__(self)
+        self.bandwidths = []
+
+    def report_bandwidth(self, frame_offset, frames, node, bytes_per_second, cached):
+        self.bandwidths.append((frame_offset, frames, node, bytes_per_second, cached))
+
+
+class CountingEvictor(object):
+    def __init__(self):
+        self.evictions = 0
+
+    def evict(self):
+        self.evictions += 1
+
+
+class Test(unittest.TestCase):
+
+    def _sysfs_root(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        os.makedirs(os.path.join(root, "memory"))
+        with open(os.path.join(root, "memory", "block_size_bytes"), "w") as f:
+            f.write("8000000\n")
+        for node, blocks in ((0, [0, 1]), (1, [2])):
+            for block in blocks:
+                os.makedirs(os.path.join(root, "node", "node%d" % node, "memory%d" % block))
+        return root
+
+    def testNodeOfPfn(self):
+        # 128 MiB memory blocks hold 0x8000 frames
+        topology = tester.NumaTopology(self._sysfs_root())
+
+        self.assertEqual(0, topology.node_of(0))
+        self.assertEqual(0, topology.node_of(0xffff))
+        self.assertEqual(1, topology.node_of(0x10000))
+        self.assertEqual(None, topology.node_of(0x18000))
+
+    def testNoTopology(self):
+        topology = tester.NumaTopology(os.path.join(tempfile.gettempdir(), "no-such-sysfs-root"))
+
+        self.assertEqual(None, topology.node_of(0))
+
+    def testFindsFaultyFrames(self):
+        reporting = BandwidthRecordingReporting()
+        test = tester.BandwidthStressTest(reporting, duration=0, topology=tester.NumaTopology(self._sysfs_root()), cache_size=4096)
+        region = FaultyRegion(6 * 4096, stuck_at_0={4 * 4096 + 3: 0x01})
+        # Two runs of adjacent frames
+        is_ok = test.test_frames(region, [0, 4096, 3 * 4096, 4 * 4096, 5 * 4096], 4096, [0x10000, 0x10001, 0x10002, 0x10003, 0x10004])
+
+        self.assertEqual([True, True, True, False, True], is_ok)
+        self.assertEqual([4 * 4096 + 3], sorted(set(report[0] for report in reporting.reports)))
+        self.assertEqual(1, test.round)
+
+        self.assertEqual(1, len(reporting.bandwidths))
+        frame_offset, frames, node, bytes_per_second, cached = reporting.bandwidths[0]
+        self.assertEqual((0, 5, 1, False), (frame_offset, frames, node, cached))
+        self.assertTrue(bytes_per_second > 0)
+        self.assertEqual([1], test.bandwidth_by_node().keys())
+        self.assertEqual({}, test.bandwidth_by_node(cached=True))
+
+    def testBadSourceIsNotBlamedOnTheCopy(self):
+        reporting = RecordingReporting()
+        test = tester.BandwidthStressTest(reporting, duration=0, cache_size=0)
+        # The first half of the run is copied over the second half
+        is_ok = test.test_frames(FaultyRegion(2 * 4096, stuck_at_1={5: 0x01}), [0, 4096], 4096)
+
+        self.assertEqual([False, True], is_ok)
+        self.assertEqual([5], sorted(set(report[0] for report in reporting.reports)))
+
+    def testBadCopyFailsItsFrame(self):
+        reporting = RecordingReporting()
+        test = tester.BandwidthStressTest(reporting, duration=0, cache_size=0)
+        is_ok = test.test_frames(FaultyRegion(2 * 4096, stuck_at_1={4096 + 5: 0x01}), [0, 4096], 4096)
+
+        self.assertEqual([True, False], is_ok)
+
+    def testEvictsBeforeEachOperation(self):
+        reporting = BandwidthRecordingReporting()
+        evictor = CountingEvictor()
+        test = tester.BandwidthStressTest(reporting, duration=0, cache_size=1 << 20, evictor=evictor)
+        # Two runs, six operations each
+        is_ok = test.test_frames(bytearray(4 * 4096), [0, 4096, 3 * 4096], 4096)
+
+        self.assertEqual([True] * 3, is_ok)
+        self.assertEqual(12, evictor.evictions)
+        self.assertEqual(False, reporting.bandwidths[0][4])
+        self.assertEqual([None], test.bandwidth_by_node().keys())
+
+    def testCopyInsideMmap(self):
+        region = mmap.mmap(-1, 2 * 4096)
+        self.addCleanup(region.close)
+        reporting = RecordingReporting()
+        test = tester.BandwidthStressTest(reporting, duration=0.01, cache_size=0)
+
+        self.assertEqual([True, True], test.test_frames(region, [0, 4096], 4096))
+        self.assertEqual(4096, test.test(region, 0, 4096))
+        self.assertEqual([], reporting.reports)
+
+    def testRunsForTheDuration(self):
+        reporting = BandwidthRecordingReporting()
+        test = tester.BandwidthStressTest(reporting, duration=0.05, topology=tester.NumaTopology(self._sysfs_root()), cache_size=1 << 20)
+        is_ok = test.test_frames(FaultyRegion(4 * 4096), [0, 4096, 2 * 4096, 3 * 4096], 4096)
+
+        self.assertEqual([True] * 4, is_ok)
+        self.assertTrue(test.round > 1)
+        # Unknown pfns have no node, the block fits into the cache
+        self.assertEqual([None], test.bandwidth_by_node(cached=True).keys())
+        self.assertEqual({}, test.bandwidth_by_node())
+        self.assertEqual(True, reporting.bandwidths[0][4])
+
+
+if __name__ == "__main__":
+    unittest.main()
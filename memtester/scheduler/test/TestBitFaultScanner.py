@@ -0,0 +1,87 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from faulty_region import RecordingReporting
+
+
+class LaneRecordingReporting(RecordingReporting):
+    def __init__(self):
+        RecordingReporting.__init__(self)
+        self.bit_faults = []
+
+    def report_bit_faults(self, frame_offset, stuck_at_0, stuck_at_1, coupled):
+        self.bit_faults.append((frame_offset, stuck_at_0, stuck_at_1, coupled))
+
+
+class FaultyWordScanner(tester.BitFaultScanner):
+    '''
+    Applies fault(value) to word 17 of the frame at offset 4096 after each write
+    '''
+
+    def __init__(self, reporting, fault):
+        tester.BitFaultScanner.__init__(self, reporting)
+        self.fault = fault
+
+    def _write(self, frames, expected):
+        tester.BitFaultScanner._write(self, frames, expected)
+        words = frames.read()
+        words[1, 17] = self.fault(int(words[1, 17]))
+
+
+class Test(unittest.TestCase):
+
+    def testGoodMemory(self):
+        reporting = LaneRecordingReporting()
+        is_ok = tester.BitFaultScanner(reporting).test_frames(bytearray(2 * 4096), [0, 4096], 4096)
+
+        self.assertEqual([True, True], list(is_ok))
+        self.assertEqual([], reporting.reports)
+        self.assertEqual([], reporting.bit_faults)
+
+    def testStuckAtLanes(self):
+        reporting = LaneRecordingReporting()
+        scanner = FaultyWordScanner(reporting, lambda v: (v & ~(1 << 5)) | (1 << 40))
+        is_ok = scanner.test_frames(bytearray(2 * 4096), [0, 4096], 4096)
+
+        self.assertEqual([True, False], list(is_ok))
+        self.assertEqual([(4096 + 17 * 8, 1 << 0, (1 << 0) | (1 << 40))], reporting.reports)
+        self.assertEqual([(4096, 1 << 5, 1 << 40, 0)], reporting.bit_faults)
+
+    def testCoupledLanes(self):
+        # Writing a 1 to lane 3 flips lane 4 to 1
+        reporting = LaneRecordingReporting()
+        scanner = FaultyWordScanner(reporting, lambda v: v | (1 << 4) if v & (1 << 3) else v)
+        is_ok = scanner.test_frames(bytearray(2 * 4096), [0, 4096], 4096)
+
+        self.assertEqual([True, False], list(is_ok))
+        self.assertEqual([(4096, 0, 0, 1 << 4)], reporting.bit_faults)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import time
+import unittest
+
+import physmem
+import tester
+import status
+import scheduling
+from scheduling.blockwise.frame import FrameStatus
+from fake_physmem import FakePhysmem
+from faulty_region import RecordingReporting
+
+
+class FailingOffsetsTest(object):
+    '''
+    A bytewise tester that fails for the frames at the given vma offsets
+    '''
+
+    def __init__(self, bad_offsets):
+        self.bad_offsets = bad_offsets
+        self.tested_offsets = []
+
+    def name(self):
+        return "Fails for %s" % self.bad_offsets
+
+    def test(self, region, offset, len):
+        self.tested_offsets.append(offset)
+        if offset in self.bad_offsets:
+            return 0
+        return offset + len
+
+
+class RecordingRetentionScanner(tester.RetentionScanner):
+    '''
+    Records the calls, the frame at bad_offset does not retain the pattern of the last pass
+    '''
+
+    def __init__(self, events, bad_offset=None):
+        tester.RetentionScanner.__init__(self, RecordingReporting())
+        self.events = events
+        self.bad_offset = bad_offset
+
+    def write_frames(self, region, offsets, length, pass_number):
+        self.events.append(('write', len(offsets), pass_number, time.time()))
+        tester.RetentionScanner.write_frames(self, region, offsets, length, pass_number)
+        if self.bad_offset is not None and pass_number == self.passes() - 1:
+            region[self.bad_offset] = 0x42
+
+    def verify_frames(self, region, offsets, length, pass_number):
+        self.events.append(('verify', len(offsets), pass_number, time.time()))
+        return tester.RetentionScanner.verify_frames(self, region, offsets, length, pass_number)
+
+
+class RisingPressure(object):
+    '''
+    Stands in for tester.MemoryPressure: high from the check number high_from (counting from 0) on
+    '''
+
+    def __init__(self, high_from):
+        self.high_from = high_from
+        self.checks = 0
+
+    def is_high(self):
+        self.checks += 1
+        return self.checks > self.high_from
+
+
+class RecordingSchedulerReporting(object):
+    def __init__(self):
+        self.good = []
+        self.bad = []
+        self.escalated = []
+        self.aborted = []
+
+    def report_aborted_block(self, pfns):
+        self.aborted.append(pfns)
+
+    def report_escalated_frame(self, pfn):
+        self.escalated.append(pfn)
+
+    def report_good_frame(self, pfn):
+        self.good.append(pfn)
+
+    def report_bad_frame(self, pfn):
+        self.bad.append(pfn)
+
+
+class Test(unittest.TestCase):
+
+    def _run(self, device, frame_test, num_frames=10, retention_seconds=0, max_pending_blocks=8, escalation_test=None, frame_stati=None, slicer=None, policy=None):
+        frame_stati = frame_stati or [FrameStatus() for _ in xrange(num_frames)]
+        reporting = RecordingSchedulerReporting()
+        factory = scheduling.blockwise.SimpleBlockwiseSchedulerFactory(device, frame_test, [None] * num_frames, [0] * num_frames,
+                                                                       status.TimestampingFacility(), reporting,
+                                                                       retention_seconds, max_pending_blocks, escalation_test, slicer, policy)
+        factory.new_instance(frame_stati).run(0, num_frames, physmem.SOURCE_FREE_BUDDY_PAGE)
+        return frame_stati, reporting
+
+    def testMapsEachBlockOnce(self):
+        device = FakePhysmem(unclaimable=[3])
+        frame_test = FailingOffsetsTest([])
+        frame_stati, reporting = self._run(device, frame_test)
+
+        self.assertEqual([('configure', range(10)), ('mmap', 9 * physmem.PAGE_SIZE), ('munmap', 9 * physmem.PAGE_SIZE)], device.events)
+        self.assertEqual([i * physmem.PAGE_SIZE for i in xrange(9)], frame_test.tested_offsets)
+        self.assertEqual([0, 1, 2, 4, 5, 6, 7, 8, 9], reporting.good)
+        self.assertEqual(0, frame_stati[3].last_successfull_test)
+        self.assertTrue(frame_stati[4].last_successfull_test > 0)
+
+    def testBadFramesAreHandledAfterUnmapping(self):
+        device = FakePhysmem(unclaimable=[3])
+        frame_stati, reporting = self._run(device, FailingOffsetsTest([4 * physmem.PAGE_SIZE]))
+
+        # pfn 5 is the fifth claimed frame
+        self.assertEqual([5], reporting.bad)
+        self.assertEqual(('mark_pfn_bad', 5), device.events[-1])
+        self.assertEqual(1, frame_stati[5].num_errors)
+
+    def testRetentionKeepsBlocksClaimedWhileTestingOthers(self):
+        device = FakePhysmem()
+        frame_test = RecordingRetentionScanner(device.events)
+        frame_stati, reporting = self._run(device, frame_test, num_frames=250, retention_seconds=0.1)
+
+        tester_events = [event[:3] for event in device.events if event[0] in ('write', 'verify')]
+        # All three blocks are written before the first one is verified
+        self.assertEqual([('write', 100, 0), ('write', 100, 0), ('write', 50, 0),
+                          ('verify', 100, 0), ('write', 100, 1), ('verify', 100, 0), ('write', 100, 1), ('verify', 50, 0), ('write', 50, 1),
+                          ('verify', 100, 1), ('verify', 100, 1), ('verify', 50, 1)], tester_events)
+
+        writes = [event[3] for event in device.events if event[0] == 'write']
+        verifies = [event[3] for event in device.events if event[0] == 'verify']
+        for written, verified in zip(writes, verifies):
+            self.assertTrue(verified - written >= 0.1)
+
+        self.assertEqual(range(250), reporting.good)
+        self.assertEqual(3, len([event for event in device.events if event == ('close',)]))
+
+    def testRetentionLimitsPendingBlocks(self):
+        device = FakePhysmem()
+        frame_test = RecordingRetentionScanner(device.events)
+        self._run(device, frame_test, num_frames=250, retention_seconds=0.01, max_pending_blocks=1)
+
+        tester_events = [event[:3] for event in device.events if event[0] in ('write', 'verify')]
+        self.assertEqual([('write', 100, 0), ('verify', 100, 0), ('write', 100, 1), ('verify', 100, 1),
+                          ('write', 100, 0), ('verify', 100, 0), ('write', 100, 1), ('verify', 100, 1),
+                          ('write', 50, 0), ('verify', 50, 0), ('write', 50, 1), ('verify', 50, 1)], tester_events)
+
+    def testRetentionMarksBadFramesAfterUnmapping(self):
+        device = FakePhysmem()
+        frame_test = RecordingRetentionScanner(device.events, bad_offset=2 * physmem.PAGE_SIZE + 7)
+        frame_stati, reporting = self._run(device, frame_test, num_frames=10, retention_seconds=0.01)
+
+        self.assertEqual([2], reporting.bad)
+        self.assertEqual([('munmap', 10 * physmem.PAGE_SIZE), ('mark_pfn_bad', 2), ('close',)], device.events[-3:])
+        self.assertEqual([(2 * physmem.PAGE_SIZE + 7, 0x00, 0x42)], frame_test.reporting.reports)
+
+    def testRetentionReportsFaultsPerBlock(self):
+        emitted = []
+
+        class CorruptingRetentionScanner(tester.RetentionScanner):
+            writes = 0
+
+            def write_frames(self, region, offsets, length, pass_number):
+                tester.RetentionScanner.write_frames(self, region, offsets, length, pass_number)
+                self.writes += 1
+                # The first pass of the second block, pfn 102
+                if self.writes == 2:
+                    region[2 * physmem.PAGE_SIZE + 7] = 0x42
+
+        frame_test = CorruptingRetentionScanner(tester.SummarizingTestReporting(emitted.append))
+        frame_stati, reporting = self._run(FakePhysmem(), frame_test, num_frames=250, retention_seconds=0.01)
+        frame_test.reporting.close()
+
+        self.assertEqual([102], reporting.bad)
+        self.assertEqual([102], [record.pfn for record in emitted])
+        self.assertEqual(1, emitted[0].count)
+
+    def testTriageEscalatesFailedSamples(self):
+        device = FakePhysmem(unclaimable=[3])
+        escalation_test = FailingOffsetsTest([])
+        frame_stati, reporting = self._run(device, FailingOffsetsTest([4 * physmem.PAGE_SIZE]), escalation_test=escalation_test)
+
+        self.assertEqual([4 * physmem.PAGE_SIZE], escalation_test.tested_offsets)
+        self.assertEqual([5], reporting.escalated)
+        # A failed sample is a failed test, even if the full test passes
+        self.assertEqual([5], reporting.bad)
+        self.assertEqual([('munmap', 9 * physmem.PAGE_SIZE), ('mark_pfn_bad', 5)], device.events[-2:])
+
+    def testTriageEscalatesFramesWithErrors(self):
+        frame_stati = [FrameStatus() for _ in xrange(10)]
+        frame_stati[7].num_errors = 1
+        escalation_test = FailingOffsetsTest([7 * physmem.PAGE_SIZE])
+        frame_stati, reporting = self._run(FakePhysmem(), FailingOffsetsTest([]), escalation_test=escalation_test, frame_stati=frame_stati)
+
+        self.assertEqual([7 * physmem.PAGE_SIZE], escalation_test.tested_offsets)
+        self.assertEqual([7], reporting.escalated)
+        self.assertEqual([7], reporting.bad)
+        self.assertEqual(2, frame_stati[7].num_errors)
+
+    def testSlicedRunRecordsResults(self):
+        device = FakePhysmem(unclaimable=[3])
+        slicer = tester.TimeSlicer(0, 0)
+        frame_stati, reporting = self._run(device, FailingOffsetsTest([4 * physmem.PAGE_SIZE]), slicer=slicer)
+
+        self.assertEqual([5], reporting.bad)
+        self.assertEqual([0, 1, 2, 4, 6, 7, 8, 9], reporting.good)
+        # The bytewise test is one step per frame, each empty slice ends after one step
+        self.assertEqual(9, slicer.steps)
+        self.assertEqual(10, slicer.slices)
+
+    def testMemoryPressureAbortsTheRun(self):
+        device = FakePhysmem()
+        slicer = tester.TimeSlicer(60, 0, RisingPressure(high_from=1))
+        frame_stati, reporting = self._run(device, FailingOffsetsTest([]), num_frames=250, slicer=slicer)
+
+        # The second block is unmapped and released untested, the third is not claimed at all
+        self.assertEqual([('configure', range(100)), ('mmap', 100 * physmem.PAGE_SIZE), ('munmap', 100 * physmem.PAGE_SIZE),
+                          ('configure', range(100, 200)), ('mmap', 100 * physmem.PAGE_SIZE), ('munmap', 100 * physmem.PAGE_SIZE),
+                          ('configure', [])], device.events)
+        self.assertEqual(range(100), reporting.good)
+        self.assertEqual([range(100, 200)], reporting.aborted)
+        self.assertEqual(0, frame_stati[150].last_successfull_test)
+
+    def testPolicyChoosesTheTestPerFrame(self):
+        frame_stati = [FrameStatus() for _ in xrange(10)]
+        frame_stati[7].num_errors = 1
+        sweep_test = FailingOffsetsTest([])
+        deep_test = FailingOffsetsTest([5 * physmem.PAGE_SIZE])
+        policy = scheduling.TieredPolicy(sweep_test, deep_test, status.TimestampingFacility())
+        frame_stati, reporting = self._run(FakePhysmem(unclaimable=[3]), sweep_test, frame_stati=frame_stati, policy=policy)
+
+        # pfn 3 is not claimed, so pfn 6 is at offset 5
+        self.assertEqual([offset * physmem.PAGE_SIZE for offset in [0, 1, 2, 3, 4, 8]], sweep_test.tested_offsets)
+        self.assertEqual([offset * physmem.PAGE_SIZE for offset in [5, 6, 7]], deep_test.tested_offsets)
+        self.assertEqual([6], reporting.bad)
+        self.assertEqual(1, frame_stati[3].num_claim_failures)
+
+    def testPolicySkipsFramesThatFailClaiming(self):
+        frame_stati = [FrameStatus() for _ in xrange(10)]
+        frame_stati[3].num_claim_failures = 3
+        frame_stati[3].last_claiming_attempt = status.TimestampingFacility().timestamp()
+        frame_test = FailingOffsetsTest([])
+        policy = scheduling.TieredPolicy(frame_test, FailingOffsetsTest([]), status.TimestampingFacility())
+        device = FakePhysmem(unclaimable=[3])
+        frame_stati, reporting = self._run(device, frame_test, frame_stati=frame_stati, policy=policy)
+
+        self.assertEqual(('configure', [0, 1, 2, 4, 5, 6, 7, 8, 9]), device.events[0])
+        self.assertEqual(3, frame_stati[3].num_claim_failures)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import tester
+from faulty_region import RecordingReporting
+
+
+def write_cache(cpu_root, cpu, index, level, type, size):
+    path = os.path.join(cpu_root, 'cpu%d' % cpu, 'cache', 'index%d' % index)
+    os.makedirs(path)
+    for name, value in (('level', level), ('type', type), ('size', size)):
+        with open(os.path.join(path, name), 'w') as f:
+            f.write('%s\n' % value)
+
+
+class CountingEvictor(object):
+    '''
+    Records the state of the region at each eviction
+    '''
+
+    def __init__(self, region):
+        self.region = region
+        self.snapshots = []
+
+    def evict(self):
+        self.snapshots.append(str(self.region))
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cpu_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cpu_root)
+
+    def testLastLevelCacheSize(self):
+        for cpu in (0, 1):
+            write_cache(self.cpu_root, cpu, 0, 1, 'Data', '32K')
+            write_cache(self.cpu_root, cpu, 1, 1, 'Instruction', '32K')
+            write_cache(self.cpu_root, cpu, 2, 2, 'Unified', '1024K')
+            write_cache(self.cpu_root, cpu, 3, 3, 'Unified', '8M')
+
+        self.assertEqual(8 * 1024 * 1024, tester.last_level_cache_size(self.cpu_root))
+
+    def testNoCaches(self):
+        self.assertEqual(None, tester.last_level_cache_size(self.cpu_root))
+
+    def testEvictor(self):
+        evictor = tester.CacheEvictor(100000)
+        evictor.evict()
+        evictor.evict()
+
+        self.assertEqual(0, evictor.size % tester.CacheEvictor.CHUNK_SIZE)
+        self.assertTrue(evictor.size >= 100000)
+        self.assertEqual(2, evictor.evictions)
+        self.assertTrue(evictor.seconds > 0)
+        evictor.close()
+
+    def testOneEvictionPerPassAndBlock(self):
+        region = bytearray(4 * 4096)
+        evictor = CountingEvictor(region)
+        is_ok = tester.LinearScanner(RecordingReporting(), evictor).test_frames(region, [0, 4096, 8192, 12288], 4096)
+
+        self.assertEqual([True] * 4, is_ok)
+        # All frames are written before the caches are evicted
+        self.assertEqual([str(bytearray(4 * 4096)), '\xff' * 4 * 4096, str(region)], evictor.snapshots)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "memtest_status.calibration")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testLinearImplementations(self):
+        names = tester.implementations("linear")
+        self.assertTrue("python" in names)
+        self.assertTrue("buffer" in names)
+        self.assertEqual({}, tester.implementations("retention"))
+
+    def testImplementationsFindTheSameFaults(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01}, stuck_at_1={8191: 0x80})
+        expected = None
+        for name, factory in tester.implementations("linear").iteritems():
+            if "numpy" == name:
+                # Reports words, not bytes
+                continue
+            reporting = RecordingReporting()
+            factory(reporting, None).test(FaultyRegion(3 * 4096, **faults), 4096, 4096)
+            expected = expected or reporting.reports
+            self.assertEqual(expected, reporting.reports, name)
+        self.assertTrue(len(expected) > 0)
+
+    def testImplementationsFailFaultyFrames(self):
+        for name, factory in tester.implementations("linear").iteritems():
+            if "numpy" == name:
+                # Needs a real buffer for the stuck bit, see TestWordwiseScanner
+                continue
+            frame_test = factory(RecordingReporting(), None)
+            region = FaultyRegion(3 * 4096, stuck_at_0={4096 + 7: 0x01})
+            self.assertEqual([True, False, True], list(tester.test_frames(frame_test, region, [0, 4096, 2 * 4096], 4096)), name)
+            self.assertEqual(0, frame_test.test(region, 4096, 4096), name)
+            self.assertEqual(3 * 4096, frame_test.test(region, 2 * 4096, 4096), name)
+
+    def testCalibrate(self):
+        results = tester.calibrate("linear", pages=8, time_limit=0.01)
+        self.assertEqual(sorted(tester.implementations("linear")), sorted(results))
+        self.assertTrue(all(frames_per_second > 0 for frames_per_second in results.itervalues()))
+
+    def testFastest(self):
+        self.assertEqual("numpy", tester.fastest({"python": 1.0, "buffer": 2.0, "numpy": 3.0}))
+        # Ties go to the preferred implementation
+        self.assertEqual("buffer", tester.fastest({"python": 2.0, "buffer": 2.0}))
+
+    def testCacheIsPerHost(self):
+        tester.CalibrationCache(self.path, "host-a 3.2").store("linear", {"buffer": 2.0})
+        tester.CalibrationCache(self.path, "host-b 3.2").store("linear", {"python": 1.0})
+
+        self.assertEqual({"buffer": 2.0}, tester.CalibrationCache(self.path, "host-a 3.2").get("linear"))
+        self.assertEqual({"python": 1.0}, tester.CalibrationCache(self.path, "host-b 3.2").get("linear"))
+        self.assertEqual(None, tester.CalibrationCache(self.path, "host-a 3.3").get("linear"))
+        self.assertEqual(None, tester.CalibrationCache(self.path, "host-a 3.2").get("quadratic"))
+
+    def testDamagedCache(self):
+        with open(self.path, "w") as f:
+            f.write("{")
+        self.assertEqual(None, tester.CalibrationCache(self.path).get("linear"))
+
+
+if __name__ == "__main__":
+    unittest.main()
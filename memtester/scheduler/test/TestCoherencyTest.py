@@ -0,0 +1,97 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+import tester
+from tester import coherency
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def _cpu_root(self, packages):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        for cpu, package in enumerate(packages):
+            topology = os.path.join(root, "cpu%d" % cpu, "topology")
+            os.makedirs(topology)
+            with open(os.path.join(topology, "physical_package_id"), "w") as f:
+                f.write("%d\n" % package)
+        # Offline cpus have no topology
+        os.makedirs(os.path.join(root, "cpu%d" % len(packages)))
+        return root
+
+    def testSpreadCpusAlternatesSockets(self):
+        root = self._cpu_root([0, 0, 1, 1])
+
+        self.assertEqual({0: 0, 1: 0, 2: 1, 3: 1}, coherency.cpu_packages(root))
+        self.assertEqual([0, 2], tester.spread_cpus(2, root))
+        self.assertEqual([0, 2, 1, 3, 0, 2], tester.spread_cpus(6, root))
+
+    def testUnknownTopologyIsNotPinned(self):
+        self.assertEqual([None, None], tester.spread_cpus(2, os.path.join(tempfile.gettempdir(), "no-such-cpu-root")))
+
+    def testLinesAreInterleaved(self):
+        region = bytearray(2 * 4096)
+        written = [coherency.write_lines(region, [0, 4096], 4096, 7, worker, 2) for worker in xrange(2)]
+
+        self.assertEqual([4096, 4096], written)
+        self.assertEqual(coherency.line_pattern(7, 0, 0), str(region[0:64]))
+        self.assertEqual(coherency.line_pattern(7, 1, 4096 + 64), str(region[4096 + 64:4096 + 128]))
+
+    def testWorkersShareTheMapping(self):
+        region = mmap.mmap(-1, 4 * 4096)
+        try:
+            reporting = RecordingReporting()
+            test = tester.CoherencyTest(reporting, workers=2, cpus=[0, 0], duration=0)
+            is_ok = test.test_frames(region, [0, 4096, 2 * 4096, 3 * 4096], 4096)
+
+            self.assertEqual([True] * 4, is_ok)
+            self.assertEqual([], reporting.reports)
+            # The parent sees the lines written by the workers
+            self.assertEqual(coherency.line_pattern(0, 1, 64), region[64:128])
+            self.assertEqual(1, test.round)
+            # Each worker writes half of the lines and verifies all of them
+            self.assertEqual(3 * 4 * 4096, test.bytes_moved)
+            self.assertTrue(test.throughput() > 0)
+        finally:
+            region.close()
+
+    def testFindsFaultsOnce(self):
+        reporting = RecordingReporting()
+        test = tester.CoherencyTest(reporting, workers=3, cpus=[None] * 3, duration=0)
+        is_ok = test.test_frames(FaultyRegion(3 * 4096, stuck_at_1={4096 + 70: 0x80}), [0, 4096, 2 * 4096], 4096)
+
+        self.assertEqual([True, False, True], is_ok)
+        expected = ord(coherency.line_pattern(0, coherency.owner_of(4096 + 64, 3), 4096 + 64)[6])
+        self.assertEqual([(4096 + 70, expected, expected | 0x80)], reporting.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+import random
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+FRAME = 4096
+
+
+def random_content(size):
+    generator = random.Random(42)
+    return bytearray(generator.randint(0, 0xff) for _ in xrange(size))
+
+
+class Test(unittest.TestCase):
+
+    def testAdjacentRuns(self):
+        self.assertEqual([(0, 0, 2), (2, 3 * FRAME, 1), (3, 5 * FRAME, 2)],
+                         tester.preserving.adjacent_runs([0, FRAME, 3 * FRAME, 5 * FRAME, 6 * FRAME], FRAME))
+
+    def testContentIsRestored(self):
+        for region in (bytearray(5 * FRAME), mmap.mmap(-1, 5 * FRAME)):
+            content = random_content(5 * FRAME)
+            region[:] = str(content)
+            test = tester.ContentPreservingTest(tester.LinearScanner(RecordingReporting()))
+
+            self.assertEqual([True] * 4, test.test_frames(region, [0, FRAME, 3 * FRAME, 4 * FRAME], FRAME))
+            self.assertEqual(str(content), str(region[:]))
+            self.assertEqual([], test.reporting.reports)
+
+    def testPoolIsReused(self):
+        region = bytearray(4 * FRAME)
+        test = tester.ContentPreservingTest(tester.LinearScanner(RecordingReporting()), max_frames=4)
+        pool = test.pool
+
+        test.test_frames(region, [0, FRAME], FRAME)
+        test.test_frames(region, [0, FRAME, 2 * FRAME, 3 * FRAME], FRAME)
+        self.assertTrue(pool is test.pool)
+
+    def testPoolGrows(self):
+        region = random_content(4 * FRAME)
+        content = str(region)
+        test = tester.ContentPreservingTest(tester.LinearScanner(RecordingReporting()), max_frames=1)
+
+        self.assertEqual([True] * 4, test.test_frames(region, [0, FRAME, 2 * FRAME, 3 * FRAME], FRAME))
+        self.assertEqual(content, str(region))
+
+    def testFailedRestoreIsReported(self):
+        region = FaultyRegion(2 * FRAME, stuck_at_0={FRAME + 9: 0x01})
+        region.data[:] = "\x01" * (2 * FRAME)
+        test = tester.ContentPreservingTest(tester.LinearScanner(RecordingReporting()))
+
+        self.assertEqual(0, test.test(region, FRAME, FRAME))
+        self.assertEqual(1, test.restore_failures)
+        # Found by the ONES and ADDRESS passes and by the verification of the restore
+        self.assertEqual((FRAME + 9, 0x01, 0x00), test.reporting.reports[-1])
+
+    def testGoodFrame(self):
+        region = random_content(2 * FRAME)
+        content = str(region)
+        test = tester.ContentPreservingTest(tester.LinearScanner(RecordingReporting()))
+
+        self.assertEqual(2 * FRAME, test.test(region, FRAME, FRAME))
+        self.assertEqual(content, str(region))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+import unittest
+
+import tester
+from tester import buffers
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def tearDown(self):
+        tester.set_verification(None)
+
+    def _reports(self, region, digest="sha1"):
+        reporting = RecordingReporting()
+        tester.set_verification(tester.DigestVerification(digest))
+        tester.LinearScanner(reporting).test(region, 4096, 4096)
+        return reporting.reports
+
+    def testSameReportsAsCompare(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01, 4096 + 300: 0xf0}, stuck_at_1={8191: 0x80})
+
+        compared = RecordingReporting()
+        tester.LinearScanner(compared).test(FaultyRegion(3 * 4096, **faults), 4096, 4096)
+
+        for digest in tester.DIGESTS:
+            self.assertEqual(compared.reports, self._reports(FaultyRegion(3 * 4096, **faults), digest), digest)
+
+    def testGoodMemoryInPlace(self):
+        for region in (bytearray(3 * 4096), mmap.mmap(-1, 3 * 4096)):
+            self.assertEqual([], self._reports(region))
+            self.assertEqual(0, buffers.get_verification().mismatches)
+
+    def testAudit(self):
+        audited = []
+        verification = tester.DigestVerification("crc32", lambda pfn, digests, is_ok: audited.append((pfn, len(digests), is_ok)))
+        tester.set_verification(verification)
+
+        test = tester.LinearScanner(RecordingReporting())
+        region = FaultyRegion(2 * 4096, stuck_at_1={4096 + 5: 0x01})
+        test.test_frames(region, [0, 4096], 4096)
+        tester.flush_reports(test, {0: 17, 4096: 18})
+
+        # One digest per pattern
+        self.assertEqual([(17, 3, True), (18, 3, False)], audited)
+        self.assertEqual({}, verification.pending)
+
+    def testDigestLog(self):
+        lines = []
+
+        class Out(object):
+            def write(self, line):
+                lines.append(line)
+
+            def flush(self):
+                pass
+
+        tester.DigestLog(Out(), "sha1")(42, ["ab", "cd"], False)
+        self.assertTrue(lines[0].endswith(" pfn=42 BAD sha1:ab,cd\n"))
+
+    def testUnknownDigest(self):
+        self.assertRaises(ValueError, tester.DigestVerification, "no-such-digest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import physmem
+import scheduling
+import status
+from scheduling.blockwise.frame import FrameStatus
+from fake_physmem import FakePhysmem
+
+
+def write_count(path, count):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("%d\n" % count)
+
+
+class CorrectingTest(object):
+    '''
+    Passes every frame, but the memory controller corrects errors while the frame bad_pfn is tested
+    '''
+
+    def __init__(self, counter_path, bad_pfn, errors=1):
+        self.counter_path = counter_path
+        self.bad_pfn = bad_pfn
+        self.errors = errors
+
+    def name(self):
+        return "Corrects errors at pfn %d" % self.bad_pfn
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        if self.bad_pfn in pfns:
+            with open(self.counter_path) as f:
+                count = int(f.read())
+            write_count(self.counter_path, count + self.errors)
+        return [True] * len(offsets)
+
+
+class RecordingSchedulerReporting(object):
+    def __init__(self):
+        self.corrected = []
+
+    def report_corrected_errors(self, pfns, increases):
+        self.corrected.append((pfns, increases))
+
+    def report_good_frame(self, pfn):
+        pass
+
+    def report_bad_frame(self, pfn):
+        pass
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _path(self, *names):
+        return os.path.join(self.root, "mc", *names)
+
+    def testFinestCountersPerController(self):
+        write_count(self._path("mc0", "ce_count"), 5)
+        write_count(self._path("mc0", "csrow0", "ce_count"), 2)
+        write_count(self._path("mc0", "dimm0", "dimm_ce_count"), 2)
+        write_count(self._path("mc0", "dimm1", "dimm_ce_count"), 3)
+        write_count(self._path("mc1", "ce_count"), 4)
+        write_count(self._path("mc1", "csrow0", "ce_count"), 1)
+        write_count(self._path("mc1", "csrow1", "ce_count"), 3)
+        write_count(self._path("mc2", "ce_count"), 7)
+
+        counters = scheduling.EdacCounters(self.root)
+
+        self.assertEqual({"mc0/dimm0": 2, "mc0/dimm1": 3, "mc1/csrow0": 1, "mc1/csrow1": 3, "mc2": 7}, counters.snapshot())
+
+    def testDelta(self):
+        write_count(self._path("mc0", "dimm0", "dimm_ce_count"), 2)
+        write_count(self._path("mc0", "dimm1", "dimm_ce_count"), 3)
+        counters = scheduling.EdacCounters(self.root)
+        before = counters.snapshot()
+
+        write_count(self._path("mc0", "dimm1", "dimm_ce_count"), 5)
+        self.assertEqual({"mc0/dimm1": 2}, counters.delta(before))
+
+        # Reset counters are no errors
+        write_count(self._path("mc0", "dimm1", "dimm_ce_count"), 0)
+        self.assertEqual({}, counters.delta(before))
+
+    def testWithoutEdac(self):
+        counters = scheduling.EdacCounters(self.root)
+
+        self.assertEqual({}, counters.snapshot())
+        self.assertEqual({}, counters.delta({}))
+
+    def testCorrectedErrorsAreRecordedForTheBlock(self):
+        counter_path = self._path("mc0", "csrow1", "ce_count")
+        write_count(counter_path, 10)
+        frame_stati = [FrameStatus() for _ in xrange(150)]
+        reporting = RecordingSchedulerReporting()
+        factory = scheduling.blockwise.SimpleBlockwiseSchedulerFactory(FakePhysmem(), CorrectingTest(counter_path, 120, 2),
+                                                                       [None] * 150, [0] * 150, status.TimestampingFacility(), reporting,
+                                                                       edac=scheduling.EdacCounters(self.root))
+        factory.new_instance(frame_stati).run(0, 150, physmem.SOURCE_FREE_BUDDY_PAGE)
+
+        # The second block (pfns 100..149) was tested while the errors were corrected
+        self.assertEqual([(range(100, 150), {"mc0/csrow1": 2})], reporting.corrected)
+        self.assertEqual([0] * 100 + [2] * 50, [frame_status.num_corrected_errors for frame_status in frame_stati])
+        self.assertEqual(0, sum(frame_status.num_errors for frame_status in frame_stati))
+
+    def testPolicyKeepsTheBlockSuspectForALimitedTime(self):
+        counter_path = self._path("mc0", "csrow1", "ce_count")
+        write_count(counter_path, 10)
+        frame_stati = [FrameStatus() for _ in xrange(150)]
+        sweep_test = CorrectingTest(counter_path, 120, 2)
+        deep_test = CorrectingTest(counter_path, -1)
+        timestamping = status.TimestampingFacility()
+        policy = scheduling.TieredPolicy(sweep_test, deep_test, timestamping, suspect_distance=0)
+        factory = scheduling.blockwise.SimpleBlockwiseSchedulerFactory(FakePhysmem(), sweep_test, [None] * 150, [0] * 150, timestamping,
+                                                                       RecordingSchedulerReporting(), policy=policy,
+                                                                       edac=scheduling.EdacCounters(self.root))
+        factory.new_instance(frame_stati).run(0, 150, physmem.SOURCE_FREE_BUDDY_PAGE)
+
+        self.assertEqual(range(100, 150), sorted(policy.corrected_error_round_by_pfn))
+        for _ in xrange(2):
+            policy.begin_round(frame_stati, 0, 150)
+        self.assertEqual({}, policy.corrected_error_round_by_pfn)
+        self.assertEqual(policy.sweep_test, policy.test_for(frame_stati[120]))
+
+
+if __name__ == "__main__":
+    unittest.main()
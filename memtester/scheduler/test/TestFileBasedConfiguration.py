@@ -0,0 +1,104 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import ctypes
+import os
+import shutil
+import tempfile
+import unittest
+
+import status
+from status import configuration
+from scheduling.blockwise.frame import FrameStatus
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "status")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testRecordsSurviveReopening(self):
+        cfg = status.FileBasedConfiguration(self.path, 10, FrameStatus)
+        with cfg.open() as frame_stati:
+            frame_stati[9].num_errors = 3
+
+        with cfg.open() as frame_stati:
+            self.assertEqual(3, frame_stati[9].num_errors)
+            self.assertEqual(0, frame_stati[8].num_errors)
+
+        self.assertEqual(configuration.HEADER_SIZE + 10 * ctypes.sizeof(FrameStatus), os.path.getsize(self.path))
+
+    def testFramesCanBeAdded(self):
+        with status.FileBasedConfiguration(self.path, 10, FrameStatus).open() as frame_stati:
+            frame_stati[9].num_errors = 3
+
+        with status.FileBasedConfiguration(self.path, 20, FrameStatus).open() as frame_stati:
+            self.assertEqual(3, frame_stati[9].num_errors)
+            self.assertEqual(0, frame_stati[19].num_errors)
+
+    def testLegacyFilesAreMigrated(self):
+        # A status file without header: 10 records of 40 bytes
+        legacy = FrameStatus()
+        legacy.last_successfull_test = 1234
+        legacy.num_errors = 3
+        legacy.last_successfull_claiming_method = 2
+        with open(self.path, "wb") as f:
+            f.write("\0" * 40 * 7 + ctypes.string_at(ctypes.addressof(legacy), 40) + "\0" * 40 * 2)
+
+        with status.FileBasedConfiguration(self.path, 12, FrameStatus).open() as frame_stati:
+            self.assertEqual((1234, 3, 2, 0, 0), (frame_stati[7].last_successfull_test, frame_stati[7].num_errors,
+                                                 frame_stati[7].last_successfull_claiming_method,
+                                                 frame_stati[7].num_claim_failures, frame_stati[7].num_corrected_errors))
+            self.assertEqual(0, frame_stati[6].num_errors)
+            self.assertEqual(0, frame_stati[11].last_successfull_test)
+
+        self.assertEqual(configuration.HEADER_SIZE + 12 * ctypes.sizeof(FrameStatus), os.path.getsize(self.path))
+        self.assertEqual(["status"], os.listdir(self.directory))
+
+    def testUnknownFilesAreRefused(self):
+        with open(self.path, "wb") as f:
+            f.write("\1" * 401)
+
+        cfg = status.FileBasedConfiguration(self.path, 10, FrameStatus)
+        self.assertRaises(ValueError, cfg.open)
+        # and left alone
+        self.assertEqual("\1" * 401, open(self.path, "rb").read())
+
+    def testOtherRecordSizesAreRefused(self):
+        with open(self.path, "wb") as f:
+            f.write(configuration._header(40) + "\0" * 400)
+
+        try:
+            status.FileBasedConfiguration(self.path, 10, FrameStatus).open()
+            self.fail("A file with 40 byte records was opened")
+        except ValueError as e:
+            self.assertTrue("records of 40 bytes" in str(e))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import tester
+from tester import passes
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class RecordingEvictor(object):
+    def __init__(self, events):
+        self.events = events
+
+    def evict(self):
+        self.events.append(('evict',))
+
+
+class Test(unittest.TestCase):
+
+    def _events(self, fused):
+        events = []
+        expected_of = [lambda offset: "a", lambda offset: "b", lambda offset: "c"]
+
+        def fill(offset, expected):
+            events.append(('fill', offset, expected))
+
+        def verify(offset, expected):
+            events.append(('verify', offset, expected))
+            return offset != 1 or expected != "b"
+
+        is_ok = passes.run_passes([0, 1], expected_of, fill, verify, RecordingEvictor(events), fused)
+        return is_ok, events
+
+    def testUnfused(self):
+        is_ok, events = self._events(False)
+        self.assertEqual([True, False], is_ok)
+        self.assertEqual([('fill', 0, 'a'), ('fill', 1, 'a'), ('evict',), ('verify', 0, 'a'), ('verify', 1, 'a'),
+                          ('fill', 0, 'b'), ('fill', 1, 'b'), ('evict',), ('verify', 0, 'b'), ('verify', 1, 'b'),
+                          ('fill', 0, 'c'), ('fill', 1, 'c'), ('evict',), ('verify', 0, 'c'), ('verify', 1, 'c')], events)
+
+    def testFused(self):
+        is_ok, events = self._events(True)
+        self.assertEqual([True, False], is_ok)
+        self.assertEqual([('fill', 0, 'a'), ('fill', 1, 'a'),
+                          ('evict',), ('verify', 0, 'a'), ('fill', 0, 'b'), ('verify', 1, 'a'), ('fill', 1, 'b'),
+                          ('evict',), ('verify', 0, 'b'), ('fill', 0, 'c'), ('verify', 1, 'b'), ('fill', 1, 'c'),
+                          ('evict',), ('verify', 0, 'c'), ('verify', 1, 'c')], events)
+
+    def testFusedFindsTheSameFaults(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01, 2 * 4096 + 300: 0xf0}, stuck_at_1={3 * 4096 - 1: 0x80})
+        results = []
+        for scanner in (tester.LinearScanner, tester.libc.LibcLinearScanner):
+            for fused in (False, True):
+                reporting = RecordingReporting()
+                is_ok = scanner(reporting, fused=fused).test_frames(FaultyRegion(3 * 4096, **faults), [0, 4096, 2 * 4096], 4096)
+                results.append((is_ok, sorted(reporting.reports)))
+
+        self.assertEqual([True, False, False], results[0][0])
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def testFusedLibc(self):
+        region = bytearray(3 * 4096)
+        reporting = RecordingReporting()
+        self.assertEqual([True] * 3, tester.libc.LibcLinearScanner(reporting, fused=True).test_frames(region, [0, 4096, 2 * 4096], 4096))
+        self.assertEqual(str(bytearray((4096 + i) % 0xff for i in xrange(4096))), str(region[4096:8192]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class CoupledRegion(FaultyRegion):
+    '''
+    Every write to aggressor also writes the same value to victim
+    '''
+
+    def __init__(self, size, aggressor, victim):
+        FaultyRegion.__init__(self, size)
+        self.aggressor = aggressor
+        self.victim = victim
+
+    def __setitem__(self, index, value):
+        FaultyRegion.__setitem__(self, index, value)
+        if self.aggressor in xrange(*slice_or_index(index, len(self.data))):
+            self.data[self.victim] = self.data[self.aggressor]
+
+
+def slice_or_index(index, size):
+    if isinstance(index, slice):
+        return index.indices(size)[:2]
+    return index, index + 1
+
+
+class Test(unittest.TestCase):
+
+    def _reports(self, region, window, aligned=False):
+        reporting = RecordingReporting()
+        tester.GallopingScanner(reporting, window, aligned).test(region, 0, 4096)
+        return reporting.reports
+
+    def testGoodMemory(self):
+        region = FaultyRegion(4096)
+        self.assertEqual([], self._reports(region, 64))
+        self.assertEqual(bytearray('\xff' * 4096), region.data)
+
+    def testCouplingInsideWindow(self):
+        self.assertTrue((130, 0x00, 0xff) in self._reports(CoupledRegion(4096, 100, 130), 64))
+        self.assertTrue((70, 0x00, 0xff) in self._reports(CoupledRegion(4096, 100, 70), 64))
+
+    def testCouplingOutsideWindowIsNotSeenDuringTheSweep(self):
+        reports = self._reports(CoupledRegion(4096, 100, 130), 16)
+        self.assertFalse((130, 0x00, 0xff) in reports)
+
+    def testAlignedWindow(self):
+        # 100 and 120 share the cache line 64..127, 130 does not
+        self.assertTrue((120, 0x00, 0xff) in self._reports(CoupledRegion(4096, 100, 120), 64, True))
+        self.assertFalse((130, 0x00, 0xff) in self._reports(CoupledRegion(4096, 100, 130), 64, True))
+
+    def testFailedFramesFail(self):
+        region = FaultyRegion(3 * 4096, stuck_at_0={4096 + 5: 0x01})
+        is_ok = tester.test_frames(tester.GallopingScanner(RecordingReporting(), 16), region, [0, 4096, 2 * 4096], 4096)
+
+        self.assertEqual([True, False, True], is_ok)
+        self.assertEqual(4096, tester.GallopingScanner(RecordingReporting(), 16).test(FaultyRegion(4096), 0, 4096))
+
+
+if __name__ == "__main__":
+    unittest.main()
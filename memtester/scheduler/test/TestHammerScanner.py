@@ -0,0 +1,153 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+import platform
+import time
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+FRAME = 4096
+
+
+class DisturbedRegion(FaultyRegion):
+    '''
+    Flips bit 0 of victim_offset once both frames next to it were read `threshold` times
+    '''
+
+    def __init__(self, frames, victim_offset, threshold):
+        FaultyRegion.__init__(self, frames * FRAME)
+        self.victim_offset = victim_offset
+        self.threshold = threshold
+        victim_frame = victim_offset // FRAME
+        self.reads = {victim_frame - 1: 0, victim_frame + 1: 0}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            frame = index.start // FRAME
+            if frame in self.reads:
+                self.reads[frame] += 1
+                if all(count == self.threshold for count in self.reads.itervalues()):
+                    self.data[self.victim_offset] ^= 0x01
+        return FaultyRegion.__getitem__(self, index)
+
+
+class SliceReads(object):
+    '''
+    Stands in for tester.ClflushReads: reads the lines with slices, records the calls
+    '''
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, buf, offset_a, offset_b, count):
+        self.calls.append((offset_a, offset_b, count))
+        for _ in xrange(count):
+            buf[offset_a:offset_a + 64]
+            buf[offset_b:offset_b + 64]
+
+
+class SleepingReads(SliceReads):
+    '''
+    Takes seconds_per_call per call, without reading
+    '''
+
+    def __init__(self, seconds_per_call):
+        SliceReads.__init__(self)
+        self.seconds_per_call = seconds_per_call
+
+    def __call__(self, buf, offset_a, offset_b, count):
+        self.calls.append((offset_a, offset_b, count))
+        time.sleep(self.seconds_per_call)
+
+
+class Test(unittest.TestCase):
+
+    def _test(self, region, pfns, **kwargs):
+        reporting = RecordingReporting()
+        kwargs.setdefault('reads', SliceReads())
+        scanner = tester.HammerScanner(reporting, **kwargs)
+        offsets = [frame * FRAME for frame in xrange(len(pfns))]
+        return scanner, reporting.reports, scanner.test_frames(region, offsets, FRAME, pfns)
+
+    def testGoodMemory(self):
+        _, reports, is_ok = self._test(FaultyRegion(4 * FRAME), [10, 11, 12, 13], hammer_count=10)
+        self.assertEqual([], reports)
+        self.assertEqual([True] * 4, is_ok)
+
+    def testDisturbedVictimIsFound(self):
+        region = DisturbedRegion(4, 2 * FRAME + 100, threshold=50)
+        _, reports, is_ok = self._test(region, [20, 21, 22, 23], hammer_count=100)
+
+        self.assertEqual([True, True, False, True], is_ok)
+        self.assertEqual([(2 * FRAME + 100, tester.hammer.VICTIM, tester.hammer.VICTIM ^ 0x01)], reports)
+
+    def testNotHammeredBelowThreshold(self):
+        region = DisturbedRegion(4, 2 * FRAME + 100, threshold=50)
+        _, reports, is_ok = self._test(region, [20, 21, 22, 23], hammer_count=20)
+        self.assertEqual([], reports)
+
+    def testNoAdjacentFramesNoHammering(self):
+        scanner, reports, is_ok = self._test(FaultyRegion(3 * FRAME), [10, 12, 14], hammer_count=10)
+        self.assertEqual(0, scanner.hammered)
+        self.assertEqual([True] * 3, is_ok)
+
+    def testNeighboursOfEachVictimAreReadInPairs(self):
+        reads = SliceReads()
+        scanner, _, _ = self._test(FaultyRegion(4 * FRAME), [20, 21, 22, 23], hammer_count=10, reads=reads)
+        # Odd round: victim 21 between 20 and 22, even round: victim 22 between 21 and 23
+        self.assertEqual([(0, 2 * FRAME, 10), (FRAME, 3 * FRAME, 10)], reads.calls)
+        self.assertEqual(20, scanner.hammered)
+        self.assertEqual(40, scanner.activations)
+
+    def testTimeBudgetBoundsHammering(self):
+        scanner, _, _ = self._test(FaultyRegion(3 * FRAME), [10, 11, 12], hammer_count=10 ** 9, time_budget=0.0)
+        self.assertEqual(tester.HammerScanner.READS_PER_CHECK, scanner.hammered)
+
+    def testRoundsShareTheTimeBudget(self):
+        reads = SleepingReads(0.01)
+        self._test(FaultyRegion(4 * FRAME), [20, 21, 22, 23], hammer_count=10 ** 9, time_budget=0.2, reads=reads)
+
+        odd = [call for call in reads.calls if call[0] == 0]
+        even = [call for call in reads.calls if call[0] == FRAME]
+        # About 0.1 s each
+        self.assertTrue(len(odd) > 2 and len(even) > 2)
+        self.assertTrue(len(odd) <= 11 and len(even) <= 11)
+
+    @unittest.skipUnless(platform.machine() in ("x86_64", "AMD64"), "clflush needs an x86-64 CPU")
+    def testClflushReads(self):
+        region = mmap.mmap(-1, 3 * FRAME)
+        self.addCleanup(region.close)
+        reporting = RecordingReporting()
+        scanner = tester.HammerScanner(reporting, hammer_count=1000)
+
+        self.assertEqual([True] * 3, scanner.test_frames(region, [0, FRAME, 2 * FRAME], FRAME, [10, 11, 12]))
+        self.assertEqual(2000, scanner.activations)
+        self.assertRaises(ValueError, scanner.test_frames, FaultyRegion(3 * FRAME), [0, FRAME, 2 * FRAME], FRAME, [10, 11, 12])
+
+
+if __name__ == "__main__":
+    unittest.main()
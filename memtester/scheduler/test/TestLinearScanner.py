@@ -0,0 +1,54 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, BytewiseRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def _reports(self, region, offset, length):
+        reporting = RecordingReporting()
+        tester.LinearScanner(reporting).test(region, offset, length)
+        return reporting.reports
+
+    def testGoodMemory(self):
+        region = FaultyRegion(3 * 4096)
+        self.assertEqual([], self._reports(region, 4096, 4096))
+        self.assertEqual(bytearray((4096 + i) % 0xff for i in xrange(4096)), region.data[4096:8192])
+
+    def testBufferPathMatchesBytewise(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01, 4096 + 300: 0xf0}, stuck_at_1={8191: 0x80})
+
+        fast = self._reports(FaultyRegion(3 * 4096, **faults), 4096, 4096)
+        slow = self._reports(BytewiseRegion(FaultyRegion(3 * 4096, **faults)), 4096, 4096)
+
+        self.assertTrue(len(fast) > 0)
+        self.assertEqual(slow, fast)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from tester import wordwise
+from faulty_region import RecordingReporting
+
+
+def with_coupling_fault(march_class, aggressor, victim):
+    '''
+    Returns a subclass of march_class that simulates an idempotent coupling fault:
+    a 0 -> 1 transition of word `aggressor` sets word `victim` to all ones (in every frame).
+    '''
+    class CoupledScanner(march_class):
+        def _write_column(self, frames, word, value):
+            was_zero = frames.read_column(word) == wordwise.ALL_ZEROES
+            march_class._write_column(self, frames, word, value)
+            if word == aggressor and value == wordwise.ALL_ONES and was_zero.any():
+                frames.write_column(victim, wordwise.ALL_ONES)
+
+    return CoupledScanner
+
+
+class Test(unittest.TestCase):
+
+    def testGoodMemory(self):
+        for march_class in (tester.MatsPlus, tester.MarchCMinus, tester.MarchB):
+            reporting = RecordingReporting()
+            region = bytearray(3 * 4096)
+            is_ok = march_class(reporting).test_frames(region, [8192, 0], 4096)
+
+            self.assertEqual([True, True], list(is_ok))
+            self.assertEqual([], reporting.reports)
+            self.assertEqual(bytearray(3 * 4096), region)
+
+    def testMarchCMinusDetectsCouplingFaults(self):
+        for aggressor, victim in ((3, 10), (10, 3)):
+            reporting = RecordingReporting()
+            is_ok = with_coupling_fault(tester.MarchCMinus, aggressor, victim)(reporting).test_frames(bytearray(2 * 4096), [0, 4096], 4096)
+
+            self.assertEqual([False, False], list(is_ok))
+            self.assertTrue((victim * 8, 0x00, 0xff) in reporting.reports)
+            self.assertTrue((4096 + victim * 8, 0x00, 0xff) in reporting.reports)
+
+    def testMatsPlusDetectsStuckAtFaults(self):
+        class StuckAtZero(tester.MatsPlus):
+            def _write_column(self, frames, word, value):
+                tester.MatsPlus._write_column(self, frames, word, value)
+                frames.write_column(7, wordwise.ALL_ZEROES)
+
+        reporting = RecordingReporting()
+        is_ok = StuckAtZero(reporting).test_frames(bytearray(4096), [0], 4096)
+
+        self.assertEqual([False], list(is_ok))
+        self.assertEqual([(56 + i, 0xff, 0x00) for i in xrange(8)], reporting.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import threading
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class ThreadRecordingTest(tester.LinearScanner):
+    def __init__(self, reporting, threads):
+        tester.LinearScanner.__init__(self, reporting)
+        self.threads = threads
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        self.threads.add(threading.current_thread().ident)
+        return tester.LinearScanner.test_frames(self, region, offsets, length, pfns)
+
+
+class Test(unittest.TestCase):
+
+    def testPoolSize(self):
+        self.assertEqual(4, tester.pool_size(4, 0.5, cpus=16))
+        self.assertEqual(8, tester.pool_size(32, 0.5, cpus=16))
+        self.assertEqual(1, tester.pool_size(4, 0.1, cpus=2))
+
+    def testSplit(self):
+        test = tester.ParallelTest(lambda reporting: tester.LinearScanner(reporting), RecordingReporting(), 4)
+        try:
+            self.assertEqual([(0, 25), (25, 50), (50, 75), (75, 100)], test.split(100))
+            self.assertEqual([(0, 5), (5, 10)], test.split(10))
+            self.assertEqual([(0, 3)], test.split(3))
+        finally:
+            test.close()
+
+    def testSameResultsAsSerial(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01, 9 * 4096 + 300: 0xf0}, stuck_at_1={14 * 4096 - 1: 0x80})
+        offsets = [frame * 4096 for frame in xrange(16)]
+
+        serial = RecordingReporting()
+        expected = tester.LinearScanner(serial).test_frames(FaultyRegion(16 * 4096, **faults), offsets, 4096)
+
+        threads = set()
+        reporting = RecordingReporting()
+        test = tester.ParallelTest(lambda locked: ThreadRecordingTest(locked, threads), reporting, 4)
+        try:
+            is_ok = test.test_frames(FaultyRegion(16 * 4096, **faults), offsets, 4096, range(100, 116))
+        finally:
+            test.close()
+
+        self.assertEqual(expected, is_ok)
+        self.assertEqual(sorted(serial.reports), sorted(reporting.reports))
+        # The pool may run several chunks in the same thread, but never in this one
+        self.assertTrue(len(threads) >= 1)
+        self.assertFalse(threading.current_thread().ident in threads)
+
+    def testReportingIsLocked(self):
+        reporting = RecordingReporting()
+        test = tester.ParallelTest(lambda locked: tester.LinearScanner(locked), reporting, 2)
+        test.close()
+
+        test.reporting.report_bad_memory(1, 2, 3)
+        self.assertEqual([(1, 2, 3)], reporting.reports)
+        self.assertTrue(test.reporting.reports is reporting.reports)
+        self.assertEqual(None, getattr(test.reporting, 'report_bit_faults', None))
+
+
+if __name__ == "__main__":
+    unittest.main()
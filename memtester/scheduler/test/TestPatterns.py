@@ -0,0 +1,84 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import struct
+import unittest
+
+import tester
+from tester import patterns
+from faulty_region import FaultyRegion, BytewiseRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def tearDown(self):
+        patterns._registry.pop("test-counter", None)
+
+    def testPagesAreShared(self):
+        self.assertTrue(patterns.get("ones", 0, 4096) is patterns.get("ones", 8192, 4096))
+        self.assertTrue(patterns.get("address", 0, 4096) is patterns.get("address", 0xff * 3, 4096))
+        self.assertFalse(patterns.get("address", 0, 4096) is patterns.get("address", 4096, 4096))
+
+    def testAddress(self):
+        self.assertEqual(str(bytearray((4096 + i) % 0xff for i in xrange(4096))), patterns.get("address", 4096, 4096))
+
+    def testAddressInAddress(self):
+        page = patterns.get("address-in-address", 4096, 4096)
+        self.assertEqual(tuple(xrange(4096, 8192, 8)), struct.unpack("<512Q", page))
+        # Unaligned
+        self.assertEqual(page[3:11], patterns.get("address-in-address", 4096 + 3, 8))
+
+    def testCheckerboards(self):
+        checkerboard = patterns.get("checkerboard", 0, 4096)
+        inverse = patterns.get("inverse-checkerboard", 0, 4096)
+        self.assertEqual("\x55" * 8 + "\xaa" * 8, checkerboard[:16])
+        self.assertEqual(["\xff"] * 4096, [chr(ord(a) ^ ord(b)) for a, b in zip(checkerboard, inverse)])
+
+    def testRandomIsReproducible(self):
+        page = patterns.get("random", 4096, 4096)
+        self.assertEqual(4096, len(page))
+        patterns._registry["random"].cache.clear()
+        self.assertEqual(page, patterns.get("random", 4096, 4096))
+        self.assertNotEqual(page, patterns.get("random", 8192, 4096))
+
+    def testUnknownPattern(self):
+        self.assertRaises(ValueError, patterns.get, "no-such-pattern", 0, 4096)
+        self.assertRaises(ValueError, tester.LinearScanner, RecordingReporting(), None, ["no-such-pattern"])
+
+    def testRegisteredPatternIsUsedByLinearScanner(self):
+        patterns.register("test-counter", lambda offset, length: str(bytearray(i % 7 for i in xrange(length))), period=1)
+        faults = dict(stuck_at_0={4096 + 8: 0x01})
+
+        reporting = RecordingReporting()
+        region = FaultyRegion(2 * 4096, **faults)
+        tester.LinearScanner(reporting, pattern_names=["test-counter"]).test(region, 4096, 4096)
+        self.assertEqual([(4096 + 8, 1, 0)], reporting.reports)
+
+        bytewise = RecordingReporting()
+        tester.LinearScanner(bytewise, pattern_names=["test-counter"]).test(BytewiseRegion(FaultyRegion(2 * 4096, **faults)), 4096, 4096)
+        self.assertEqual(reporting.reports, bytewise.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
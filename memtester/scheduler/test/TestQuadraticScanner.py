@@ -0,0 +1,68 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, BytewiseRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def _reports(self, region, offset, length):
+        reporting = RecordingReporting()
+        tester.QuadraticScanner(reporting).test(region, offset, length)
+        return reporting.reports
+
+    def testGoodMemory(self):
+        region = FaultyRegion(1024)
+        self.assertEqual([], self._reports(region, 256, 512))
+        self.assertEqual(bytearray(1024), region.data)
+
+    def testBufferPathMatchesBytewise(self):
+        faults = dict(stuck_at_0={256 + 3: 0x01}, stuck_at_1={256 + 200: 0x80, 767: 0x02})
+
+        fast = self._reports(FaultyRegion(1024, **faults), 256, 512)
+        slow = self._reports(BytewiseRegion(FaultyRegion(1024, **faults)), 256, 512)
+
+        self.assertTrue(len(fast) > 0)
+        self.assertEqual(slow, fast)
+
+    def testFailedFramesFail(self):
+        region = FaultyRegion(768, stuck_at_1={256 + 5: 0x10})
+        scanner = tester.QuadraticScanner(RecordingReporting())
+
+        self.assertEqual([True, False, True], tester.test_frames(scanner, region, [0, 256, 512], 256))
+        steps = list(scanner.test_steps(region, [0, 256, 512], 256))
+        self.assertEqual([True, False, True], steps[-1])
+        self.assertEqual([None] * (len(steps) - 1), steps[:-1])
+
+        self.assertEqual(0, scanner.test(region, 256, 256))
+        self.assertEqual(0, scanner.test(BytewiseRegion(region), 256, 256))
+        self.assertEqual(256, scanner.test(region, 0, 256))
+        self.assertEqual([True, False], tester.test_frames(scanner, BytewiseRegion(region), [0, 256], 256))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from tester import wordwise
+from faulty_region import RecordingReporting
+from TestMarchScanner import with_coupling_fault
+
+
+class RecordingOrder(tester.RandomLineOrder):
+    def __init__(self, seed=0):
+        tester.RandomLineOrder.__init__(self, seed)
+        self.requests = []
+
+    def word_positions(self, num_words):
+        self.requests.append(num_words)
+        return tester.RandomLineOrder.word_positions(self, num_words)
+
+
+class Test(unittest.TestCase):
+
+    def testPermutesWholeLines(self):
+        positions = tester.RandomLineOrder(7).word_positions(1024)
+
+        self.assertEqual(range(1024), sorted(positions))
+        self.assertNotEqual(range(1024), list(positions))
+        lines = positions.reshape(-1, 8)
+        self.assertTrue((lines == lines[:, :1] + numpy.arange(8)).all())
+        self.assertTrue((lines[:, 0] % 8 == 0).all())
+
+    def testNewPermutationPerRound(self):
+        order = tester.RandomLineOrder(7)
+        first = order.word_positions(1024)
+        self.assertTrue(first is order.word_positions(1024))
+        self.assertTrue((first == tester.RandomLineOrder(7).word_positions(1024)).all())
+
+        order.next_round()
+        self.assertFalse((first == order.word_positions(1024)).all())
+
+    def testNeedsWholeLines(self):
+        self.assertRaises(ValueError, tester.RandomLineOrder().word_positions, 12)
+
+    def testOrderedFrameArray(self):
+        for offsets in ([0, 4096, 8192], [8192, 0]):
+            region = bytearray(3 * 4096)
+            ordered = wordwise.FrameArray(region, offsets, 4096, tester.RandomLineOrder(3))
+            sequential = wordwise.FrameArray(region, offsets, 4096)
+
+            pattern = wordwise.address_words(offsets, 4096)
+            ordered.write(pattern)
+            self.assertTrue((sequential.read() == pattern).all())
+            self.assertTrue((ordered.read() == pattern).all())
+
+            ordered.write(wordwise.ALL_ONES)
+            self.assertTrue((sequential.read() == wordwise.ALL_ONES).all())
+
+    def testSameFaultsInRandomOrder(self):
+        for march_class in (tester.MarchCMinus, tester.MarchB):
+            results = []
+            for order in (None, RecordingOrder(5)):
+                reporting = RecordingReporting()
+                is_ok = with_coupling_fault(march_class, 3, 10)(reporting, order).test_frames(bytearray(2 * 4096), [0, 4096], 4096)
+                results.append((list(is_ok), sorted(reporting.reports)))
+
+            self.assertEqual([False, False], results[0][0])
+            self.assertEqual(results[0], results[1])
+            self.assertEqual([2 * 512, 512], order.requests)
+
+    def testNumpyTestersAcceptOrder(self):
+        order = tester.RandomLineOrder(1)
+        for frame_test in (tester.WordwiseScanner(RecordingReporting(), order=order),
+                           tester.BitFaultScanner(RecordingReporting(), order),
+                           tester.RandomPatternScanner(RecordingReporting(), 42, order=order),
+                           tester.MatsPlus(RecordingReporting(), order)):
+            self.assertEqual([True] * 2, list(frame_test.test_frames(bytearray(2 * 4096), [0, 4096], 4096)))
+            self.assertEqual([], frame_test.reporting.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from tester import prng
+from faulty_region import RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def testStreamsAreReproducibleFromThePfn(self):
+        region = bytearray(3 * 4096)
+        is_ok = tester.RandomPatternScanner(RecordingReporting(), 42, passes=1).test_frames(region, [0, 4096, 8192], 4096, [7, 1000, 3])
+
+        self.assertEqual([True] * 3, list(is_ok))
+        expected = prng.random_words(42, [1000], 0, 512)
+        self.assertEqual(str(expected.view(numpy.uint8).data), str(region[4096:8192]))
+
+    def testStreamsDifferPerPfnPassAndRun(self):
+        streams = [prng.random_words(run_id, [pfn], pass_number, 512)[0]
+                   for run_id, pfn, pass_number in ((1, 1, 0), (1, 2, 0), (1, 1, 1), (2, 1, 0))]
+        for i in xrange(len(streams)):
+            for j in xrange(i + 1, len(streams)):
+                self.assertFalse(numpy.array_equal(streams[i], streams[j]))
+
+    def testReportsBadBytes(self):
+        class StuckAtZero(tester.RandomPatternScanner):
+            def _write(self, frames, expected):
+                tester.RandomPatternScanner._write(self, frames, expected)
+                frames.read()[1, 3] = 0
+
+        reporting = RecordingReporting()
+        is_ok = StuckAtZero(reporting, 42).test_frames(bytearray(2 * 4096), [0, 4096], 4096, [5, 6])
+
+        self.assertEqual([True, False], list(is_ok))
+        expected = prng.random_words(42, [6], 0, 512)[0].view(numpy.uint8)
+        first_report = [(4096 + 24 + i, int(expected[24 + i]), 0) for i in xrange(8) if expected[24 + i]][0]
+        self.assertEqual(first_report, reporting.reports[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
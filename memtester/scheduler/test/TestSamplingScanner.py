@@ -0,0 +1,115 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from faulty_region import RecordingReporting
+
+FRAME = 4096
+
+
+class StuckBitScanner(tester.SamplingScanner):
+    '''
+    Forces a single bit to 1 after each write
+    '''
+
+    def __init__(self, reporting, bad_offset, mask):
+        tester.SamplingScanner.__init__(self, reporting)
+        self.bad_offset = bad_offset
+        self.mask = mask
+
+    def _write(self, words, index, expected):
+        tester.SamplingScanner._write(self, words, index, expected)
+        words.view(numpy.uint8)[self.bad_offset] |= self.mask
+
+
+class Test(unittest.TestCase):
+
+    def testSamplesOneLineInStride(self):
+        scanner = tester.SamplingScanner(RecordingReporting(), stride=8)
+        words = scanner.sampled_words([0, FRAME], FRAME, pfns=[10, 11])
+
+        # 64 lines per frame, 8 of them sampled, 8 words each
+        self.assertEqual((2, 64), words.shape)
+        self.assertEqual(range(2 * 8, 3 * 8), list(words[0, :8]))
+        self.assertEqual(range(10 * 8, 11 * 8), list(words[0, 8:16]))
+        # Stratified by pfn
+        self.assertEqual(range(512 + 3 * 8, 512 + 4 * 8), list(words[1, :8]))
+
+    def testRoundsCoverAllLinesWithAllPatterns(self):
+        scanner = tester.SamplingScanner(RecordingReporting(), stride=8)
+        seen = set()
+        for _ in xrange(24):
+            scanner.next_round()
+            pattern = tester.sampling.PATTERNS[scanner.round % 3]
+            seen.update((int(word), pattern) for word in scanner.sampled_words([0], FRAME, pfns=[5])[0])
+        self.assertEqual(512 * 3, len(seen))
+
+    def testGoodMemory(self):
+        region = bytearray(4 * FRAME)
+        scanner = tester.SamplingScanner(RecordingReporting())
+        for _ in xrange(3):
+            scanner.next_round()
+            self.assertEqual([True] * 4, list(scanner.test_frames(region, [0, FRAME, 2 * FRAME, 3 * FRAME], FRAME, [0, 1, 2, 3])))
+        self.assertEqual([], scanner.reporting.reports)
+
+    def testOnlySampledLinesAreWritten(self):
+        region = bytearray("\x42" * FRAME)
+        scanner = tester.SamplingScanner(RecordingReporting(), stride=8)
+        scanner.test_frames(region, [0], FRAME, [0])
+
+        # round 0: ZEROES in lines 0, 8, 16, ...
+        self.assertEqual(FRAME / 8, region.count("\x00"))
+        self.assertEqual("\x00" * 64 + "\x42" * 64, str(region[:128]))
+
+    def testAddressPattern(self):
+        region = bytearray(2 * FRAME)
+        scanner = tester.SamplingScanner(RecordingReporting(), stride=8)
+        scanner.round = 2
+        scanner.test_frames(region, [FRAME], FRAME, [6])
+
+        # round 2: ADDRESS in line 0 of pfn 6
+        start = FRAME
+        self.assertEqual(bytearray((start + i) % 0xff for i in xrange(64)), region[start:start + 64])
+
+    def testMismatchIsReported(self):
+        region = bytearray(2 * FRAME)
+        # round 0: ZEROES in line 1 of pfn 1
+        scanner = StuckBitScanner(RecordingReporting(), FRAME + 1 * 64 + 5, 0x10)
+
+        self.assertEqual([True, False], list(scanner.test_frames(region, [0, FRAME], FRAME, [0, 1])))
+        self.assertEqual([(FRAME + 1 * 64 + 5, 0x00, 0x10)], scanner.reporting.reports)
+
+    def testUnsampledFaultsAreMissed(self):
+        region = bytearray(2 * FRAME)
+        scanner = StuckBitScanner(RecordingReporting(), FRAME + 2 * 64 + 5, 0x10)
+
+        self.assertEqual([True, True], list(scanner.test_frames(region, [0, FRAME], FRAME, [0, 1])))
+
+
+if __name__ == "__main__":
+    unittest.main()
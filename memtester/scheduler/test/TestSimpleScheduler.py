@@ -0,0 +1,84 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+import unittest
+
+import physmem
+import tester
+import scheduling
+from scheduling.simple.frame import FrameStatus
+from fake_physmem import FakePhysmem
+from faulty_region import RecordingReporting
+
+
+class RecordingSchedulerReporting(object):
+    def __init__(self):
+        self.good = []
+        self.bad = []
+
+    def report_good_frame(self, pfn):
+        self.good.append(pfn)
+
+    def report_bad_frame(self, pfn):
+        self.bad.append(pfn)
+
+
+class Test(unittest.TestCase):
+
+    def _run(self, device, frame_test, num_frames=4):
+        frame_stati = [FrameStatus() for _ in xrange(num_frames)]
+        reporting = RecordingSchedulerReporting()
+        factory = scheduling.simple.SimpleSchedulerFactory(device, frame_test, [None] * num_frames, [0] * num_frames, reporting)
+        factory.new_instance(frame_stati).run(0, num_frames, physmem.SOURCE_FREE_BUDDY_PAGE)
+        return frame_stati, reporting
+
+    def testFramesAreTestedWithTheirPfn(self):
+        pfns = []
+
+        class PfnRecordingTest(object):
+            def test_frames(self, region, offsets, length, frame_pfns=None):
+                pfns.extend(frame_pfns)
+                return [True] * len(offsets)
+
+        _, reporting = self._run(FakePhysmem(unclaimable=[2]), PfnRecordingTest())
+
+        self.assertEqual([0, 1, 3], pfns)
+        self.assertEqual([0, 1, 3], reporting.good)
+
+    def testRandomPatternsDifferPerFrame(self):
+        contents = []
+
+        class ContentRecordingTest(tester.RandomPatternScanner):
+            def test_frames(self, region, offsets, length, pfns=None):
+                is_ok = tester.RandomPatternScanner.test_frames(self, region, offsets, length, pfns)
+                contents.append(str(region[0:length]))
+                return is_ok
+
+        frame_stati, reporting = self._run(FakePhysmem(), ContentRecordingTest(RecordingReporting(), 1))
+
+        self.assertEqual([0, 1, 2, 3], reporting.good)
+        self.assertEqual(4, len(set(contents)))
+
+
+if __name__ == "__main__":
+    unittest.main()
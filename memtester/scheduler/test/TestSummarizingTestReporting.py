@@ -0,0 +1,91 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import tester
+from faulty_region import FaultyRegion
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.emitted = []
+        self.reporting = tester.SummarizingTestReporting(self.emitted.append, max_samples=2, max_frames=2)
+
+    def testOneRecordPerFrame(self):
+        tester.LinearScanner(self.reporting).test(FaultyRegion(2 * 4096, stuck_at_0={4096 + 5: 0x01, 4096 + 9: 0x80}), 4096, 4096)
+        self.reporting.flush({4096: 0x1234})
+        self.reporting.close()
+
+        self.assertEqual(1, len(self.emitted))
+        record = self.emitted[0]
+        self.assertEqual(0x1234, record.pfn)
+        self.assertEqual(4096 + 5, record.first_offset)
+        self.assertEqual(4096 + 9, record.last_offset)
+        self.assertEqual(0x81, record.stuck_at_0)
+        self.assertEqual(0, record.stuck_at_1)
+        self.assertEqual([(4096 + 5, 0xff, 0xfe), (4096 + 9, 0xff, 0x7f)], record.samples)
+        # ONEs: 2 faults, ADDRESS: (4101 % 255) = 21 has bit 0 set, (4105 % 255) = 25 not bit 7
+        self.assertEqual(3, record.count)
+        self.assertTrue("pfn 0x1234" in str(record))
+
+    def testBoundedNumberOfFrames(self):
+        for frame in xrange(0, 4):
+            self.reporting.report_bad_memory(frame * 4096, 0x00, 0x01)
+        self.reporting.flush()
+
+        self.assertEqual((2, 0), self.reporting.close())
+        self.assertEqual([0, 4096], [record.frame_offset for record in self.emitted])
+
+    def testDroppedCountsAreResetByClose(self):
+        for frame in xrange(0, 3):
+            self.reporting.report_bad_memory(frame * 4096, 0x00, 0x01)
+        self.reporting.flush()
+        self.assertEqual((1, 0), self.reporting.close())
+
+        self.reporting.report_bad_memory(0, 0x00, 0x01)
+        self.reporting.flush()
+        self.assertEqual((0, 0), self.reporting.close())
+
+    def testRecordsAreResetByFlush(self):
+        self.reporting.report_bad_memory(10, 0x00, 0x01)
+        self.reporting.flush()
+        self.reporting.flush()
+        self.reporting.close()
+
+        self.assertEqual(1, len(self.emitted))
+
+    def testBandwidth(self):
+        self.reporting.report_bandwidth(4096, 100, 1, 3 << 20, False)
+        self.reporting.report_bandwidth(0, 100, None, 1 << 20, True)
+        self.reporting.close()
+
+        self.assertEqual(["Bandwidth, 100 frames at offset 0x1000 (node 1) : 3.0 MiB/s",
+                          "Cache bandwidth, 100 frames at offset 0x0 (node ?) : 1.0 MiB/s"],
+                         [str(record) for record in self.emitted])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import status
+import scheduling
+from scheduling.blockwise.frame import FrameStatus
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.timestamping = status.TimestampingFacility()
+        self.frame_stati = [FrameStatus() for _ in xrange(10)]
+        for pfn, frame_status in enumerate(self.frame_stati):
+            frame_status.pfn = pfn
+        self.policy = scheduling.TieredPolicy("sweep", "deep", self.timestamping, suspect_distance=1,
+                                              max_claim_failures=3, claim_retry_seconds=60)
+
+    def _tests(self):
+        return [self.policy.test_for(frame_status) for frame_status in self.frame_stati]
+
+    def testFramesWithoutErrorsAreSwept(self):
+        self.policy.begin_round(self.frame_stati, 0, 10)
+
+        self.assertEqual(["sweep"] * 10, self._tests())
+
+    def testFramesWithErrorsAndNeighboursAreSuspects(self):
+        self.frame_stati[4].num_errors = 1
+        self.policy.begin_round(self.frame_stati, 0, 10)
+
+        self.assertEqual(["sweep"] * 3 + ["deep"] * 3 + ["sweep"] * 4, self._tests())
+
+    def testFramesWithRecentCorrectedErrorsAreSuspects(self):
+        self.policy.begin_round(self.frame_stati, 0, 10)
+        self.policy.corrected_errors_seen([0])
+        self.frame_stati[0].num_corrected_errors = 3
+        self.assertEqual(["deep"] * 2 + ["sweep"] * 8, self._tests())
+
+        # Still in the next round, then the frames are swept again
+        self.policy.begin_round(self.frame_stati, 0, 10)
+        self.assertEqual(["deep"] * 2 + ["sweep"] * 8, self._tests())
+        self.policy.begin_round(self.frame_stati, 0, 10)
+        self.assertEqual(["sweep"] * 10, self._tests())
+
+    def testCorrectedErrorCounterAloneIsNoSuspect(self):
+        # Counted for every frame of a block, it does not decay
+        self.frame_stati[0].num_corrected_errors = 3
+        self.policy.begin_round(self.frame_stati, 0, 10)
+
+        self.assertEqual(["sweep"] * 10, self._tests())
+
+    def testNeighboursOutsideTheRangeAreSeen(self):
+        self.frame_stati[5].num_errors = 2
+        self.policy.begin_round(self.frame_stati, 6, 10)
+
+        self.assertEqual("deep", self.policy.test_for(self.frame_stati[6]))
+        self.assertEqual("sweep", self.policy.test_for(self.frame_stati[7]))
+
+    def testFailuresDuringTheRound(self):
+        self.policy.begin_round(self.frame_stati, 0, 10)
+        self.frame_stati[9].num_errors = 1
+
+        self.assertEqual(["sweep"] * 8 + ["deep"] * 2, self._tests())
+
+    def testRepeatedClaimFailuresAreDeprioritised(self):
+        frame_status = self.frame_stati[0]
+        frame_status.last_claiming_attempt = self.timestamping.timestamp()
+
+        frame_status.num_claim_failures = 2
+        self.assertTrue(self.policy.should_claim(frame_status))
+
+        frame_status.num_claim_failures = 3
+        self.assertFalse(self.policy.should_claim(frame_status))
+
+        frame_status.last_claiming_attempt = self.timestamping.timestamp() - self.timestamping.seconds_to_timestamp(61)
+        self.assertTrue(self.policy.should_claim(frame_status))
+
+        # The interval doubles with each further failure
+        frame_status.num_claim_failures = 4
+        self.assertFalse(self.policy.should_claim(frame_status))
+
+    def testStatusFile(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cfg = status.FileBasedConfiguration(os.path.join(directory, "status"), 10, FrameStatus)
+
+        with cfg.open() as frame_stati:
+            frame_stati[9].num_errors = 1
+            self.policy.begin_round(frame_stati, 0, 10)
+
+            tests = []
+            for pfn in xrange(10):
+                frame_status = frame_stati[pfn]
+                frame_status.pfn = pfn
+                tests.append(self.policy.test_for(frame_status))
+
+        # The last frame has no neighbour after it
+        self.assertEqual(["sweep"] * 8 + ["deep"] * 2, tests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def _write_proc(self, name, content):
+        path = os.path.join(self.proc_root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(content)
+
+    def testMemAvailable(self):
+        self._write_proc("meminfo", "MemTotal:       16000000 kB\nMemFree:          500000 kB\nMemAvailable:    1000000 kB\n")
+
+        self.assertTrue(tester.MemoryPressure(min_available_bytes=2000000 * 1024, proc_root=self.proc_root).is_high())
+        self.assertFalse(tester.MemoryPressure(min_available_bytes=500000 * 1024, proc_root=self.proc_root).is_high())
+
+    def testPressureStallInformation(self):
+        self._write_proc(os.path.join("pressure", "memory"), "some avg10=12.50 avg60=3.00 avg300=1.00 total=123456\n"
+                                                              "full avg10=2.00 avg60=0.50 avg300=0.10 total=23456\n")
+
+        self.assertTrue(tester.MemoryPressure(max_some_avg10=10, proc_root=self.proc_root).is_high())
+        self.assertFalse(tester.MemoryPressure(max_some_avg10=20, proc_root=self.proc_root).is_high())
+
+    def testMissingProcFilesAreNoPressure(self):
+        self.assertFalse(tester.MemoryPressure(min_available_bytes=1 << 40, max_some_avg10=0, proc_root=self.proc_root).is_high())
+
+    def testPressureIsCheckedOncePerInterval(self):
+        self._write_proc("meminfo", "MemAvailable:    1000000 kB\n")
+        pressure = tester.MemoryPressure(min_available_bytes=2000000 * 1024, proc_root=self.proc_root, check_interval=60)
+        self.assertTrue(pressure.is_high())
+
+        self._write_proc("meminfo", "MemAvailable:    3000000 kB\n")
+        self.assertTrue(pressure.is_high())
+
+    def testLinearStepsArePasses(self):
+        faults = dict(stuck_at_0={4096 + 7: 0x01}, stuck_at_1={3 * 4096 - 1: 0x80})
+        offsets = [frame * 4096 for frame in xrange(4)]
+
+        direct = RecordingReporting()
+        expected = tester.LinearScanner(direct).test_frames(FaultyRegion(4 * 4096, **faults), offsets, 4096)
+
+        sliced = RecordingReporting()
+        slicer = tester.TimeSlicer(0)
+        is_ok = slicer.run(tester.LinearScanner(sliced), FaultyRegion(4 * 4096, **faults), offsets, 4096)
+
+        self.assertEqual(expected, is_ok)
+        self.assertEqual([True, False, False, True], is_ok)
+        self.assertEqual(direct.reports, sliced.reports)
+        # A write and a verify sweep per pattern
+        self.assertEqual(6, slicer.steps)
+        self.assertEqual(7, slicer.slices)
+
+    def testQuadraticStepsAreChunks(self):
+        faults = dict(stuck_at_0={3: 0x01, 700: 0x10})
+
+        direct = RecordingReporting()
+        tester.QuadraticScanner(direct).test(FaultyRegion(1024, **faults), 0, 1024)
+
+        sliced = RecordingReporting()
+        steps = list(tester.test_steps(tester.QuadraticScanner(sliced), FaultyRegion(1024, **faults), [0], 1024))
+
+        self.assertEqual([None] * (1024 / tester.QuadraticScanner.STEP_BYTES + 1) + [[False]], steps)
+        self.assertEqual(direct.reports, sliced.reports)
+
+    def testPausesAfterEachSlice(self):
+        slicer = tester.TimeSlicer(0, 0.01)
+        start = time.time()
+        slicer.run(tester.LinearScanner(RecordingReporting()), FaultyRegion(4096), [0], 4096)
+
+        self.assertTrue(time.time() - start >= 0.06)
+
+    def testAbortsUnderMemoryPressure(self):
+        self._write_proc("meminfo", "MemAvailable:    1000 kB\n")
+        slicer = tester.TimeSlicer(0, 0, tester.MemoryPressure(min_available_bytes=1 << 20, proc_root=self.proc_root))
+
+        self.assertRaises(tester.TestAborted, slicer.run, tester.LinearScanner(RecordingReporting()), FaultyRegion(4096), [0], 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
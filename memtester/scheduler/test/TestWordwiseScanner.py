@@ -0,0 +1,77 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import unittest
+
+import numpy
+
+import tester
+from faulty_region import FaultyRegion, RecordingReporting
+
+
+class StuckBitScanner(tester.WordwiseScanner):
+    '''
+    Forces a single bit to 0 after each write
+    '''
+
+    def __init__(self, reporting, bad_offset, mask):
+        tester.WordwiseScanner.__init__(self, reporting)
+        self.bad_offset = bad_offset
+        self.mask = mask
+        self.region = None
+
+    def test_frames(self, region, offsets, length, pfns=None):
+        self.region = region
+        return tester.WordwiseScanner.test_frames(self, region, offsets, length, pfns)
+
+    def _write(self, frames, expected):
+        tester.WordwiseScanner._write(self, frames, expected)
+        self.region[self.bad_offset] &= ~self.mask & 0xff
+
+
+class Test(unittest.TestCase):
+
+    def testGoodMemory(self):
+        region = bytearray(4 * 4096)
+        reporting = RecordingReporting()
+        is_ok = tester.WordwiseScanner(reporting).test_frames(region, [0, 4096, 8192, 12288], 4096)
+
+        self.assertEqual([True] * 4, list(is_ok))
+        self.assertEqual([], reporting.reports)
+        self.assertEqual(bytearray(i % 0xff for i in xrange(4 * 4096)), region)
+
+    def testReportsLikeLinearScanner(self):
+        bad_offset = 8192 + 100
+        reporting = RecordingReporting()
+        is_ok = StuckBitScanner(reporting, bad_offset, 0x10).test_frames(bytearray(4 * 4096), [12288, 8192, 0], 4096)
+
+        linear_reporting = RecordingReporting()
+        tester.LinearScanner(linear_reporting).test(FaultyRegion(4 * 4096, stuck_at_0={bad_offset: 0x10}), 8192, 4096)
+
+        self.assertEqual([True, False, True], list(is_ok))
+        self.assertEqual(linear_reporting.reports, reporting.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+import mmap
+
+import physmem
+from physmem.mmapwrapper import MmapWrapper
+
+
+class FakePhysmem(object):
+    '''
+    Stands in for physmem.Physmem: claims every requested pfn except those in unclaimable
+    and maps anonymous memory. All calls are recorded in events.
+    '''
+
+    def __init__(self, unclaimable=(), events=None, bad_pfns=None):
+        self.unclaimable = set(unclaimable)
+        self.requests = []
+        self.events = [] if events is None else events
+        self.bad_pfns = [] if bad_pfns is None else bad_pfns
+
+    def new_session(self):
+        self.events.append(('new_session',))
+        return FakePhysmem(self.unclaimable, self.events, self.bad_pfns)
+
+    def close(self):
+        self.events.append(('close',))
+
+    def configure(self, requested_pfns):
+        self.requests = list(requested_pfns)
+        self.events.append(('configure', [request.requested_pfn for request in self.requests]))
+
+    def read_configuration(self):
+        ret = []
+        offset = 0
+        for request in self.requests:
+            status = physmem.Phys_mem_frame_status()
+            status.request = request
+            status.pfn = request.requested_pfn
+            if request.requested_pfn not in self.unclaimable:
+                status.page_p = 0x1000 + request.requested_pfn
+                status.actual_source = physmem.SOURCE_FREE_BUDDY_PAGE
+                status.vma_offset_of_first_byte = offset
+                offset += physmem.PAGE_SIZE
+            ret.append(status)
+        return ret
+
+    def mmap(self, length):
+        fake = self
+
+        class RecordingMmapWrapper(MmapWrapper):
+            def __exit__(self, exc_type, exc_value, traceback):
+                MmapWrapper.__exit__(self, exc_type, exc_value, traceback)
+                fake.events.append(('munmap', length))
+
+            def close(self):
+                self.buffer().close()
+                fake.events.append(('munmap', length))
+
+        self.events.append(('mmap', length))
+        return RecordingMmapWrapper(mmap.mmap(-1, length))
+
+    def mark_pfn_bad(self, bad_pfn):
+        self.events.append(('mark_pfn_bad', bad_pfn))
+        self.bad_pfns.append(bad_pfn)
@@ -0,0 +1,89 @@
+'''
+This source code is distributed under the MIT License
+
+Copyright (c) 2010, Jens Neuhalfen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+class FaultyRegion(object):
+    '''
+    A memory region (bytearray) with stuck-at faults, used to exercise the testers.
+
+    stuck_at_0 and stuck_at_1 map offsets to bitmasks. Bits set in the mask are forced
+    to 0 (resp. 1) on every write.
+    Supports the bytewise __getitem(x)__/__setitem(x,b)__ interface, slices and buffer().
+    '''
+
+    def __init__(self, size, stuck_at_0=None, stuck_at_1=None):
+        self.data = bytearray(size)
+        self.stuck_at_0 = stuck_at_0 or {}
+        self.stuck_at_1 = stuck_at_1 or {}
+
+    def buffer(self):
+        return self
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return str(self.data[index])
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(len(self.data))
+            self.data[index] = value
+            self._apply_faults(start, stop)
+        else:
+            self.data[index] = value
+            self._apply_faults(index, index + 1)
+
+    def _apply_faults(self, start, stop):
+        for offset, mask in self.stuck_at_0.iteritems():
+            if start <= offset < stop:
+                self.data[offset] &= ~mask & 0xff
+        for offset, mask in self.stuck_at_1.iteritems():
+            if start <= offset < stop:
+                self.data[offset] |= mask
+
+
+class BytewiseRegion(object):
+    '''
+    Restricts a region to the bytewise __getitem(x)__/__setitem(x,b)__ interface
+    '''
+
+    def __init__(self, region):
+        self.region = region
+
+    def __getitem__(self, index):
+        return self.region[index]
+
+    def __setitem__(self, index, value):
+        self.region[index] = value
+
+
+class RecordingReporting(object):
+    def __init__(self):
+        self.reports = []
+
+    def report_bad_memory(self, bad_offset, expected_value, actual_value):
+        self.reports.append((bad_offset, expected_value, actual_value))
@@ -44,7 +44,16 @@ class MmapWrapper(object):
         "Delegate pattern"
         return getattr(self.__mmap, name)
         
+    def buffer(self):
+        """
+        Returns the wrapped mmap.mmap. Use this for bulk access (slices, numpy.frombuffer, ctypes).
+        """
+        return self.__mmap
+
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__mmap[index]
+
         if  not (index  == self.__mmap.tell()):
             self.__mmap.seek(index)
             
@@ -52,6 +61,10 @@ class MmapWrapper(object):
         
                 
     def __setitem__(self, index,value):
+        if isinstance(index, slice):
+            self.__mmap[index] = value
+            return
+
         if  not (index  == self.__mmap.tell()):
             self.__mmap.seek(index)
             
@@ -110,11 +110,24 @@ class Physmem:
         self.f = None
 
     def __del__(self):
+        self.close()
+                
+    def close(self):
+        """
+        Close the device. This releases all frames claimed via this instance.
+        """
         if self.f and not self.f.closed:
-            self.f.close
-        
+            self.f.close()
+
         self.f = None
-                
+
+    def new_session(self):
+        """
+        Returns a new instance for the same device. Each instance opens the device separately and
+        thus has its own set of claimed frames.
+        """
+        return Physmem(self.device_name)
+
     def dev(self):
         if not self.f or self.f.closed:
             self.f = open(self.device_name, "rb+")